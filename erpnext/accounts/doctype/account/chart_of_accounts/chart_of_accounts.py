@@ -9,6 +9,8 @@ from frappe.utils import cstr
 from frappe.utils.nestedset import rebuild_tree
 from unidecode import unidecode
 
+from erpnext.utilities.tree_closure import invalidate_tree_closure
+
 
 def create_charts(
 	company, chart_template=None, existing_company=None, custom_chart=None, from_coa_importer=None
@@ -76,6 +78,7 @@ def create_charts(
 		_import_accounts(chart, None, None, root_account=True)
 		rebuild_tree("Account", "parent_account")
 		frappe.local.flags.ignore_update_nsm = False
+		invalidate_tree_closure("Account")
 
 
 def add_suffix_if_duplicate(account_name, account_number, accounts):
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""
+	Account Balance Snapshot holds monthly totals of GL Entry, dated on the last day of the month and grouped
+	by everything financial statements filter on. Snapshots of a company exist for every month from its first
+	GL Entry up to the latest snapshot date, and are deleted from the month of any entry posted or cancelled
+	on or before it.
+
+	A month is committed as soon as it is built and its GL Entries are counted again, since an entry committed
+	while the month was being built may be missing from it. Its invalidation either waits for the snapshot to be
+	committed and deletes it, or the count finds it.
+"""
+
+import frappe
+from frappe.utils import add_days, add_months, get_last_day, getdate, now, today
+from frappe.model.document import Document
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_accounting_dimensions
+from erpnext.utilities.bulk import insert_rows
+
+snapshot_key_fields = ["company", "account", "posting_date", "fiscal_year", "voucher_type", "is_opening",
+	"cost_center", "project", "finance_book", "account_currency"]
+snapshot_amount_fields = ["debit", "credit", "debit_in_account_currency", "credit_in_account_currency"]
+
+
+class AccountBalanceSnapshot(Document):
+	pass
+
+
+def get_snapshot_dimensions():
+	"""Accounting dimensions that have been added to Account Balance Snapshot"""
+	meta = frappe.get_meta("Account Balance Snapshot")
+	return [d for d in get_accounting_dimensions() if meta.has_field(d)]
+
+
+def get_latest_snapshot_date(company):
+	return frappe.db.sql("""
+		select max(posting_date)
+		from `tabAccount Balance Snapshot`
+		where company = %s
+	""", company)[0][0]
+
+
+def build_account_balance_snapshots(company, upto_date=None):
+	"""Build missing monthly snapshots of the company up to the month of upto_date, by default the last closed month"""
+	upto_date = get_last_day(upto_date or add_months(today(), -1))
+
+	from_date = get_latest_snapshot_date(company)
+	if from_date:
+		from_date = add_days(from_date, 1)
+	else:
+		from_date = frappe.db.sql("select min(posting_date) from `tabGL Entry` where company = %s", company)[0][0]
+		if not from_date:
+			return
+
+	dimensions = get_snapshot_dimensions()
+	group_by_fields = ["account", "fiscal_year", "is_opening", "cost_center", "project", "finance_book",
+		"account_currency"] + dimensions
+	fields = ["name", "creation", "modified", "owner", "modified_by"] + snapshot_key_fields \
+		+ snapshot_amount_fields + dimensions
+
+	month_start = getdate(from_date).replace(day=1)
+	while month_start <= getdate(upto_date):
+		month_end = get_last_day(month_start)
+		month_totals = get_month_totals(company, month_start, month_end)
+
+		entries = frappe.db.sql("""
+			select {group_by_fields},
+				if(voucher_type = 'Period Closing Voucher', voucher_type, '') as voucher_type,
+				sum(debit) as debit, sum(credit) as credit,
+				sum(debit_in_account_currency) as debit_in_account_currency,
+				sum(credit_in_account_currency) as credit_in_account_currency
+			from `tabGL Entry`
+			where company = %s and posting_date between %s and %s
+			group by {group_by_fields}, if(voucher_type = 'Period Closing Voucher', voucher_type, '')
+		""".format(group_by_fields=", ".join(group_by_fields)), (company, month_start, month_end), as_dict=1)
+
+		timestamp = now()
+		rows = []
+		for d in entries:
+			d.company = company
+			d.posting_date = month_end
+			rows.append([frappe.generate_hash(length=10), timestamp, timestamp, frappe.session.user, frappe.session.user]
+				+ [d.get(f) for f in snapshot_key_fields + snapshot_amount_fields + dimensions])
+
+		insert_rows("Account Balance Snapshot", fields, rows)
+		frappe.db.commit()
+
+		# an entry of the month committed after it was read is missing from the snapshot, and was posted while
+		# there was no snapshot for its invalidation to delete, so the month is read again once it is committed
+		if get_month_totals(company, month_start, month_end) != month_totals:
+			invalidate_account_balance_snapshots(company, month_start)
+			frappe.db.commit()
+			break
+
+		month_start = add_days(month_end, 1)
+
+
+def get_month_totals(company, month_start, month_end):
+	return frappe.db.sql("""
+		select count(*), sum(debit), sum(credit)
+		from `tabGL Entry`
+		where company = %s and posting_date between %s and %s
+	""", (company, month_start, month_end))[0]
+
+
+def invalidate_account_balance_snapshots(company, posting_date):
+	"""Delete snapshots of the month of posting_date onwards, since entries of that month have changed"""
+	if company and posting_date:
+		frappe.db.sql("""
+			delete from `tabAccount Balance Snapshot`
+			where company = %s and posting_date >= %s
+		""", (company, get_last_day(posting_date)))
+
+
+def get_usable_snapshot_date(company, start_dates, end_dates, filters=None):
+	"""
+		Returns the latest snapshot date up to which snapshots can replace GL Entries for a report. Entries are
+		compared against start_dates as posting_date >= date or < date and against end_dates as posting_date <= date,
+		so snapshots are used only for months that such a date does not split.
+	"""
+	if frappe.get_hooks("set_gl_conditions"):
+		return None
+
+	filters = filters or {}
+	if filters.get("presentation_currency") \
+			and filters.get("presentation_currency") != frappe.get_cached_value("Company", company, "default_currency"):
+		return None
+
+	snapshot_dimensions = get_snapshot_dimensions()
+	for dimension in get_accounting_dimensions():
+		if filters.get(dimension) and dimension not in snapshot_dimensions:
+			return None
+
+	snapshot_date = get_latest_snapshot_date(company)
+	if not snapshot_date:
+		return None
+
+	for date, is_start in [(d, True) for d in start_dates if d] + [(d, False) for d in end_dates if d]:
+		date = getdate(date)
+		is_month_boundary = date.day == 1 if is_start else date == get_last_day(date)
+		if not is_month_boundary and date <= snapshot_date:
+			snapshot_date = get_last_day(add_months(date, -1))
+
+	return snapshot_date
+
+
+def build_snapshots_for_all_companies():
+	"""Scheduled job to build snapshots of closed months"""
+	for company in frappe.get_all("Company", pluck="name"):
+		build_account_balance_snapshots(company)
+		frappe.db.commit()
+
+
+def on_doctype_update():
+	frappe.db.add_index("Account Balance Snapshot", ["company", "posting_date"])
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+import unittest
+from frappe.utils import add_months, get_last_day, today
+from erpnext.accounts.utils import get_fiscal_year
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.doctype.account_balance_snapshot.account_balance_snapshot import \
+	build_account_balance_snapshots
+from erpnext.accounts.report.trial_balance.trial_balance import execute as trial_balance
+
+company = "_Test Company"
+
+
+class TestAccountBalanceSnapshot(unittest.TestCase):
+	def test_backdated_entry_after_snapshot(self):
+		posting_date = get_last_day(add_months(today(), -2))
+		make_journal_entry("_Test Account Cost for Goods Sold - _TC", "_Test Bank - _TC", 100,
+			posting_date=posting_date, submit=True)
+
+		build_account_balance_snapshots(company)
+		self.assertTrue(frappe.db.exists("Account Balance Snapshot", {"company": company,
+			"posting_date": posting_date}))
+
+		# a backdated entry deletes the snapshots of its month onwards
+		make_journal_entry("_Test Account Cost for Goods Sold - _TC", "_Test Bank - _TC", 200,
+			posting_date=posting_date, submit=True)
+		self.assertFalse(frappe.db.exists("Account Balance Snapshot", {"company": company,
+			"posting_date": (">=", posting_date)}))
+		with_earlier_snapshots = get_trial_balance()
+
+		build_account_balance_snapshots(company)
+		with_snapshots = get_trial_balance()
+
+		without_snapshots = get_trial_balance(without_snapshots=True)
+		self.assertEqual(with_earlier_snapshots, without_snapshots)
+		self.assertEqual(with_snapshots, without_snapshots)
+
+
+def get_trial_balance(without_snapshots=False):
+	if without_snapshots:
+		frappe.db.sql("delete from `tabAccount Balance Snapshot` where company = %s", company)
+
+	columns, data = trial_balance(frappe._dict({
+		"company": company,
+		"fiscal_year": get_fiscal_year(today(), company=company)[0],
+		"to_date": today()
+	}))
+
+	return data
@@ -162,7 +162,7 @@ def toggle_disabling(doc):
 
 def get_doctypes_with_dimensions():
 	doclist = [
-		"GL Entry",
+		"GL Entry", "Account Balance Snapshot",
 
 		"Sales Invoice", "Sales Invoice Item", "POS Profile",
 		"Purchase Invoice", "Purchase Invoice Item",
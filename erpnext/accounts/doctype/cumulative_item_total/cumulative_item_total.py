@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""
+	Cumulative Item Total holds daily totals of stock qty and amount of submitted transaction items, grouped by
+	the fields cumulative Pricing Rules filter on. It is maintained only once built with
+	rebuild_cumulative_item_totals, which is queued when the first cumulative Pricing Rule is saved.
+
+	Each submit, cancel or update after submit inserts its own signed totals, so a (date, item) may have many
+	rows and readers sum them.
+"""
+
+import frappe
+from frappe.utils import cint, flt, now
+from frappe.model.document import Document
+from erpnext.utilities.bulk import insert_rows
+
+CUMULATIVE_TRANSACTION_TYPES = ("Quotation", "Sales Order", "Delivery Note", "Sales Invoice",
+	"Supplier Quotation", "Purchase Order", "Purchase Receipt", "Purchase Invoice")
+
+total_key_fields = ["transaction_type", "transaction_date", "item_code", "item_group", "brand", "warehouse"]
+total_amount_fields = ["stock_qty", "amount"]
+
+
+class CumulativeItemTotal(Document):
+	pass
+
+
+def is_cumulative_item_total_enabled():
+	return cint(frappe.db.get_global("cumulative_item_totals_built"))
+
+
+def is_cumulative_item_total_maintained():
+	return cint(frappe.db.get_global("cumulative_item_totals_maintained"))
+
+
+def get_date_field(transaction_type):
+	return 'transaction_date' if frappe.get_meta(transaction_type).has_field('transaction_date') else 'posting_date'
+
+
+def get_totals_from_transactions(transaction_type, conditions="", values=None):
+	child_doctype = "{0} Item".format(transaction_type)
+	child_meta = frappe.get_meta(child_doctype)
+
+	group_by_fields = ["`tab{0}`.{1}".format(child_doctype, f) if child_meta.has_field(f) else "null"
+		for f in ["item_code", "item_group", "brand", "warehouse"]]
+
+	return frappe.db.sql("""
+		select `tab{parent_doc}`.{date_field} as transaction_date,
+			{item_code} as item_code, {item_group} as item_group, {brand} as brand, {warehouse} as warehouse,
+			sum(`tab{child_doc}`.stock_qty) as stock_qty, sum(`tab{child_doc}`.amount) as amount
+		from `tab{child_doc}`, `tab{parent_doc}`
+		where `tab{child_doc}`.parent = `tab{parent_doc}`.name and `tab{parent_doc}`.docstatus = 1 {conditions}
+		group by `tab{parent_doc}`.{date_field}, {item_code}, {item_group}, {brand}, {warehouse}
+	""".format(
+		parent_doc=transaction_type,
+		child_doc=child_doctype,
+		date_field=get_date_field(transaction_type),
+		item_code=group_by_fields[0],
+		item_group=group_by_fields[1],
+		brand=group_by_fields[2],
+		warehouse=group_by_fields[3],
+		conditions=conditions
+	), values, as_dict=1)
+
+
+def insert_cumulative_item_totals(transaction_type, totals):
+	timestamp = now()
+	fields = ["name", "creation", "modified", "owner", "modified_by"] + total_key_fields + total_amount_fields
+
+	rows = []
+	for d in totals:
+		d.transaction_type = transaction_type
+		rows.append([frappe.generate_hash(length=10), timestamp, timestamp, frappe.session.user, frappe.session.user]
+			+ [d.get(f) for f in total_key_fields + total_amount_fields])
+
+	insert_rows("Cumulative Item Total", fields, rows)
+
+
+def update_cumulative_item_totals(doc, method=None):
+	"""Add the transaction's own totals on submit, subtract them on cancel and apply the difference
+	on update after submit. Totals are inserted as signed rows rather than recomputed from the transactions,
+	so that concurrent submits for the same date and item never overwrite each other's totals."""
+	if doc.doctype not in CUMULATIVE_TRANSACTION_TYPES or not is_cumulative_item_total_maintained():
+		return
+
+	if method == "on_cancel":
+		totals = get_totals_from_document(doc, -1)
+	elif method == "on_update_after_submit":
+		totals = get_totals_from_document(doc)
+		doc_before_save = doc.get_doc_before_save()
+		if doc_before_save:
+			totals = get_totals_from_document(doc_before_save, -1, totals)
+	else:
+		totals = get_totals_from_document(doc)
+
+	totals = [d for d in totals.values() if flt(d.stock_qty) or flt(d.amount)]
+	if totals:
+		insert_cumulative_item_totals(doc.doctype, totals)
+
+
+def get_totals_from_document(doc, factor=1, totals=None):
+	if totals is None:
+		totals = {}
+
+	transaction_date = doc.get(get_date_field(doc.doctype))
+	if not transaction_date:
+		return totals
+
+	for d in doc.get("items"):
+		key = (transaction_date, d.get("item_code"), d.get("item_group"), d.get("brand"), d.get("warehouse"))
+		if key not in totals:
+			totals[key] = frappe._dict(zip(total_key_fields[1:], key))
+			totals[key].update({"stock_qty": 0.0, "amount": 0.0})
+
+		totals[key].stock_qty += flt(d.get("stock_qty")) * factor
+		totals[key].amount += flt(d.get("amount")) * factor
+
+	return totals
+
+
+def rebuild_cumulative_item_totals():
+	"""Rebuild Cumulative Item Total from submitted transactions and start maintaining it"""
+	if is_cumulative_item_total_enabled():
+		return
+
+	# transactions submitted or cancelled from here on add their own totals
+	frappe.db.set_global("cumulative_item_totals_maintained", 1)
+	frappe.db.commit()
+
+	# one rebuild at a time. The lock is taken before the first read, so that the snapshot read below
+	# includes everything committed by a rebuild that ran before
+	frappe.db.sql("""select defvalue from `tabDefaultValue`
+		where parent = '__global' and defkey = 'cumulative_item_totals_maintained' for update""")
+	built = frappe.db.sql("""select defvalue from `tabDefaultValue`
+		where parent = '__global' and defkey = 'cumulative_item_totals_built'""")
+	if built and cint(built[0][0]):
+		frappe.db.rollback()
+		return
+
+	# replace exactly the rows visible in this snapshot by totals of the transactions visible in it.
+	# Rows added by transactions committed since are kept, as their transactions are not in the snapshot
+	names = frappe.db.sql_list("select name from `tabCumulative Item Total`")
+	for i in range(0, len(names), 1000):
+		frappe.db.sql("delete from `tabCumulative Item Total` where name in %s", [names[i:i + 1000]])
+
+	for transaction_type in CUMULATIVE_TRANSACTION_TYPES:
+		insert_cumulative_item_totals(transaction_type, get_totals_from_transactions(transaction_type))
+
+	frappe.db.set_global("cumulative_item_totals_built", 1)
+	frappe.db.commit()
+
+
+def get_cumulative_item_total(transaction_type, from_date, to_date, apply_on=None, items=None, warehouses=None):
+	"""Returns [stock_qty, amount] of submitted transaction items between the dates"""
+	conditions = ""
+	values = {"transaction_type": transaction_type, "from_date": from_date, "to_date": to_date}
+
+	if warehouses:
+		conditions += " and warehouse in %(warehouses)s"
+		values["warehouses"] = warehouses
+
+	if items:
+		conditions += " and {0} in %(items)s".format(apply_on)
+		values["items"] = items
+
+	stock_qty, amount = frappe.db.sql("""
+		select sum(stock_qty), sum(amount)
+		from `tabCumulative Item Total`
+		where transaction_type = %(transaction_type)s and transaction_date between %(from_date)s and %(to_date)s
+			{0}
+	""".format(conditions), values)[0]
+
+	return [flt(stock_qty), flt(amount)]
+
+
+def on_doctype_update():
+	frappe.db.add_index("Cumulative Item Total", ["transaction_type", "item_code", "transaction_date"])
+	frappe.db.add_index("Cumulative Item Total", ["transaction_type", "transaction_date"])
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+import unittest
+from frappe.utils import add_days, flt, nowdate
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.doctype.cumulative_item_total.cumulative_item_total import (rebuild_cumulative_item_totals,
+	get_totals_from_transactions)
+
+test_item = "_Test Item"
+
+
+class TestCumulativeItemTotal(unittest.TestCase):
+	def setUp(self):
+		frappe.db.set_global("cumulative_item_totals_built", 0)
+		frappe.db.set_global("cumulative_item_totals_maintained", 0)
+		rebuild_cumulative_item_totals()
+
+	def test_totals_match_transactions(self):
+		posting_date = add_days(nowdate(), -2)
+		self.assertEqual(get_totals(posting_date), get_totals_from_sales_invoices(posting_date))
+
+		si1 = create_sales_invoice(item=test_item, qty=5, rate=100, posting_date=posting_date)
+		si2 = create_sales_invoice(item=test_item, qty=3, rate=120, posting_date=posting_date)
+		self.assertEqual(get_totals(posting_date), get_totals_from_sales_invoices(posting_date))
+
+		si1.cancel()
+		self.assertEqual(get_totals(posting_date), get_totals_from_sales_invoices(posting_date))
+
+		si2.cancel()
+		self.assertEqual(get_totals(posting_date), get_totals_from_sales_invoices(posting_date))
+
+		# a rebuild replaces the signed rows by the same totals
+		frappe.db.set_global("cumulative_item_totals_built", 0)
+		rebuild_cumulative_item_totals()
+		self.assertEqual(get_totals(posting_date), get_totals_from_sales_invoices(posting_date))
+
+
+def get_totals(posting_date):
+	stock_qty, amount = frappe.db.sql("""
+		select sum(stock_qty), sum(amount)
+		from `tabCumulative Item Total`
+		where transaction_type = 'Sales Invoice' and transaction_date = %s and item_code = %s
+	""", (posting_date, test_item))[0]
+
+	return [flt(stock_qty), flt(amount)]
+
+
+def get_totals_from_sales_invoices(posting_date):
+	totals = get_totals_from_transactions("Sales Invoice",
+		"and `tabSales Invoice`.posting_date = %(posting_date)s and `tabSales Invoice Item`.item_code = %(item_code)s",
+		{"posting_date": posting_date, "item_code": test_item})
+
+	return [flt(sum(d.stock_qty for d in totals)), flt(sum(d.amount for d in totals))]
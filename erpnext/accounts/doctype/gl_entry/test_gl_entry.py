@@ -4,6 +4,7 @@
 import frappe, unittest
 from frappe.model.naming import parse_naming_series
 from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.general_ledger import process_gl_map, make_entry
 
 class TestGLEntry(unittest.TestCase):
 	def test_round_off_entry(self):
@@ -23,3 +24,28 @@ class TestGLEntry(unittest.TestCase):
 			and debit = 0 and credit = '.01'""", jv.name)
 
 		self.assertTrue(round_off_entry)
+
+	def test_bulk_insert_same_as_insert_per_entry(self):
+		jv = make_journal_entry("_Test Account Cost for Goods Sold - _TC",
+			"_Test Bank - _TC", 100, "_Test Cost Center - _TC", submit=True)
+		bulk_inserted = get_gl_entry_values(jv.name)
+		self.assertEqual(len(bulk_inserted), 2)
+
+		# the same entries made one by one through the GL Entry document
+		gl_map = process_gl_map(jv.get_gl_entries(), merge_entries=False)
+		frappe.db.sql("delete from `tabGL Entry` where voucher_type='Journal Entry' and voucher_no=%s", jv.name)
+		for entry in gl_map:
+			make_entry(entry, adv_adj=False)
+
+		self.assertEqual(get_gl_entry_values(jv.name), bulk_inserted)
+
+def get_gl_entry_values(voucher_no):
+	gl_entries = frappe.db.sql("""select * from `tabGL Entry`
+		where voucher_type='Journal Entry' and voucher_no=%s
+		order by account, debit, credit""", voucher_no, as_dict=1)
+
+	for d in gl_entries:
+		for fieldname in ("name", "creation", "modified"):
+			d.pop(fieldname)
+
+	return gl_entries
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.utils import cint, flt, now
+from frappe.model.document import Document
+from erpnext.utilities.bulk import insert_rows
+
+# entries against these are advances, outstanding against the voucher itself in receivable/payable reports
+ORDER_VOUCHER_TYPES = ("Sales Order", "Purchase Order", "Vehicle Registration Order")
+
+party_outstanding_fields = ["company", "account", "party_type", "party", "voucher_type", "voucher_no",
+	"outstanding_amount", "outstanding_amount_in_account_currency",
+	"unallocated_amount", "unallocated_amount_in_account_currency"]
+
+
+class PartyOutstanding(Document):
+	pass
+
+
+def is_party_outstanding_enabled():
+	"""Party Outstanding is maintained only once it has been built with rebuild_party_outstanding"""
+	return cint(frappe.db.get_global("party_outstanding_built"))
+
+
+def get_party_outstanding_keys(gl_entries):
+	"""Returns (party_type, party, voucher_type, voucher_no) of vouchers whose outstanding is affected by gl_entries"""
+	keys = set()
+	for d in gl_entries:
+		if not d.get("party_type") or not d.get("party"):
+			continue
+
+		for voucher_type_field, voucher_no_field in (("voucher_type", "voucher_no"),
+				("against_voucher_type", "against_voucher"),
+				("original_against_voucher_type", "original_against_voucher")):
+			if d.get(voucher_type_field) and d.get(voucher_no_field):
+				keys.add((d.get("party_type"), d.get("party"), d.get(voucher_type_field), d.get(voucher_no_field)))
+
+	return keys
+
+
+def get_party_outstanding_keys_for(conditions, values):
+	"""Returns Party Outstanding keys affected by GL Entries matching conditions, to be read before they are changed"""
+	if not is_party_outstanding_enabled():
+		return set()
+
+	gl_entries = frappe.db.sql("""
+		select party_type, party, voucher_type, voucher_no, against_voucher_type, against_voucher,
+			original_against_voucher_type, original_against_voucher
+		from `tabGL Entry`
+		where ifnull(party_type, '') != '' and ifnull(party, '') != '' and ({0})
+	""".format(conditions), values, as_dict=1)
+
+	return get_party_outstanding_keys(gl_entries)
+
+
+def update_party_outstanding(keys):
+	"""Recompute Party Outstanding of the vouchers in keys from GL Entry"""
+	if not keys or not is_party_outstanding_enabled():
+		return
+
+	voucher_nos = list({key[3] for key in keys})
+
+	frappe.db.sql("delete from `tabParty Outstanding` where voucher_no in %s", [voucher_nos])
+
+	party_outstanding = get_party_outstanding_from_gl("gle.voucher_no in %(voucher_nos)s or gle.against_voucher in %(voucher_nos)s",
+		{"voucher_nos": voucher_nos}, voucher_nos=set(voucher_nos))
+	insert_party_outstanding(party_outstanding)
+
+
+def get_party_outstanding_from_gl(conditions="", values=None, voucher_nos=None):
+	"""
+		Returns open vouchers computed from GL Entry, grouped in the same way as the receivable/payable report.
+
+		outstanding_amount is the net of entries against the voucher and unallocated_amount is the net of the
+		voucher's own entries that are not against an invoice. A voucher is open if either is non-zero.
+		If voucher_nos is given, only vouchers in it are returned since others may be missing entries.
+	"""
+	gl_entries = frappe.db.sql("""
+		select gle.company, gle.account, gle.party_type, gle.party,
+			gle.voucher_type, gle.voucher_no, gle.against_voucher_type, gle.against_voucher,
+			sum(gle.debit) - sum(gle.credit) as amount,
+			sum(gle.debit_in_account_currency) - sum(gle.credit_in_account_currency) as amount_in_account_currency
+		from `tabGL Entry` gle
+		where ifnull(gle.party_type, '') != '' and ifnull(gle.party, '') != '' {0}
+		group by gle.company, gle.account, gle.party_type, gle.party,
+			gle.voucher_type, gle.voucher_no, gle.against_voucher_type, gle.against_voucher
+	""".format("and ({0})".format(conditions) if conditions else ""), values, as_dict=1)
+
+	party_outstanding = {}
+
+	def get_voucher_balance(d, voucher_type, voucher_no):
+		if voucher_nos is not None and voucher_no not in voucher_nos:
+			return None
+
+		key = (d.company, d.account, d.party_type, d.party, voucher_type, voucher_no)
+		if key not in party_outstanding:
+			party_outstanding[key] = frappe._dict({
+				"company": d.company, "account": d.account, "party_type": d.party_type, "party": d.party,
+				"voucher_type": voucher_type, "voucher_no": voucher_no,
+				"outstanding_amount": 0.0, "outstanding_amount_in_account_currency": 0.0,
+				"unallocated_amount": 0.0, "unallocated_amount_in_account_currency": 0.0,
+				"has_unallocated_entries": False
+			})
+
+		return party_outstanding[key]
+
+	for d in gl_entries:
+		if d.against_voucher_type and d.against_voucher:
+			balance = get_voucher_balance(d, d.against_voucher_type, d.against_voucher)
+			if balance:
+				balance.outstanding_amount += flt(d.amount)
+				balance.outstanding_amount_in_account_currency += flt(d.amount_in_account_currency)
+
+		if not d.against_voucher or d.against_voucher_type in ORDER_VOUCHER_TYPES:
+			balance = get_voucher_balance(d, d.voucher_type, d.voucher_no)
+			if balance:
+				balance.unallocated_amount += flt(d.amount)
+				balance.unallocated_amount_in_account_currency += flt(d.amount_in_account_currency)
+
+				# each such entry is a row of its own in the report, so keep the voucher even if they net to zero
+				if flt(d.amount, 9) or flt(d.amount_in_account_currency, 9):
+					balance.has_unallocated_entries = True
+
+	return [d for d in party_outstanding.values() if d.has_unallocated_entries
+		or flt(d.outstanding_amount, 9) or flt(d.outstanding_amount_in_account_currency, 9)]
+
+
+def insert_party_outstanding(party_outstanding):
+	timestamp = now()
+	fields = ["name", "creation", "modified", "owner", "modified_by"] + party_outstanding_fields
+
+	rows = []
+	for d in party_outstanding:
+		rows.append([frappe.generate_hash(length=10), timestamp, timestamp, frappe.session.user, frappe.session.user]
+			+ [d.get(f) for f in party_outstanding_fields])
+
+	insert_rows("Party Outstanding", fields, rows)
+
+
+def rebuild_party_outstanding():
+	"""Rebuild Party Outstanding of all companies from GL Entry and start maintaining it"""
+	frappe.db.sql("delete from `tabParty Outstanding`")
+
+	for company, party_type in frappe.db.sql("""
+		select distinct company, party_type
+		from `tabGL Entry`
+		where ifnull(party_type, '') != ''
+	"""):
+		insert_party_outstanding(get_party_outstanding_from_gl("gle.company = %(company)s and gle.party_type = %(party_type)s",
+			{"company": company, "party_type": party_type}))
+
+	frappe.db.set_global("party_outstanding_built", 1)
+
+
+def verify_party_outstanding(company=None):
+	"""Returns differences between Party Outstanding and open vouchers computed from GL Entry"""
+	conditions, values = "", {}
+	if company:
+		conditions, values = "gle.company = %(company)s", {"company": company}
+
+	def get_key(d):
+		return (d.company, d.account, d.party_type, d.party, d.voucher_type, d.voucher_no)
+
+	expected = {get_key(d): d for d in get_party_outstanding_from_gl(conditions, values)}
+	actual = {get_key(d): d for d in frappe.get_all("Party Outstanding", fields=party_outstanding_fields,
+		filters={"company": company} if company else None)}
+
+	differences = []
+	for key in set(expected) | set(actual):
+		expected_row = expected.get(key, frappe._dict())
+		actual_row = actual.get(key, frappe._dict())
+
+		if any(flt(expected_row.get(f), 6) != flt(actual_row.get(f), 6) for f in party_outstanding_fields[6:]) \
+				or bool(expected_row) != bool(actual_row):
+			differences.append(frappe._dict({
+				"key": key,
+				"expected": {f: flt(expected_row.get(f), 6) for f in party_outstanding_fields[6:]} if expected_row else None,
+				"actual": {f: flt(actual_row.get(f), 6) for f in party_outstanding_fields[6:]} if actual_row else None,
+			}))
+
+	return differences
+
+
+def on_doctype_update():
+	frappe.db.add_index("Party Outstanding", ["voucher_no", "voucher_type"])
+	frappe.db.add_index("Party Outstanding", ["company", "party_type", "account"])
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+import unittest
+from frappe.utils import add_days, today
+from erpnext.accounts.utils import reconcile_against_document
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
+from erpnext.accounts.doctype.payment_reconciliation.test_payment_reconciliation import make_payment_jv
+from erpnext.accounts.doctype.party_outstanding.party_outstanding import (rebuild_party_outstanding,
+	verify_party_outstanding)
+from erpnext.accounts.report.accounts_receivable.accounts_receivable import execute as accounts_receivable
+
+company = "_Test Company"
+customer = "_Test Customer"
+receivable_account = "_Test Receivable - _TC"
+
+
+class TestPartyOutstanding(unittest.TestCase):
+	def setUp(self):
+		rebuild_party_outstanding()
+
+	def tearDown(self):
+		frappe.db.set_global("party_outstanding_built", 0)
+
+	def test_party_outstanding_matches_gl(self):
+		si = create_sales_invoice(customer=customer, debit_to=receivable_account, rate=100)
+		self.assertEqual(verify_party_outstanding(company), [])
+
+		pe = get_payment_entry("Sales Invoice", si.name, bank_account="_Test Bank - _TC", party_amount=30)
+		pe.insert()
+		pe.submit()
+		self.assertEqual(verify_party_outstanding(company), [])
+
+		pe.cancel()
+		self.assertEqual(verify_party_outstanding(company), [])
+
+		# an unallocated payment reconciled against the invoice
+		jv = make_payment_jv(frappe.get_doc("Customer", customer), 40)
+		self.assertEqual(verify_party_outstanding(company), [])
+
+		reconcile_against_document([frappe._dict({
+			"voucher_type": jv.doctype,
+			"voucher_no": jv.name,
+			"voucher_detail_no": None,
+			"against_voucher_type": si.doctype,
+			"against_voucher": si.name,
+			"account": receivable_account,
+			"party_type": "Customer",
+			"party": customer,
+			"dr_or_cr": "credit_in_account_currency",
+			"unadjusted_amount": 40,
+			"allocated_amount": 40
+		})])
+		self.assertEqual(verify_party_outstanding(company), [])
+
+	def test_receivable_report_with_party_outstanding(self):
+		si = create_sales_invoice(customer=customer, debit_to=receivable_account, rate=100)
+		pe = get_payment_entry("Sales Invoice", si.name, bank_account="_Test Bank - _TC", party_amount=30)
+		pe.insert()
+		pe.submit()
+		make_payment_jv(frappe.get_doc("Customer", customer), 40)
+
+		with_party_outstanding = get_receivables()
+		frappe.db.set_global("party_outstanding_built", 0)
+		self.assertEqual(with_party_outstanding, get_receivables())
+
+
+def get_receivables():
+	# a report date after all entries, so that Party Outstanding can be used
+	columns, data = accounts_receivable({
+		"company": company,
+		"customer": customer,
+		"report_date": add_days(today(), 3650),
+		"range1": 30,
+		"range2": 60,
+		"range3": 90,
+		"range4": 120
+	})[:2]
+
+	return data
@@ -18,6 +18,10 @@ class PeriodClosingVoucher(AccountsController):
 	def on_submit(self):
 		self.make_gl_entries()
 
+		# closed months can now be read as monthly totals by financial statements
+		frappe.enqueue("erpnext.accounts.doctype.account_balance_snapshot.account_balance_snapshot.build_account_balance_snapshots",
+			queue="long", enqueue_after_commit=True, company=self.company, upto_date=self.posting_date)
+
 	def submit(self):
 		accounting_dimensions, default_dimensions = self.get_accounting_dimensions()
 		dimension_fields = self.get_dimension_fields(accounting_dimensions)
@@ -34,10 +38,8 @@ class PeriodClosingVoucher(AccountsController):
 			self._submit()
 
 	def on_cancel(self):
-		frappe.db.sql("""
-			delete from `tabGL Entry`
-			where voucher_type = 'Period Closing Voucher' and voucher_no=%s
-		""", self.name)
+		from erpnext.accounts.general_ledger import delete_voucher_gl_entries
+		delete_voucher_gl_entries(self.doctype, self.name)
 
 	def validate_account_head(self):
 		closing_account_type = frappe.db.get_value("Account", self.closing_account_head, "root_type")
@@ -6,6 +6,7 @@ import frappe
 import unittest
 from erpnext.stock.get_item_details import get_pos_profile
 from erpnext.accounts.doctype.sales_invoice.pos import get_items_list, get_customers_list
+from erpnext.selling.page.point_of_sale.point_of_sale import get_catalog_snapshot, get_catalog_changes
 
 class TestPOSProfile(unittest.TestCase):
 	def test_pos_profile(self):
@@ -28,6 +29,34 @@ class TestPOSProfile(unittest.TestCase):
 
 		frappe.db.sql("delete from `tabPOS Profile`")
 
+	def test_pos_catalog_changes(self):
+		pos_profile = make_pos_profile()
+		price_list = "_Test Price List Rest of the World"
+
+		snapshot = get_catalog_snapshot(price_list, pos_profile.name)
+		self.assertIn("_Test Item", [d.item_code for d in snapshot["items"]])
+
+		item_price = frappe.get_doc("Item Price", {"item_code": "_Test Item", "price_list": price_list,
+			"customer": ["is", "not set"]})
+		original_rate = item_price.price_list_rate
+		item_price.price_list_rate = original_rate + 5
+		item_price.save()
+
+		try:
+			changes = get_catalog_changes(price_list, snapshot["version"], snapshot["epoch"], pos_profile.name)
+			changed_item = [d for d in changes["items"] if d.item_code == "_Test Item"]
+			self.assertEqual(changed_item[0].price_list_rate, original_rate + 5)
+
+			# change of profile requires downloading the catalog again
+			pos_profile.save()
+			changes = get_catalog_changes(price_list, changes["version"], changes["epoch"], pos_profile.name)
+			self.assertTrue(changes.get("reset"))
+		finally:
+			item_price.reload()
+			item_price.price_list_rate = original_rate
+			item_price.save()
+			frappe.db.sql("delete from `tabPOS Profile`")
+
 def make_pos_profile(**args):
 	frappe.db.sql("delete from `tabPOS Profile`")
 
@@ -5,11 +5,12 @@
 
 import frappe
 import json
-import copy
 from frappe import throw, _
 from frappe.utils import flt, getdate
 from frappe.model.document import Document
 from erpnext.stock.doctype.item.item import convert_item_uom_for
+from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import clear_pricing_rule_index
+from erpnext.accounts.doctype.cumulative_item_total.cumulative_item_total import is_cumulative_item_total_maintained
 from six import string_types
 
 apply_on_dict = {"Item Code": "items",
@@ -144,6 +145,20 @@ class PricingRule(Document):
 		if self.valid_from and self.valid_upto and getdate(self.valid_from) > getdate(self.valid_upto):
 			frappe.throw(_("Valid from date must be less than valid upto date"))
 
+	def on_update(self):
+		clear_pricing_rule_index()
+
+		# the rebuild starts maintaining totals first, so rules saved while it runs don't queue another
+		if self.is_cumulative and not self.disable and not is_cumulative_item_total_maintained():
+			frappe.enqueue("erpnext.accounts.doctype.cumulative_item_total.cumulative_item_total.rebuild_cumulative_item_totals",
+				queue="long", timeout=3600, enqueue_after_commit=True)
+
+	def on_trash(self):
+		clear_pricing_rule_index()
+
+	def after_rename(self, old, new, merge):
+		clear_pricing_rule_index()
+
 #--------------------------------------------------------------------------------
 
 @frappe.whitelist()
@@ -189,16 +204,54 @@ def apply_pricing_rule(args, doc=None):
 	set_serial_nos_based_on_fifo = frappe.get_cached_value("Stock Settings", None,
 		"automatically_set_serial_nos_based_on_fifo")
 
-	for item in item_list:
-		args_copy = copy.deepcopy(args)
-		args_copy.update(item)
-		data = get_pricing_rule_for_item(args_copy, item.get('price_list_rate'), doc=doc)
-		out.append(data)
-		if not item.get("serial_no") and set_serial_nos_based_on_fifo and not args.get('is_return'):
-			data.update(get_serial_no_for_item(args_copy))
+	# parse the transaction once for all rows
+	if isinstance(doc, string_types):
+		doc = json.loads(doc)
+
+	if doc:
+		doc = frappe.get_doc(doc)
+
+	item_master_details = get_item_master_details_for_pricing_rule(item_list)
+
+	# rule items, cumulative and mixed condition quantities are computed once per rule for the batch
+	previous_batch = frappe.flags.pricing_rule_batch
+	frappe.flags.pricing_rule_batch = {}
+
+	try:
+		for item in item_list:
+			args_copy = frappe._dict(args)
+			args_copy.update(item)
+			set_item_master_details(args_copy, item_master_details)
+
+			data = get_pricing_rule_for_item(args_copy, item.get('price_list_rate'), doc=doc)
+			out.append(data)
+			if not item.get("serial_no") and set_serial_nos_based_on_fifo and not args.get('is_return'):
+				data.update(get_serial_no_for_item(args_copy))
+	finally:
+		frappe.flags.pricing_rule_batch = previous_batch
 
 	return out
 
+def get_item_master_details_for_pricing_rule(item_list):
+	item_codes = list(set([d.get("item_code") for d in item_list if d.get("item_code")]))
+	if not item_codes:
+		return {}
+
+	return {d.name: d for d in frappe.get_all("Item", fields=["name", "item_group", "brand", "variant_of"],
+		filters={"name": ["in", item_codes]})}
+
+def set_item_master_details(args, item_master_details):
+	"""Sets Item fields that update_args_for_pricing_rule and get_pricing_rules would otherwise fetch per row"""
+	item = item_master_details.get(args.item_code)
+	if not item:
+		return
+
+	if not (args.item_group and args.brand) and item.item_group:
+		args.item_group, args.brand = item.item_group, item.brand
+
+	if "variant_of" not in args:
+		args.variant_of = item.variant_of
+
 def get_serial_no_for_item(args):
 	from erpnext.stock.get_item_details import get_serial_no
 
@@ -212,14 +265,15 @@ def get_serial_no_for_item(args):
 	return item_details
 
 def get_pricing_rule_for_item(args, price_list_rate=0, doc=None, for_validate=False):
-	from erpnext.accounts.doctype.pricing_rule.utils import (get_pricing_rules,
+	from erpnext.accounts.doctype.pricing_rule.utils import (get_pricing_rules, get_pricing_rule_batch_value,
 		get_applied_pricing_rules, get_pricing_rule_items, get_product_discount_rule)
 
 	if isinstance(doc, string_types):
 		doc = json.loads(doc)
 
 	if doc:
-		doc = frappe.get_doc(doc)
+		# the transaction is the same for all rows of a batch
+		doc = get_pricing_rule_batch_value("doc", lambda: frappe.get_doc(doc))
 
 	if (args.get('is_free_item') or
 		args.get("parenttype") == "Material Request"): return {}
@@ -0,0 +1,137 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+"""
+	Compiled index of active Pricing Rules
+
+	Rules are loaded once per process and site, and bucketed by selling/buying, apply on field and its value,
+	so that finding candidate rules of an item line is a dictionary lookup instead of a join per apply on.
+	The remaining conditions (company, party, tree groups, warehouse, dates and price list) are checked
+	against the few candidates, with tree ancestors from the cached tree closure.
+
+	The index is shared by workers through a version in the cache, which clear_pricing_rule_index changes
+	whenever a Pricing Rule is changed, and again once the change is committed.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cstr, getdate
+from erpnext.utilities.tree_closure import get_ancestors
+
+apply_on_fields = ["item_code", "item_group", "brand"]
+party_fields = ["company", "customer", "supplier", "campaign", "sales_partner"]
+tree_doctypes = ["Customer Group", "Territory", "Supplier Group", "Warehouse"]
+
+_indexes = {}
+
+
+class PricingRuleIndex(object):
+	def __init__(self):
+		self.rules = {}
+		self.other_rules = {}
+
+		for apply_on_field in apply_on_fields:
+			self.load_rules(apply_on_field)
+
+	def load_rules(self, apply_on_field):
+		child_doc = "`tabPricing Rule {0}`".format(frappe.unscrub(apply_on_field))
+		other_field = "other_{0}".format(apply_on_field)
+
+		rows = frappe.db.sql("""
+			select `tabPricing Rule`.*, {child_doc}.{apply_on_field}, {child_doc}.uom
+			from `tabPricing Rule`, {child_doc}
+			where {child_doc}.parent = `tabPricing Rule`.name and `tabPricing Rule`.disable = 0
+			order by `tabPricing Rule`.priority desc, `tabPricing Rule`.name desc
+		""".format(child_doc=child_doc, apply_on_field=apply_on_field), as_dict=1)
+
+		for rank, d in enumerate(rows):
+			for selling_or_buying in ("selling", "buying"):
+				if not d.get(selling_or_buying):
+					continue
+
+				key = (selling_or_buying, apply_on_field)
+				if d.get(apply_on_field):
+					self.rules.setdefault(key, {}).setdefault(d.get(apply_on_field), []).append((rank, d))
+				if d.apply_rule_on_other is not None and d.get(other_field):
+					self.other_rules.setdefault(key, {}).setdefault(d.get(other_field), []).append((rank, d))
+
+	def get_pricing_rules(self, apply_on_field, args):
+		"""Returns copies of rules applicable for args, in the order of priority desc, name desc"""
+		value = args.get(apply_on_field)
+		rules = self.rules.get((args.selling_or_buying, apply_on_field), {})
+
+		if apply_on_field == "item_group":
+			item_values = self.get_ancestors("Item Group", value)
+		else:
+			item_values = [value]
+			if apply_on_field == "item_code" and args.variant_of:
+				item_values.append(args.variant_of)
+
+		candidates = {}
+		for item_value in item_values:
+			for rank, d in rules.get(item_value, []):
+				candidates[rank] = d
+
+		other_rules = self.other_rules.get((args.selling_or_buying, apply_on_field), {})
+		for rank, d in other_rules.get(value, []):
+			candidates[rank] = d
+
+		return [frappe._dict(candidates[rank]) for rank in sorted(candidates)
+			if self.is_applicable(candidates[rank], args)]
+
+	def is_applicable(self, rule, args):
+		for field in party_fields:
+			if cstr(rule.get(field)) not in ("", cstr(args.get(field))):
+				return False
+
+		for parenttype in tree_doctypes:
+			field = frappe.scrub(parenttype)
+			if args.get(field) and cstr(rule.get(field)) \
+					and rule.get(field) not in self.get_ancestors(parenttype, args.get(field)):
+				return False
+
+		if args.get("transaction_date"):
+			transaction_date = getdate(args.get("transaction_date"))
+			if transaction_date < getdate(rule.valid_from or "2000-01-01") \
+					or transaction_date > getdate(rule.valid_upto or "2500-12-31"):
+				return False
+
+		if cstr(rule.for_price_list) not in ("", cstr(args.price_list)):
+			return False
+
+		return True
+
+	def get_ancestors(self, parenttype, name):
+		"""Returns the node and its ancestors in the tree"""
+		ancestors = get_ancestors(parenttype, name)
+		if not ancestors:
+			frappe.throw(_("Invalid {0}").format(name))
+
+		return ancestors
+
+
+def get_pricing_rule_index():
+	current_version = frappe.cache().get_value("pricing_rule_index_version", generator=frappe.generate_hash)
+	version, index = _indexes.get(frappe.local.site, (None, None))
+
+	if not index or version != current_version:
+		index = PricingRuleIndex()
+		_indexes[frappe.local.site] = (current_version, index)
+
+	return index
+
+
+def clear_pricing_rule_index(doc=None, method=None, *args):
+	"""
+		Invalidates the index of all workers, also called on change of trees that rules are filtered on.
+		The version is changed again after commit, as another worker may rebuild the index from the rules
+		as they were before the change was committed
+	"""
+	change_pricing_rule_index_version()
+	frappe.enqueue("erpnext.accounts.doctype.pricing_rule.pricing_rule_index.change_pricing_rule_index_version",
+		queue="short", enqueue_after_commit=True)
+
+
+def change_pricing_rule_index_version():
+	frappe.cache().set_value("pricing_rule_index_version", frappe.generate_hash())
+	_indexes.pop(frappe.local.site, None)
@@ -7,6 +7,7 @@ import frappe
 from erpnext.selling.doctype.sales_order.test_sales_order import make_sales_order
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
 from erpnext.stock.get_item_details import get_item_details
+from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import clear_pricing_rule_index
 from frappe import MandatoryError
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.healthcare.doctype.lab_test_template.lab_test_template import make_item_price
@@ -89,6 +90,7 @@ class TestPricingRule(unittest.TestCase):
 		self.assertEqual(details.get("discount_percentage"), 5)
 
 		frappe.db.sql("update `tabPricing Rule` set priority=NULL where campaign='_Test Campaign'")
+		clear_pricing_rule_index()
 		from erpnext.accounts.doctype.pricing_rule.utils import MultiplePricingRuleConflict
 		self.assertRaises(MultiplePricingRuleConflict, get_item_details, args)
 
@@ -318,6 +320,62 @@ class TestPricingRule(unittest.TestCase):
 		self.assertEquals(item.discount_amount, 110)
 		self.assertEquals(item.rate, 990)
 
+	def test_pricing_rule_index_on_update(self):
+		frappe.delete_doc_if_exists('Pricing Rule', '_Test Pricing Rule')
+		pricing_rule = make_pricing_rule(selling=1, discount_percentage=10)
+
+		si = create_sales_invoice(do_not_save=True)
+		si.insert(ignore_permissions=True)
+		self.assertEqual(si.items[0].discount_percentage, 10)
+
+		pricing_rule.reload()
+		pricing_rule.discount_percentage = 20
+		pricing_rule.save()
+
+		si = create_sales_invoice(do_not_save=True)
+		si.insert(ignore_permissions=True)
+		self.assertEqual(si.items[0].discount_percentage, 20)
+
+		pricing_rule.reload()
+		pricing_rule.disable = 1
+		pricing_rule.save()
+
+		si = create_sales_invoice(do_not_save=True)
+		si.insert(ignore_permissions=True)
+		self.assertFalse(si.items[0].discount_percentage)
+
+	def test_apply_pricing_rule_for_multiple_items(self):
+		from erpnext.accounts.doctype.pricing_rule.pricing_rule import apply_pricing_rule, get_pricing_rule_for_item
+
+		frappe.delete_doc_if_exists('Pricing Rule', '_Test Pricing Rule')
+		make_pricing_rule(selling=1, discount_percentage=10)
+
+		items = [{"doctype": "Sales Order Item", "name": "_Test Row {0}".format(i), "parenttype": "Sales Order",
+			"item_code": item_code, "qty": 5, "stock_qty": 5, "price_list_rate": 100}
+			for i, item_code in enumerate(["_Test Item", "_Test Item 2", "_Test Item"])]
+
+		args = frappe._dict({
+			"company": "_Test Company",
+			"price_list": "_Test Price List",
+			"currency": "_Test Currency",
+			"doctype": "Sales Order",
+			"conversion_rate": 1,
+			"price_list_currency": "_Test Currency",
+			"plc_conversion_rate": 1,
+			"customer": "_Test Customer",
+			"name": None
+		})
+
+		out = apply_pricing_rule(frappe._dict(args, items=items))
+		self.assertEqual([d.get("discount_percentage") for d in out], [10, None, 10])
+
+		for item, details in zip(items, out):
+			item_args = frappe._dict(args, selling_or_buying="selling")
+			item_args.update(item)
+			expected = get_pricing_rule_for_item(item_args, item.get("price_list_rate"))
+			for field in ("discount_percentage", "pricing_rules", "has_pricing_rule"):
+				self.assertEqual(details.get(field), expected.get(field))
+
 	def test_pricing_rule_for_product_discount_on_same_item(self):
 		frappe.delete_doc_if_exists('Pricing Rule', '_Test Pricing Rule')
 		test_record = {
@@ -457,9 +515,14 @@ def make_pricing_rule(**args):
 	if args.get(applicable_for):
 		doc.db_set(applicable_for, args.get(applicable_for))
 
+	clear_pricing_rule_index()
+	return doc
+
 
 def delete_existing_pricing_rules():
 	for doctype in ["Pricing Rule", "Pricing Rule Item Code",
 		"Pricing Rule Item Group", "Pricing Rule Brand"]:
 
-		frappe.db.sql("delete from `tab{0}`".format(doctype))
\ No newline at end of file
+		frappe.db.sql("delete from `tab{0}`".format(doctype))
+
+	clear_pricing_rule_index()
\ No newline at end of file
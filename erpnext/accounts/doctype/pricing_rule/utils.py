@@ -3,7 +3,11 @@
 
 import frappe
 from erpnext.setup.doctype.item_group.item_group import get_item_group_subtree
+from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import get_pricing_rule_index
+from erpnext.accounts.doctype.cumulative_item_total.cumulative_item_total import (CUMULATIVE_TRANSACTION_TYPES,
+	get_cumulative_item_total, is_cumulative_item_total_enabled)
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
+from erpnext.utilities.tree_closure import get_ancestors
 from erpnext.stock.get_item_details import get_conversion_factor, get_default_income_account, determine_selling_or_buying
 from frappe import _
 from frappe.utils import cint, flt, cstr, get_link_to_form, getdate, today
@@ -21,10 +25,9 @@ apply_on_table = {
 
 def get_pricing_rules(args, doc=None):
 	pricing_rules = []
-	values =  {}
 
 	for apply_on in ['Item Code', 'Item Group', 'Brand']:
-		pricing_rules.extend(_get_pricing_rules(apply_on, args, values))
+		pricing_rules.extend(_get_pricing_rules(apply_on, args))
 		if pricing_rules and not apply_multiple_pricing_rules(pricing_rules):
 			break
 
@@ -44,59 +47,28 @@ def get_pricing_rules(args, doc=None):
 
 	return rules
 
-def _get_pricing_rules(apply_on, args, values):
+def _get_pricing_rules(apply_on, args):
 	apply_on_field = frappe.scrub(apply_on)
 
 	if not args.get(apply_on_field): return []
 
-	child_doc = '`tabPricing Rule {0}`'.format(apply_on)
+	if apply_on_field == 'item_code' and "variant_of" not in args:
+		args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
 
-	conditions = item_variant_condition = item_conditions = ""
-	values[apply_on_field] = args.get(apply_on_field)
-	if apply_on_field in ['item_code', 'brand']:
-		item_conditions = "{child_doc}.{apply_on_field}= %({apply_on_field})s".format(child_doc=child_doc,
-			apply_on_field = apply_on_field)
-
-		if apply_on_field == 'item_code':
-			if "variant_of" not in args:
-				args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
+	if not args.price_list: args.price_list = None
 
-			if args.variant_of:
-				item_variant_condition = ' or {child_doc}.item_code=%(variant_of)s '.format(child_doc=child_doc)
-				values['variant_of'] = args.variant_of
-	elif apply_on_field == 'item_group':
-		item_conditions = _get_tree_conditions(args, "Item Group", child_doc, False)
+	return get_pricing_rule_index().get_pricing_rules(apply_on_field, args)
 
-	conditions += get_other_conditions(conditions, values, args)
-	warehouse_conditions = _get_tree_conditions(args, "Warehouse", '`tabPricing Rule`')
-	if warehouse_conditions:
-		warehouse_conditions = " and {0}".format(warehouse_conditions)
+def get_pricing_rule_batch_value(key, generator):
+	"""Returns the value of key computed once for the batch of rows in apply_pricing_rule, if any"""
+	batch = frappe.flags.pricing_rule_batch
+	if batch is None:
+		return generator()
 
-	if not args.price_list: args.price_list = None
+	if key not in batch:
+		batch[key] = generator()
 
-	conditions += " and ifnull(`tabPricing Rule`.for_price_list, '') in (%(price_list)s, '')"
-	values["price_list"] = args.get("price_list")
-
-	pricing_rules = frappe.db.sql("""select `tabPricing Rule`.*,
-			{child_doc}.{apply_on_field}, {child_doc}.uom
-		from `tabPricing Rule`, {child_doc}
-		where ({item_conditions} or (`tabPricing Rule`.apply_rule_on_other is not null
-			and `tabPricing Rule`.{apply_on_other_field}=%({apply_on_field})s) {item_variant_condition})
-			and {child_doc}.parent = `tabPricing Rule`.name
-			and `tabPricing Rule`.disable = 0 and
-			`tabPricing Rule`.{selling_or_buying} = 1 {warehouse_cond} {conditions}
-		order by `tabPricing Rule`.priority desc,
-			`tabPricing Rule`.name desc""".format(
-			child_doc = child_doc,
-			apply_on_field = apply_on_field,
-			item_conditions = item_conditions,
-			item_variant_condition = item_variant_condition,
-			selling_or_buying = args.selling_or_buying,
-			warehouse_cond = warehouse_conditions,
-			apply_on_other_field = "other_{0}".format(apply_on_field),
-			conditions = conditions), values, as_dict=1) or []
-
-	return pricing_rules
+	return batch[key]
 
 def apply_multiple_pricing_rules(pricing_rules):
 	apply_multiple_rule = [d.apply_multiple_pricing_rules
@@ -118,14 +90,10 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 		if key in frappe.flags.tree_conditions:
 			return frappe.flags.tree_conditions[key]
 
-		try:
-			lft, rgt = frappe.db.get_value(parenttype, args.get(field), ["lft", "rgt"])
-		except TypeError:
+		parent_groups = get_ancestors(parenttype, args.get(field))
+		if not parent_groups:
 			frappe.throw(_("Invalid {0}").format(args.get(field)))
 
-		parent_groups = frappe.db.sql_list("""select name from `tab%s`
-			where lft<=%s and rgt>=%s""" % (parenttype, '%s', '%s'), (lft, rgt))
-
 		if parent_groups:
 			if allow_blank: parent_groups.append('')
 			condition = "ifnull({table}.{field}, '') in ({parent_groups})".format(
@@ -278,7 +246,8 @@ def filter_pricing_rules_for_qty_amount(qty, rate, pricing_rules, args=None):
 
 		item_code = rule.get("item_code") or args.get("item_code")
 		if item_code and rule.get("uom"):
-			conversion_factor = get_conversion_factor(item_code, rule.uom).get("conversion_factor") or 1
+			conversion_factor = get_pricing_rule_batch_value(("conversion_factor", item_code, rule.uom),
+				lambda: get_conversion_factor(item_code, rule.uom)).get("conversion_factor") or 1
 
 		if (flt(qty) >= (flt(rule.min_qty) * conversion_factor)
 			and (flt(qty)<= (rule.max_qty * conversion_factor) if rule.max_qty else True)):
@@ -326,9 +295,10 @@ def get_qty_and_rate_for_mixed_conditions(doc, pr_doc, args):
 	apply_on = frappe.scrub(pr_doc.get('apply_on'))
 
 	if items and doc.get("items"):
-		for row in doc.get('items'):
-			if row.get(apply_on) not in items: continue
+		rows = get_pricing_rule_batch_value(("mixed_condition_rows", pr_doc.name),
+			lambda: [row for row in doc.get('items') if row.get(apply_on) in items])
 
+		for row in rows:
 			if pr_doc.mixed_conditions:
 				amt = args.get('qty') * args.get("price_list_rate")
 				if args.get("item_code") != row.get("item_code"):
@@ -359,27 +329,37 @@ def get_qty_and_rate_for_other_item(doc, pr_doc, pricing_rules):
 				return pricing_rules
 
 def get_qty_amount_data_for_cumulative(pr_doc, doc, items=[]):
-	sum_qty, sum_amt = [0, 0]
 	doctype = doc.get('parenttype') or doc.doctype
 
+	return get_pricing_rule_batch_value(("cumulative", pr_doc.name, doctype, tuple(items or [])),
+		lambda: _get_qty_amount_data_for_cumulative(pr_doc, doctype, items))
+
+def _get_qty_amount_data_for_cumulative(pr_doc, doctype, items=[]):
+	sum_qty, sum_amt = [0, 0]
+
 	date_field = 'transaction_date' if frappe.get_meta(doctype).has_field('transaction_date') else 'posting_date'
 
 	child_doctype = '{0} Item'.format(doctype)
 	apply_on = frappe.scrub(pr_doc.get('apply_on'))
 
+	warehouses = get_child_warehouses(pr_doc.warehouse) if pr_doc.warehouse else []
+
+	if (doctype in CUMULATIVE_TRANSACTION_TYPES and apply_on in ('item_code', 'item_group', 'brand')
+			and is_cumulative_item_total_enabled()):
+		return get_cumulative_item_total(doctype, pr_doc.valid_from, pr_doc.valid_upto,
+			apply_on=apply_on, items=items, warehouses=warehouses)
+
 	values = [pr_doc.valid_from, pr_doc.valid_upto]
 	condition = ""
 
-	if pr_doc.warehouse:
-		warehouses = get_child_warehouses(pr_doc.warehouse)
-
+	if warehouses:
 		condition += """ and `tab{child_doc}`.warehouse in ({warehouses})
 			""".format(child_doc=child_doctype, warehouses = ','.join(['%s'] * len(warehouses)))
 
 		values.extend(warehouses)
 
 	if items:
-		condition = " and `tab{child_doc}`.{apply_on} in ({items})".format(child_doc = child_doctype,
+		condition += " and `tab{child_doc}`.{apply_on} in ({items})".format(child_doc = child_doctype,
 			apply_on = apply_on, items = ','.join(['%s'] * len(items)))
 
 		values.extend(items)
@@ -542,6 +522,12 @@ def apply_pricing_rule_for_free_items(doc, pricing_rule_args, set_missing_values
 			doc.append('items', pricing_rule_args)
 
 def get_pricing_rule_items(pr_doc):
+	if pr_doc.get('name') and not pr_doc.get('__islocal'):
+		return get_pricing_rule_batch_value(("rule_items", pr_doc.name), lambda: _get_pricing_rule_items(pr_doc))
+
+	return _get_pricing_rule_items(pr_doc)
+
+def _get_pricing_rule_items(pr_doc):
 	apply_on_data = []
 	apply_on = frappe.scrub(pr_doc.get('apply_on'))
 
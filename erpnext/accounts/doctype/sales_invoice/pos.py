@@ -8,6 +8,7 @@ from erpnext.accounts.party import get_party_account_currency
 from erpnext.controllers.transaction_controller import get_taxes_and_charges
 from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.get_item_details import get_pos_profile
+from erpnext.utilities.tree_closure import get_descendants
 from frappe import _
 from frappe.core.doctype.communication.email import make
 from frappe.utils import nowdate, cint
@@ -171,7 +172,7 @@ def get_items_list(pos_profile, company):
 	if pos_profile.get('item_groups'):
 		# Get items based on the item groups defined in the POS profile
 		for d in pos_profile.get('item_groups'):
-			args_list.extend([d.name for d in get_child_nodes('Item Group', d.item_group)])
+			args_list.extend(get_descendants('Item Group', d.item_group))
 		if args_list:
 			cond = "and i.item_group in (%s)" % (', '.join(['%s'] * len(args_list)))
 
@@ -206,7 +207,7 @@ def get_customers_list(pos_profile={}):
 	if pos_profile.get('customer_groups'):
 		# Get customers based on the customer groups defined in the POS profile
 		for d in pos_profile.get('customer_groups'):
-			customer_groups.extend([d.get('name') for d in get_child_nodes('Customer Group', d.get('customer_group'))])
+			customer_groups.extend(get_descendants('Customer Group', d.get('customer_group')))
 		cond = "customer_group in (%s)" % (', '.join(['%s'] * len(customer_groups)))
 
 	return frappe.db.sql(""" select name, customer_name, customer_group,
@@ -1325,7 +1325,7 @@ class SalesInvoice(SellingController):
 	def set_serial_no_against_delivery_note(self):
 		for item in self.items:
 			if item.serial_no and item.delivery_note and \
-				item.qty != len(get_serial_nos(item.serial_no)):
+				item.qty != len(self.get_row_serial_nos(item)):
 				item.serial_no = get_delivery_note_serial_no(item.item_code, item.qty, item.delivery_note)
 
 	def validate_serial_against_delivery_note(self):
@@ -1341,8 +1341,7 @@ class SalesInvoice(SellingController):
 			serial_nos = frappe.db.get_value("Delivery Note Item", item.delivery_note_item, "serial_no") or ""
 			dn_serial_nos = set(get_serial_nos(serial_nos))
 
-			serial_nos = item.serial_no or ""
-			si_serial_nos = set(get_serial_nos(serial_nos))
+			si_serial_nos = set(self.get_row_serial_nos(item))
 
 			if si_serial_nos - dn_serial_nos:
 				frappe.throw(_("Serial Numbers in row {0} does not match with Delivery Note".format(item.idx)))
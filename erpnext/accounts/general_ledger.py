@@ -2,12 +2,17 @@
 # License: GNU General Public License v3. See license.txt
 
 import frappe, erpnext
-from frappe.utils import flt, cstr, cint
+from frappe.utils import flt, cstr, cint, getdate, now
 from frappe import _
 from erpnext.accounts.utils import get_stock_and_account_balance
 from frappe.model.meta import get_field_precision
 from erpnext.accounts.doctype.budget.budget import validate_expense_against_budget
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_accounting_dimensions
+from erpnext.accounts.doctype.party_outstanding.party_outstanding import get_party_outstanding_keys, \
+	get_party_outstanding_keys_for, update_party_outstanding
+from erpnext.accounts.doctype.account_balance_snapshot.account_balance_snapshot import invalidate_account_balance_snapshots
+from erpnext.utilities.profiler import profile_phase
+from erpnext.utilities.bulk import insert_rows
 from collections import OrderedDict
 
 
@@ -16,6 +21,7 @@ class StockAccountInvalidTransaction(frappe.ValidationError): pass
 class StockValueAndAccountBalanceOutOfSync(frappe.ValidationError): pass
 
 
+@profile_phase("make_gl_entries")
 def make_gl_entries(gl_map, cancel=False, adv_adj=False, merge_entries=True, update_outstanding='Yes', from_repost=False):
 	if gl_map:
 		if not cancel:
@@ -152,17 +158,25 @@ def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
 
 	round_off_debit_credit(gl_map)
 
-	reference_documents_for_update = set()
-	for entry in gl_map:
-		make_entry(entry, adv_adj, from_repost)
+	if has_gl_entry_doc_events():
+		for entry in gl_map:
+			make_entry(entry, adv_adj, from_repost)
+	else:
+		make_entries_in_bulk(gl_map, adv_adj, from_repost)
 
-		# check against budget
-		if not from_repost:
+	# check against budget
+	if not from_repost:
+		for entry in get_entries_for_budget_validation(gl_map):
 			validate_expense_against_budget(entry)
 
+	reference_documents_for_update = set()
+	for entry in gl_map:
 		if update_outstanding and not from_repost:
 			add_to_reference_documents_for_update(reference_documents_for_update, entry)
 
+	update_party_outstanding(get_party_outstanding_keys(gl_map))
+	invalidate_account_balance_snapshots(gl_map[0].company, min(getdate(d.posting_date) for d in gl_map))
+
 	from erpnext.accounts.doctype.gl_entry.gl_entry import update_outstanding_amt
 	for voucher_type, voucher_no, account, party_type, party in reference_documents_for_update:
 		update_outstanding_amt(voucher_type, voucher_no, account, party_type, party)
@@ -180,6 +194,103 @@ def make_entry(args, adv_adj, from_repost=False):
 	gle.submit()
 
 
+def make_entries_in_bulk(gl_map, adv_adj, from_repost=False):
+	"""
+		Same as make_entry for each entry of gl_map, but validated in memory and written with multi-row inserts.
+		Validations that depend only on the account or posting date run once per account or posting date
+	"""
+	from erpnext.accounts.doctype.gl_entry.gl_entry import validate_balance_type, \
+		check_freezing_date, validate_frozen_account
+
+	timestamp = now()
+	gl_entries = []
+	validated_accounts = set()
+
+	for args in gl_map:
+		gle = frappe.new_doc("GL Entry")
+		gle.update(args)
+		gle.flags.ignore_permissions = 1
+		gle.flags.from_repost = from_repost
+		gle.validate()
+
+		if not from_repost:
+			if gle.account not in validated_accounts:
+				gle.validate_account_details(adv_adj)
+			gle.validate_dimensions_for_pl_and_bs()
+
+		validated_accounts.add(gle.account)
+
+		gle.autoname()
+		gle.docstatus = 1
+		gle.owner = gle.modified_by = frappe.session.user
+		gle.creation = gle.modified = timestamp
+		gl_entries.append(gle)
+
+	validate_links_in_bulk(gl_entries)
+
+	if not from_repost:
+		for posting_date in {gle.posting_date for gle in gl_entries}:
+			check_freezing_date(posting_date, adv_adj)
+
+	for account in validated_accounts:
+		validate_frozen_account(account, adv_adj)
+
+	rows = [gle.get_valid_dict(convert_dates_to_str=True) for gle in gl_entries]
+	fields = list(rows[0])
+	insert_rows("GL Entry", fields, [[row.get(f) for f in fields] for row in rows])
+
+	# balance of the account after all entries
+	for account in validated_accounts:
+		validate_balance_type(account, adv_adj)
+
+
+def validate_links_in_bulk(gl_entries):
+	"""Validate Link and Dynamic Link values of all entries with one query per linked doctype"""
+	meta = frappe.get_meta("GL Entry")
+
+	values_by_doctype = {}
+	for df in meta.get_link_fields() + meta.get_dynamic_link_fields():
+		for gle in gl_entries:
+			value = gle.get(df.fieldname)
+			doctype = df.options if df.fieldtype == "Link" else gle.get(df.options)
+			if value and doctype:
+				values_by_doctype.setdefault(doctype, {}).setdefault(cstr(value).lower(), (df, value))
+
+	for doctype, values in values_by_doctype.items():
+		fields = ["name", "docstatus"] if frappe.get_meta(doctype).is_submittable else ["name"]
+		existing = {cstr(d.name).lower(): d for d in frappe.get_all(doctype, fields=fields,
+			filters={"name": ["in", [value for df, value in values.values()]]})}
+
+		for key, (df, value) in values.items():
+			if key not in existing:
+				frappe.throw(_("Could not find {0}: {1}").format(_(df.label), value), frappe.LinkValidationError)
+			elif existing[key].get("docstatus") == 2:
+				frappe.throw(_("Cannot link cancelled document: {0}").format(value), frappe.CancelledLinkError)
+
+
+def has_gl_entry_doc_events():
+	"""GL Entries are inserted one by one if any app hooks into their document events"""
+	for doctypes in frappe.get_hooks("doc_events"):
+		if doctypes in ("*", "GL Entry") or (isinstance(doctypes, (list, tuple)) and "GL Entry" in doctypes):
+			return True
+
+	return False
+
+
+def get_entries_for_budget_validation(gl_map):
+	"""
+		Returns one entry per account, posting date and dimensions. Actual expense for budget is read from
+		GL Entry, so a single check after all entries are saved covers every entry of the group
+	"""
+	key_fields = ["account", "posting_date", "fiscal_year", "cost_center", "project"] + get_accounting_dimensions()
+
+	entries = OrderedDict()
+	for entry in gl_map:
+		entries.setdefault(tuple(cstr(entry.get(f)) for f in key_fields), entry)
+
+	return list(entries.values())
+
+
 def validate_account_for_perpetual_inventory(gl_map):
 	if cint(erpnext.is_perpetual_inventory_enabled(gl_map[0].company)):
 		account_list = [gl_entries.account for gl_entries in gl_map]
@@ -322,6 +433,7 @@ def get_round_off_account_and_cost_center(company):
 	return round_off_account, round_off_cost_center
 
 
+@profile_phase("delete_gl_entries")
 def delete_gl_entries(gl_entries=None, voucher_type=None, voucher_no=None, adv_adj=False, update_outstanding="Yes"):
 
 	from erpnext.accounts.doctype.gl_entry.gl_entry import validate_balance_type, \
@@ -356,11 +468,24 @@ def delete_gl_entries(gl_entries=None, voucher_type=None, voucher_no=None, adv_a
 
 def delete_voucher_gl_entries(voucher_type, voucher_no):
 	if voucher_type and voucher_no:
+		party_outstanding_keys = get_party_outstanding_keys_for("voucher_type = %s and voucher_no = %s",
+			(voucher_type, voucher_no))
+		snapshot_dates = frappe.db.sql("""
+			select company, min(posting_date)
+			from `tabGL Entry`
+			where voucher_type = %s and voucher_no = %s
+			group by company
+		""", (voucher_type, voucher_no))
+
 		frappe.db.sql("""
 			delete from `tabGL Entry`
 			where voucher_type = %s and voucher_no = %s
 		""", (voucher_type, voucher_no))
 
+		update_party_outstanding(party_outstanding_keys)
+		for company, posting_date in snapshot_dates:
+			invalidate_account_balance_snapshots(company, posting_date)
+
 
 def add_to_reference_documents_for_update(reference_documents_for_update, entry):
 	if (not entry.get("party_type") or not entry.get("party")) and entry.against_voucher_type not in ['Vehicle Registration Order']:
@@ -8,6 +8,7 @@ from frappe.utils import getdate, flt, cint, formatdate, cstr
 from frappe.desk.query_report import group_report_data
 from erpnext.accounts.report.financial_statements import get_cost_centers_with_children
 from erpnext.accounts.utils import get_currency_precision
+from erpnext.accounts.doctype.party_outstanding.party_outstanding import is_party_outstanding_enabled
 
 
 class ReceivablePayableReport(object):
@@ -70,6 +71,7 @@ class ReceivablePayableReport(object):
 		self.get_gl_entries()
 		self.get_pdc_details()
 		self.get_return_entries()
+		self.get_voucher_balances()
 		self.get_sales_persons_map()
 		self.get_projects_map()
 		self.get_employee_advance_map()
@@ -130,6 +132,15 @@ class ReceivablePayableReport(object):
 	def get_gl_entries(self):
 		conditions, values = self.prepare_conditions()
 
+		if self.use_party_outstanding():
+			# only entries of open vouchers and entries against them
+			open_voucher_conditions, open_voucher_values = self.get_open_voucher_conditions()
+			conditions += """ and (exists(select po.name from `tabParty Outstanding` po
+					where po.voucher_no = gle.voucher_no {0})
+				or exists(select po.name from `tabParty Outstanding` po
+					where po.voucher_no = gle.against_voucher {0}))""".format(open_voucher_conditions)
+			values += open_voucher_values + open_voucher_values
+
 		if self.use_account_currency():
 			select_fields = "sum(gle.debit_in_account_currency) as debit, sum(gle.credit_in_account_currency) as credit"
 		else:
@@ -155,7 +166,6 @@ class ReceivablePayableReport(object):
 		self.future_gl_entries = []
 		self.gl_entries_till_date = []
 
-		self.gl_entries_map = {}
 		self.future_vouchers = set()
 		self.vouchers_till_date = set()
 		self.voucher_nos_till_date = set()
@@ -169,10 +179,6 @@ class ReceivablePayableReport(object):
 				self.vouchers_till_date.add((gle.voucher_type, gle.voucher_no))
 				self.voucher_nos_till_date.add(gle.voucher_no)
 
-			if gle.against_voucher_type and gle.against_voucher:
-				key = (gle.party, gle.against_voucher_type, gle.against_voucher)
-				self.gl_entries_map.setdefault(key, []).append(gle)
-
 		return self.gl_entries
 
 	def prepare_conditions(self):
@@ -250,12 +256,80 @@ class ReceivablePayableReport(object):
 			filters={"account_type": account_type, "company": self.filters.company})]
 		conditions.append("gle.account in (%s)" % ','.join(['%s'] *len(accounts)))
 		values += accounts
+		self.accounts = accounts
 
 		return " and ".join(conditions), values
 
-	def get_gl_entries_for(self, party, against_voucher_type, against_voucher):
-		key = (party, against_voucher_type, against_voucher)
-		return self.gl_entries_map.get(key, [])
+	def get_voucher_balances(self):
+		"""
+			Aggregates entries till report date against each (party, against_voucher_type, against_voucher)
+			in a single pass so that outstanding of each row is a lookup.
+
+			The entry of a voucher against itself is kept aside as self_entry since it must be excluded
+			when computing the outstanding of that same entry.
+		"""
+		self.voucher_balances = {}
+
+		for e in self.gl_entries_till_date:
+			if not (e.against_voucher_type and e.against_voucher):
+				continue
+
+			key = (e.party, e.against_voucher_type, e.against_voucher)
+			balance = self.voucher_balances.get(key)
+			if not balance:
+				balance = self.voucher_balances[key] = frappe._dict({
+					"payment_amount": 0.0, "credit_note_amount": 0.0, "self_entry": None,
+					"debit": 0.0, "claimed_amount": 0.0, "return_amount": 0.0
+				})
+
+			amount = flt(e.get(self.reverse_dr_or_cr), self.currency_precision) - flt(e.get(self.dr_or_cr), self.currency_precision)
+			is_credit_note = e.voucher_no in self.return_entries
+
+			if e.voucher_type == e.against_voucher_type and e.voucher_no == e.against_voucher:
+				balance.self_entry = frappe._dict({"name": e.name, "amount": amount, "is_credit_note": is_credit_note})
+			elif is_credit_note:
+				balance.credit_note_amount += amount
+			else:
+				balance.payment_amount += amount
+
+			# for employee advances
+			balance.debit += flt(e.debit, self.currency_precision)
+			if e.voucher_type == "Expense Claim":
+				balance.claimed_amount += flt(e.credit, self.currency_precision)
+			else:
+				balance.return_amount += flt(e.credit, self.currency_precision)
+
+		return self.voucher_balances
+
+	def get_voucher_balance(self, party, against_voucher_type, against_voucher):
+		return self.voucher_balances.get((party, against_voucher_type, against_voucher))
+
+	def use_party_outstanding(self):
+		"""
+			Party Outstanding holds vouchers open as per all GL Entries, so it can be used only if nothing
+			is posted after the report date. Otherwise fall back to scanning all entries of the party type.
+		"""
+		if not is_party_outstanding_enabled() or self.filters.finance_book:
+			return False
+
+		return not frappe.db.sql("""
+			select name
+			from `tabGL Entry`
+			where company = %s and party_type = %s and posting_date > %s
+			limit 1
+		""", (self.filters.company, self.filters.party_type, self.filters.report_date))
+
+	def get_open_voucher_conditions(self):
+		conditions = "and po.company = %s and po.party_type = %s and po.account in ({0})".format(
+			", ".join(["%s"] * len(self.accounts)))
+		values = [self.filters.company, self.filters.party_type] + self.accounts
+
+		party = self.get_filter_party()
+		if party:
+			conditions += " and po.party = %s"
+			values.append(party)
+
+		return conditions, values
 
 	def get_pdc_details(self):
 		self.pdc_details = frappe._dict()
@@ -539,15 +613,19 @@ class ReceivablePayableReport(object):
 		return self.item_filtered_invoices
 
 	def get_outstanding_amount(self, gle, report_date):
+		# balances are aggregated till report date
 		payment_amount, credit_note_amount = 0.0, 0.0
 
-		for e in self.get_gl_entries_for(gle.party, gle.voucher_type, gle.voucher_no):
-			if getdate(e.posting_date) <= report_date and e.name != gle.name:
-				amount = flt(e.get(self.reverse_dr_or_cr), self.currency_precision) - flt(e.get(self.dr_or_cr), self.currency_precision)
-				if e.voucher_no not in self.return_entries:
-					payment_amount += amount
+		balance = self.get_voucher_balance(gle.party, gle.voucher_type, gle.voucher_no)
+		if balance:
+			payment_amount += balance.payment_amount
+			credit_note_amount += balance.credit_note_amount
+
+			if balance.self_entry and balance.self_entry.name != gle.name:
+				if balance.self_entry.is_credit_note:
+					credit_note_amount += balance.self_entry.amount
 				else:
-					credit_note_amount += amount
+					payment_amount += balance.self_entry.amount
 
 		# for stand alone credit/debit note
 		if gle.voucher_no in self.return_entries and flt(gle.get(self.reverse_dr_or_cr)) - flt(gle.get(self.dr_or_cr) > 0):
@@ -566,14 +644,11 @@ class ReceivablePayableReport(object):
 	def get_employee_advance_outstanding(self, gle, report_date):
 		claimed_amount, payment_amount, return_amount = 0.0, 0.0, 0.0
 
-		for e in self.get_gl_entries_for(gle.party, gle.against_voucher_type, gle.against_voucher):
-			if getdate(e.posting_date) <= report_date:
-				payment_amount += flt(e.debit, self.currency_precision)
-
-				if e.voucher_type == "Expense Claim":
-					claimed_amount += flt(e.credit, self.currency_precision)
-				else:
-					return_amount += flt(e.credit, self.currency_precision)
+		balance = self.get_voucher_balance(gle.party, gle.against_voucher_type, gle.against_voucher)
+		if balance:
+			payment_amount = balance.debit
+			claimed_amount = balance.claimed_amount
+			return_amount = balance.return_amount
 
 		outstanding_amount = payment_amount - claimed_amount - return_amount
 		return outstanding_amount, return_amount, payment_amount
@@ -16,6 +16,8 @@ from erpnext.accounts.utils import get_fiscal_year
 from six import itervalues
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_accounting_dimensions,\
 	get_dimension_with_children
+from erpnext.accounts.doctype.account_balance_snapshot.account_balance_snapshot import get_usable_snapshot_date
+from erpnext.utilities.tree_closure import get_descendants
 
 
 def get_period_list(from_fiscal_year, to_fiscal_year, periodicity, accumulated_values=False,
@@ -148,7 +150,8 @@ def get_data(company, root_type, balance_must_be, period_list, filters=None,
 			period_list[0]["year_start_date"] if only_current_fiscal_year else None,
 			period_list[-1]["to_date"],
 			root.lft, root.rgt, filters,
-			gl_entries_by_account, ignore_closing_entries=ignore_closing_entries
+			gl_entries_by_account, ignore_closing_entries=ignore_closing_entries,
+			period_list=period_list
 		)
 
 	calculate_values(accounts_by_name, gl_entries_by_account, period_list, accumulated_values,
@@ -370,9 +373,14 @@ def sort_accounts(accounts, is_root=False, key="name"):
 
 
 def set_gl_entries_by_account(company, from_date, to_date, root_lft, root_rgt, filters, gl_entries_by_account,
-		ignore_closing_entries=False):
+		ignore_closing_entries=False, period_list=None):
 
-	"""Returns a dict like { "account": [gl entries], ... }"""
+	"""
+		Returns a dict like { "account": [gl entries], ... }
+
+		If period_list is given, months already in Account Balance Snapshot that no period boundary splits
+		are read as monthly totals instead of individual GL Entries
+	"""
 	additional_conditions = get_additional_conditions(from_date, ignore_closing_entries, filters)
 
 	accounts = frappe.db.sql_list("""select name from `tabAccount`
@@ -399,15 +407,32 @@ def set_gl_entries_by_account(company, from_date, to_date, root_lft, root_rgt, f
 					key: value
 				})
 
-		gl_entries = frappe.db.sql("""
-			select posting_date, account, debit, credit, debit_in_account_currency, credit_in_account_currency,
-				is_opening, fiscal_year, account_currency
-			from `tabGL Entry`
-			where company=%(company)s
-				{additional_conditions}
-				and posting_date <= %(to_date)s
-			order by account, posting_date
-		""".format(additional_conditions=additional_conditions), gl_filters, as_dict=True)  #nosec
+		snapshot_date = None
+		if period_list:
+			snapshot_date = get_usable_snapshot_date(company,
+				[from_date, period_list[0].get("year_start_date")] + [d.get("from_date") for d in period_list],
+				[to_date] + [d.get("to_date") for d in period_list], filters)
+
+		tables = [("GL Entry", "")]
+		if snapshot_date:
+			gl_filters["snapshot_date"] = snapshot_date
+			tables = [
+				("Account Balance Snapshot", "and posting_date <= %(snapshot_date)s"),
+				("GL Entry", "and posting_date > %(snapshot_date)s")
+			]
+
+		gl_entries = []
+		for table, snapshot_condition in tables:
+			gl_entries += frappe.db.sql("""
+				select posting_date, account, debit, credit, debit_in_account_currency, credit_in_account_currency,
+					is_opening, fiscal_year, account_currency
+				from `tab{table}`
+				where company=%(company)s
+					{additional_conditions} {snapshot_condition}
+					and posting_date <= %(to_date)s
+				order by account, posting_date
+			""".format(table=table, additional_conditions=additional_conditions,
+				snapshot_condition=snapshot_condition), gl_filters, as_dict=True)  #nosec
 
 		if filters and filters.get('presentation_currency'):
 			convert_to_presentation_currency(gl_entries, get_currency(filters))
@@ -468,10 +493,9 @@ def get_cost_centers_with_children(cost_centers):
 
 	all_cost_centers = []
 	for d in cost_centers:
-		if frappe.db.exists("Cost Center", d):
-			lft, rgt = frappe.db.get_value("Cost Center", d, ["lft", "rgt"])
-			children = frappe.get_all("Cost Center", filters={"lft": [">=", lft], "rgt": ["<=", rgt]})
-			all_cost_centers += [c.name for c in children]
+		children = get_descendants("Cost Center", d)
+		if children:
+			all_cost_centers += children
 		else:
 			frappe.throw(_("Cost Center: {0} does not exist".format(d)))
 
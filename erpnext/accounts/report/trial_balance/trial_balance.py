@@ -7,6 +7,7 @@ from frappe.utils import flt, getdate, formatdate, cstr
 from erpnext.accounts.report.financial_statements \
 	import filter_accounts, set_gl_entries_by_account, filter_out_zero_value_rows
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_accounting_dimensions, get_dimension_with_children
+from erpnext.accounts.doctype.account_balance_snapshot.account_balance_snapshot import get_usable_snapshot_date
 
 
 value_fields = ("opening_debit", "opening_credit", "debit", "credit", "closing_debit", "closing_credit")
@@ -84,7 +85,8 @@ def get_data(filters):
 
 	set_gl_entries_by_account(filters.company, filters.from_date, filters.to_date,
 		min_lft, max_rgt, filters, gl_entries_by_account,
-		ignore_closing_entries=not flt(filters.with_period_closing_entry))
+		ignore_closing_entries=not flt(filters.with_period_closing_entry),
+		period_list=[frappe._dict({"from_date": filters.from_date, "to_date": filters.to_date})])
 
 	total_row = calculate_values(accounts, gl_entries_by_account, opening_balances, filters, company_currency)
 	accumulate_values_into_parents(accounts, accounts_by_name)
@@ -160,21 +162,37 @@ def get_rootwise_opening_balances(filters, report_type):
 
 	additional_conditions = " and {0}".format(" and ".join(additional_conditions)) if additional_conditions else ""
 
-	gle = frappe.db.sql("""
-		select
-			account, sum(debit) as opening_debit, sum(credit) as opening_credit
-		from `tabGL Entry`
-		where
-			company = %(company)s
-			{additional_conditions}
-			and (posting_date < %(from_date)s or is_opening = 'Yes')
-			and account in (select name from `tabAccount` where report_type=%(report_type)s)
-		group by account
-	""".format(additional_conditions=additional_conditions), query_filters, as_dict=True)
+	# monthly totals of months already in Account Balance Snapshot, entries after them
+	tables = [("GL Entry", "")]
+	snapshot_date = get_usable_snapshot_date(filters.company, [filters.from_date, filters.year_start_date], [], filters)
+	if snapshot_date:
+		query_filters["snapshot_date"] = snapshot_date
+		tables = [
+			("Account Balance Snapshot", "and posting_date <= %(snapshot_date)s"),
+			("GL Entry", "and posting_date > %(snapshot_date)s")
+		]
 
 	opening = frappe._dict()
-	for d in gle:
-		opening.setdefault(d.account, d)
+	for table, snapshot_condition in tables:
+		gle = frappe.db.sql("""
+			select
+				account, sum(debit) as opening_debit, sum(credit) as opening_credit
+			from `tab{table}`
+			where
+				company = %(company)s
+				{additional_conditions} {snapshot_condition}
+				and (posting_date < %(from_date)s or is_opening = 'Yes')
+				and account in (select name from `tabAccount` where report_type=%(report_type)s)
+			group by account
+		""".format(table=table, additional_conditions=additional_conditions,
+			snapshot_condition=snapshot_condition), query_filters, as_dict=True)
+
+		for d in gle:
+			opening_data = opening.setdefault(d.account, frappe._dict({
+				'account': d.account, 'opening_debit': 0, 'opening_credit': 0
+			}))
+			opening_data['opening_debit'] += flt(d.opening_debit)
+			opening_data['opening_credit'] += flt(d.opening_credit)
 
 	hooks = frappe.get_hooks('get_opening_account_balances')
 	for method in hooks:
@@ -593,9 +593,16 @@ def unlink_ref_doc_from_payment_entries(ref_doc, validate_permission=False):
 		if not allow_unlink_setting or not has_unlink_role_permission:
 			return
 
+	from erpnext.accounts.doctype.party_outstanding.party_outstanding import get_party_outstanding_keys_for, \
+		update_party_outstanding
+
 	remove_ref_doc_link_from_jv(ref_doc.doctype, ref_doc.name)
 	remove_ref_doc_link_from_pe(ref_doc.doctype, ref_doc.name)
 
+	party_outstanding_keys = get_party_outstanding_keys_for("""(against_voucher_type = %(doctype)s and against_voucher = %(name)s)
+		or (original_against_voucher_type = %(doctype)s and original_against_voucher = %(name)s)""",
+		{"doctype": ref_doc.doctype, "name": ref_doc.name})
+
 	frappe.db.sql("""
 		update `tabGL Entry`
 		set against_voucher_type=original_against_voucher_type, against_voucher=original_against_voucher,
@@ -621,6 +628,8 @@ def unlink_ref_doc_from_payment_entries(ref_doc, validate_permission=False):
 			and voucher_no != ifnull(against_voucher, '')
 	""", (now(), frappe.session.user, ref_doc.doctype, ref_doc.name))
 
+	update_party_outstanding(party_outstanding_keys)
+
 	if ref_doc.doctype in ("Sales Invoice", "Purchase Invoice", "Landed Cost Voucher", "Expense Claim"):
 		ref_doc.set("advances", [])
 
@@ -1,6 +1,8 @@
 # Copyright (c) 2015, Web Notes Technologies Pvt. Ltd. and Contributors
 # MIT License. See license.txt
 
+import sys
+
 import click
 import frappe
 from frappe.commands import pass_context, get_site
@@ -43,6 +45,68 @@ def make_demo(context, site, domain='Manufacturing', days=100,
 			from erpnext.demo import demo
 			demo.make(domain, days)
 
+@click.command('stock-repost-benchmark')
+@click.option('--company', help='Company to generate the ledger in. Default company if not set')
+@click.option('--sles', default=10000, help='Number of Stock Ledger Entries to generate. Default 10000')
+@click.option('--items', default=100, help='Number of Items to generate. Default 100')
+@click.option('--warehouses', default=5, help='Number of Warehouses to generate. Default 5')
+@click.option('--days', default=365, help='Spread the ledger over so many days. Default 365')
+@click.option('--backdated-entries', default=20, help='Number of backdated make_sl_entries calls to time. Default 20')
+@click.option('--balance-lookups', default=200, help='Number of get_stock_balance calls to time. Default 200')
+@click.option('--repack-ratio', default=0.1, help='Share of vouchers that are repack dependency chains. Default 0.1')
+@click.option('--seed', default=0, help='Random seed for the generated ledger')
+@click.option('--keep-data', default=False, is_flag=True, help='Do not delete the generated ledger afterwards')
+@click.option('--output', help='Write the JSON report to this file instead of stdout')
+@pass_context
+def stock_repost_benchmark(context, company=None, sles=10000, items=100, warehouses=5, days=365,
+	backdated_entries=20, balance_lookups=200, repack_ratio=0.1, seed=0, keep_data=False, output=None):
+	"Time stock posting, reposting and stock reports on a synthetic ledger. Use on a test site only"
+	from frappe.utils.response import json_handler
+	import json
+
+	site = get_site(context)
+	with frappe.init_site(site):
+		frappe.connect()
+		from erpnext.stock.benchmark import run_benchmark
+
+		report = run_benchmark(company=company, sles=sles, items=items, warehouses=warehouses, days=days,
+			backdated_entries=backdated_entries, balance_lookups=balance_lookups, repack_ratio=repack_ratio,
+			seed=seed, cleanup=not keep_data)
+
+		report_json = json.dumps(report, indent=1, default=json_handler)
+		if output:
+			with open(output, "w") as f:
+				f.write(report_json)
+		else:
+			print(report_json)
+
+@click.command('rebuild-party-outstanding')
+@click.option('--verify', default=False, is_flag=True, help='Only compare Party Outstanding with GL Entry and list differences')
+@click.option('--company', help='Verify only this company')
+@pass_context
+def rebuild_party_outstanding(context, verify=False, company=None):
+	"Rebuild Party Outstanding from GL Entry, or verify it with --verify"
+	site = get_site(context)
+	with frappe.init_site(site):
+		frappe.connect()
+		from erpnext.accounts.doctype.party_outstanding.party_outstanding import rebuild_party_outstanding, \
+			verify_party_outstanding
+
+		if verify:
+			differences = verify_party_outstanding(company)
+			for d in differences:
+				print("{0}: expected {1}, found {2}".format(" / ".join(d.key), d.expected, d.actual))
+
+			print("{0} differences found".format(len(differences)))
+			if differences:
+				sys.exit(1)
+		else:
+			rebuild_party_outstanding()
+			frappe.db.commit()
+			print("Party Outstanding rebuilt")
+
 commands = [
-	make_demo
+	make_demo,
+	stock_repost_benchmark,
+	rebuild_party_outstanding
 ]
\ No newline at end of file
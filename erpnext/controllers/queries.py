@@ -8,6 +8,7 @@ from frappe.desk.reportview import get_match_cond, get_filters_cond
 from frappe.utils import nowdate, getdate, flt, cstr, cint
 from collections import defaultdict
 from frappe.utils import unique
+from erpnext.stock.doctype.item_search_trigram.item_search_trigram import get_item_search_backend
 
 
 # searches for active employees
@@ -203,9 +204,24 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 
 	# Description Conditions
 	description_cond = ''
+	candidates = None
 	if frappe.db.count('Item', cache=True) < 50000:
 		# scan description only if items are less than 50000
 		description_cond = 'or tabItem.description LIKE %(txt)s'
+	else:
+		# the search index does not cover description, so it is used only when description is not scanned
+		candidates = get_item_search_backend()(txt, searchfield)
+
+	# Search Index Conditions
+	candidates_cond = ''
+	candidates_values = {}
+	barcode_cond = 'tabItem.name IN (select parent from `tabItem Barcode` where barcode LIKE %(txt)s)'
+	if candidates is not None:
+		# match only the candidate items found from the search index
+		candidates_query, candidates_values = candidates
+		candidates_cond = 'and tabItem.name in ({0})'.format(candidates_query)
+		barcode_cond = """exists(select ib.name from `tabItem Barcode` ib
+			where ib.parent = tabItem.name and ib.barcode LIKE %(txt)s)"""
 
 	# Item applicability conditions
 	has_applicable_items_cond = ""
@@ -248,9 +264,10 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 		from tabItem
 		where tabItem.docstatus < 2
 			{default_conditions}
+			{candidates_cond}
 			and (
 				{scond}
-				or tabItem.name IN (select parent from `tabItem Barcode` where barcode LIKE %(txt)s)
+				or {barcode_cond}
 				{description_cond}
 			)
 			{fcond}
@@ -268,14 +285,16 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			fcond=get_filters_cond(doctype, filters, conditions).replace('%', '%%'),
 			mcond=get_match_cond(doctype).replace('%', '%%'),
 			description_cond=description_cond,
+			candidates_cond=candidates_cond,
+			barcode_cond=barcode_cond,
 			has_applicable_items_cond=has_applicable_items_cond),
-			{
+			dict({
 				"today": nowdate(),
 				"txt": "%%%s%%" % txt,
 				"_txt": txt.replace("%", ""),
 				"start": start,
 				"page_len": page_len
-			}, as_dict=as_dict)
+			}, **candidates_values), as_dict=as_dict)
 
 
 @frappe.whitelist()
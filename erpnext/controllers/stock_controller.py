@@ -46,13 +46,17 @@ class StockController(AccountsController):
 			gl_entries = self.get_asset_gl_entry(gl_entries)
 			make_gl_entries(gl_entries, from_repost=from_repost)
 
+	def get_row_serial_nos(self, row, fieldname="serial_no"):
+		"""Returns the Serial Nos in the row's text field as a tuple, parsed once until the text changes"""
+		from erpnext.stock.doctype.serial_no.serial_no import parse_serial_nos
+		return parse_serial_nos(row.get(fieldname))
+
 	def validate_serialized_batch(self):
-		from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
 		for d in self.get("items"):
 			if not (hasattr(d, 'serial_no') and d.serial_no and d.batch_no):
 				continue
 
-			serial_nos = get_serial_nos(d.serial_no)
+			serial_nos = self.get_row_serial_nos(d)
 			for serial_no_data in frappe.get_all("Serial No", filters={"name": ("in", serial_nos)}, fields=["batch_no", "name"]):
 				if serial_no_data.batch_no != d.batch_no:
 					frappe.throw(_("Row #{0}: Serial No {1} does not belong to Batch {2}")
@@ -219,7 +223,7 @@ class StockController(AccountsController):
 					_(self.doctype), self.name, item.get("item_code")))
 
 	def get_sl_entries(self, d, args):
-		from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
+		from erpnext.stock.doctype.serial_no.serial_no import join_serial_nos
 
 		sl_dict = frappe._dict({
 			"item_code": d.get("item_code", None),
@@ -236,7 +240,7 @@ class StockController(AccountsController):
 			"company": self.company,
 			"batch_no": cstr(d.get("batch_no")).strip(),
 			"packing_slip": d.get("packing_slip", None),
-			"serial_no": '\n'.join(get_serial_nos(d.get("serial_no"))),
+			"serial_no": join_serial_nos(self.get_row_serial_nos(d)),
 			"project": d.get("project") or self.get('project'),
 			"is_cancelled": self.docstatus==2 and "Yes" or "No"
 		})
@@ -8,6 +8,7 @@ from frappe.utils import cint, flt, round_based_on_smallest_currency_fraction
 from erpnext.controllers.accounts_controller import validate_conversion_rate
 from erpnext.controllers.transaction_controller import validate_taxes_and_charges, validate_inclusive_tax
 from frappe.utils import money_in_words
+from erpnext.utilities.profiler import profile_phase
 import json
 
 
@@ -17,6 +18,7 @@ class calculate_taxes_and_totals(object):
 		self.calculate()
 		frappe.utils.call_hook_method("calculate_taxes_and_totals", self)
 
+	@profile_phase("calculate_taxes_and_totals")
 	def calculate(self):
 		if not len(self.doc.get("items")):
 			return
@@ -240,6 +242,11 @@ class calculate_taxes_and_totals(object):
 			item.item_tax_detail = {}
 			item.item_taxes = 0
 
+		# parse item tax maps and look up precisions once instead of per item per tax
+		self.round_transaction_currency = self.should_round_transaction_currency()
+		self.tax_rate_precision = self.doc.precision("rate", self.doc.get("taxes")[0]) if self.doc.get("taxes") else None
+		self.item_tax_maps = [self._load_item_tax_rate(item.item_tax_rate) for item in self.doc.get("items")]
+
 	def determine_exclusive_rate(self):
 		for item in self.doc.get("items"):
 			item.cumulated_tax_fraction = 0
@@ -247,9 +254,9 @@ class calculate_taxes_and_totals(object):
 		if not any((cint(tax.included_in_print_rate) for tax in self.doc.get("taxes"))):
 			return
 
-		for item in self.doc.get("items"):
+		for n, item in enumerate(self.doc.get("items")):
 			has_margin_field = item.meta.has_field("margin_type")
-			item_tax_map = self._load_item_tax_rate(item.item_tax_rate)
+			item_tax_map = self.item_tax_maps[n]
 
 			for i, tax in enumerate(self.doc.get("taxes")):
 				tax.tax_fraction_for_current_item = self.get_current_tax_fraction(tax, item_tax_map)
@@ -346,7 +353,7 @@ class calculate_taxes_and_totals(object):
 
 	def _get_tax_rate(self, tax, item_tax_map):
 		if tax.account_head in item_tax_map:
-			return flt(item_tax_map.get(tax.account_head), self.doc.precision("rate", tax))
+			return flt(item_tax_map.get(tax.account_head), self.tax_rate_precision)
 		else:
 			return tax.rate
 
@@ -441,6 +448,150 @@ class calculate_taxes_and_totals(object):
 			self.doc.pos_total_qty = self.doc.total_qty
 
 	def calculate_taxes(self):
+		"""
+			Calculates taxes one tax row at a time over all items, keeping per item values of the tax rows as
+			columns. Arithmetic is done in the same order as calculate_taxes_row_wise, so results are identical.
+		"""
+		if self.doc.flags.row_wise_tax_calculation:
+			return self.calculate_taxes_row_wise()
+
+		self.doc.rounding_adjustment = 0
+		items = self.doc.get("items")
+		taxes = self.doc.get("taxes")
+		last_item = len(items) - 1
+
+		self.tax_columns = []
+		for i, tax in enumerate(taxes):
+			tax_rates = [self._get_tax_rate(tax, item_tax_map) for item_tax_map in self.item_tax_maps]
+			current_tax_amounts = self.get_current_tax_amounts(tax, tax_rates)
+
+			column = frappe._dict({
+				"tax_amount_for_current_item": [],
+				"grand_total_for_current_item": [],
+				"net_total_for_current_item": []
+			})
+			self.tax_columns.append(column)
+
+			# actual tax remaining to be distributed, with divisional loss adjusted to the last item
+			actual_tax = None
+			if tax.charge_type in ["Actual", "Weighted Distribution"]:
+				actual_tax = flt(tax.tax_amount, tax.precision("tax_amount")) if self.round_transaction_currency \
+					else tax.tax_amount
+
+			accumulate_tax_amount = tax.charge_type not in ["Actual", "Weighted Distribution"] and \
+				not (self.discount_amount_applied and self.doc.apply_discount_on=="Grand Total")
+
+			for n, item in enumerate(items):
+				current_tax_amount = current_tax_amounts[n]
+				self.set_item_wise_tax(item, tax, tax_rates[n], current_tax_amount)
+
+				if actual_tax is not None:
+					actual_tax -= current_tax_amount
+					if n == last_item:
+						current_tax_amount += actual_tax
+
+				if accumulate_tax_amount:
+					tax.tax_amount += current_tax_amount
+
+				column.tax_amount_for_current_item.append(current_tax_amount)
+				tax.tax_amount_after_discount_amount += current_tax_amount
+
+				current_tax_amount = self.get_tax_amount_if_for_valuation_or_deduction(current_tax_amount, tax)
+
+				if i==0:
+					column.grand_total_for_current_item.append(flt(item.taxable_amount + current_tax_amount))
+					column.net_total_for_current_item.append(flt(item.net_amount + current_tax_amount))
+				else:
+					column.grand_total_for_current_item.append(
+						flt(self.tax_columns[i-1].grand_total_for_current_item[n] + current_tax_amount))
+					column.net_total_for_current_item.append(
+						flt(self.tax_columns[i-1].net_total_for_current_item[n] + current_tax_amount))
+
+			# values of the last item, as left by the row wise calculation
+			for fieldname, values in column.items():
+				tax.set(fieldname, values[-1])
+
+			self.round_off_totals(tax)
+			self.set_cumulative_total(i, tax)
+
+			self._set_in_company_currency(tax,
+				["total", "displayed_total", "tax_amount", "tax_amount_after_discount_amount"],
+				not self.round_transaction_currency)
+
+			# adjust Discount Amount loss in last tax iteration
+			if i == (len(taxes) - 1) and self.discount_amount_applied \
+				and self.doc.discount_amount and self.doc.apply_discount_on == "Grand Total":
+					new_grand_total = self.doc.grand_total - flt(self.doc.discount_amount)
+					calculated_grand_total = self.doc.net_total + sum([d.tax_amount_after_discount_amount for d in self.doc.taxes])
+					self.doc.rounding_adjustment = flt(new_grand_total - calculated_grand_total,
+						self.doc.precision("rounding_adjustment"))
+
+	def get_current_tax_amounts(self, tax, tax_rates):
+		"""Returns tax amounts of all items for the tax row, before adjustment of divisional loss"""
+		items = self.doc.get("items")
+
+		if tax.charge_type in ["Actual", "Weighted Distribution"]:
+			actual = flt(tax.tax_amount, tax.precision("tax_amount")) if self.round_transaction_currency \
+				else tax.tax_amount
+
+			tax_on_net_total = 0.0
+			if tax.charge_type == "Weighted Distribution":
+				for item, tax_rate in zip(items, tax_rates):
+					tax_on_net_total += (tax_rate / 100) * item.net_amount
+
+			if tax.charge_type == "Actual" or not tax_on_net_total:
+				if self.doc.net_total:
+					return [actual * item.net_amount / self.doc.net_total for item in items]
+				else:
+					return [actual * item.qty / self.doc.total_qty if self.doc.total_qty else 0 for item in items]
+			else:
+				return [actual * (((tax_rate / 100.0) * item.net_amount) / tax_on_net_total)
+					for item, tax_rate in zip(items, tax_rates)]
+
+		elif tax.charge_type == "Manual":
+			manual_distribution = json.loads(tax.manual_distribution_detail or '{}')
+			total_net_amounts = {}
+			for item in items:
+				item_key = item.item_code or item.item_name
+				total_net_amounts[item_key] = total_net_amounts.get(item_key, 0) + item.net_amount
+
+			current_tax_amounts = []
+			for item in items:
+				item_key = item.item_code or item.item_name
+				current_tax_amount = flt(manual_distribution.get(item_key))
+				if self.doc.calculate_tax_on_company_currency:
+					current_tax_amount = current_tax_amount / (self.doc.conversion_rate or 1)
+
+				total_net_amount = total_net_amounts[item_key]
+				current_tax_amount *= item.net_amount / total_net_amount if total_net_amount else 0
+				current_tax_amounts.append(current_tax_amount)
+
+			return current_tax_amounts
+
+		elif tax.charge_type == "On Net Total":
+			if cint(tax.apply_on_net_amount):
+				return [(tax_rate / 100.0) * item.net_amount for item, tax_rate in zip(items, tax_rates)]
+			else:
+				return [(tax_rate / 100.0) * item.taxable_amount for item, tax_rate in zip(items, tax_rates)]
+
+		elif tax.charge_type == "On Previous Row Amount":
+			previous_row = self.tax_columns[cint(tax.row_id) - 1]
+			return [(tax_rate / 100.0) * previous_row.tax_amount_for_current_item[n]
+				for n, tax_rate in enumerate(tax_rates)]
+
+		elif tax.charge_type == "On Previous Row Total":
+			previous_row = self.tax_columns[cint(tax.row_id) - 1]
+			previous_totals = previous_row.net_total_for_current_item if cint(tax.apply_on_net_amount) \
+				else previous_row.grand_total_for_current_item
+			return [(tax_rate / 100.0) * previous_totals[n] for n, tax_rate in enumerate(tax_rates)]
+
+		elif tax.charge_type == "On Item Quantity":
+			return [tax_rate * item.qty for item, tax_rate in zip(items, tax_rates)]
+
+		return [0.0] * len(items)
+
+	def calculate_taxes_row_wise(self):
+		"""Reference implementation of calculate_taxes, looping over taxes for every item"""
 		self.doc.rounding_adjustment = 0
 		# maintain actual tax rate based on idx
 		actual_tax_dict = dict([[tax.idx,
@@ -450,7 +601,7 @@ class calculate_taxes_and_totals(object):
 		# Tax on Net Total for Weighted Distribution
 		weighted_distrubution_tax_on_net_total = {}
 		for n, item in enumerate(self.doc.get("items")):
-			item_tax_map = self._load_item_tax_rate(item.item_tax_rate)
+			item_tax_map = self.item_tax_maps[n]
 			for i, tax in enumerate(self.doc.get("taxes")):
 				if tax.charge_type == "Weighted Distribution":
 					weighted_distrubution_tax_on_net_total.setdefault(tax.idx, 0.0)
@@ -458,7 +609,7 @@ class calculate_taxes_and_totals(object):
 					weighted_distrubution_tax_on_net_total[tax.idx] += (tax_rate / 100) * item.net_amount
 
 		for n, item in enumerate(self.doc.get("items")):
-			item_tax_map = self._load_item_tax_rate(item.item_tax_rate)
+			item_tax_map = self.item_tax_maps[n]
 			for i, tax in enumerate(self.doc.get("taxes")):
 				# tax_amount represents the amount of tax for the current step
 				current_tax_amount = self.get_current_tax_amount(item, tax, item_tax_map, weighted_distrubution_tax_on_net_total)
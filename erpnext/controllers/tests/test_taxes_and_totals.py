@@ -0,0 +1,89 @@
+import json
+import random
+import unittest
+
+import frappe
+from erpnext.controllers.taxes_and_totals import calculate_taxes_and_totals
+
+tax_accounts = ["_Test Account Excise Duty - _TC", "_Test Account Service Tax - _TC", "_Test Account VAT - _TC",
+	"_Test Account Customs Duty - _TC", "_Test Account Shipping Charges - _TC", "_Test Account CST - _TC"]
+
+class TestTaxesAndTotals(unittest.TestCase):
+	def test_columnar_tax_calculation(self):
+		for seed in range(20):
+			for doctype in ("Sales Invoice", "Purchase Invoice"):
+				row_wise = make_invoice(doctype, seed)
+				row_wise.flags.row_wise_tax_calculation = 1
+				calculate_taxes_and_totals(row_wise)
+
+				columnar = make_invoice(doctype, seed)
+				calculate_taxes_and_totals(columnar)
+
+				self.assertEqual(get_calculated_values(columnar), get_calculated_values(row_wise),
+					"{0} of seed {1}".format(doctype, seed))
+
+def make_invoice(doctype, seed):
+	"""Returns an unsaved invoice with random items and taxes, the same for the same seed"""
+	rand = random.Random(seed)
+
+	doc = frappe.new_doc(doctype)
+	doc.company = "_Test Company"
+	doc.currency = "INR"
+	doc.conversion_rate = 1
+	doc.price_list_currency = "INR"
+	doc.plc_conversion_rate = 1
+	if doctype == "Sales Invoice":
+		doc.customer = "_Test Customer"
+	else:
+		doc.supplier = "_Test Supplier"
+
+	for i in range(rand.randint(1, 40)):
+		item_tax_rate = {}
+		for account in rand.sample(tax_accounts, rand.randint(0, 3)):
+			item_tax_rate[account] = rand.choice([0, 5, 12.5, 18])
+
+		doc.append("items", {
+			"item_code": "_Test Item",
+			"qty": rand.choice([1, 2, 3.5, 7, 100]),
+			"rate": rand.choice([0, 0.01, 9.99, 100, 333.33, 12345.67]),
+			"conversion_factor": 1,
+			"item_tax_rate": json.dumps(item_tax_rate)
+		})
+
+	inclusive = rand.random() < 0.3
+	for i, account in enumerate(rand.sample(tax_accounts, rand.randint(1, len(tax_accounts)))):
+		charge_types = ["On Net Total", "On Item Quantity"]
+		if not inclusive:
+			charge_types.append("Actual")
+		if i:
+			charge_types += ["On Previous Row Amount", "On Previous Row Total"]
+
+		tax = {
+			"charge_type": rand.choice(charge_types),
+			"account_head": account,
+			"description": account,
+			"cost_center": "_Test Cost Center - _TC",
+			"rate": rand.choice([0, 2, 5, 12.5, 18]),
+			"tax_amount": rand.choice([0, 10, 99.99]),
+			"included_in_print_rate": 1 if inclusive else 0
+		}
+		if tax["charge_type"].startswith("On Previous Row"):
+			tax["row_id"] = rand.randint(1, i)
+		if doctype == "Purchase Invoice":
+			tax["category"] = "Total"
+			tax["add_deduct_tax"] = "Deduct" if rand.random() < 0.2 else "Add"
+
+		doc.append("taxes", tax)
+
+	if rand.random() < 0.5:
+		doc.apply_discount_on = rand.choice(["Grand Total", "Net Total"])
+		doc.additional_discount_percentage = rand.choice([0, 5, 10])
+
+	return doc
+
+def get_calculated_values(doc):
+	return {
+		"doc": {k: v for k, v in doc.as_dict(no_default_fields=True).items() if not isinstance(v, list)},
+		"items": [d.as_dict(no_default_fields=True) for d in doc.get("items")],
+		"taxes": [d.as_dict(no_default_fields=True) for d in doc.get("taxes")]
+	}
@@ -153,8 +153,6 @@ class TransactionController(StockController):
 
 	def set_missing_item_details(self, for_validate=False):
 		"""set missing item values"""
-		from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
-
 		if self.meta.has_field("items"):
 			parent_dict = self.get_item_details_parent_args()
 
@@ -177,7 +175,7 @@ class TransactionController(StockController):
 						# Ensure that serial numbers are matched against Stock UOM
 						item_conversion_factor = item.get("conversion_factor") or 1.0
 						item_qty = abs(item.get("qty")) * item_conversion_factor
-						if item_qty != len(get_serial_nos(item.get('serial_no'))):
+						if item_qty != len(self.get_row_serial_nos(item)):
 							item.set(fieldname, value)
 
 				if ret.get("pricing_rules"):
@@ -192,6 +192,33 @@ doc_events = {
 	"Contact": {
 		"on_trash": "erpnext.support.doctype.issue.issue.update_issue",
 	},
+	("Quotation", "Sales Order", "Delivery Note", "Sales Invoice",
+			"Supplier Quotation", "Purchase Order", "Purchase Receipt", "Purchase Invoice"): {
+		"on_submit": "erpnext.accounts.doctype.cumulative_item_total.cumulative_item_total.update_cumulative_item_totals",
+		"on_cancel": "erpnext.accounts.doctype.cumulative_item_total.cumulative_item_total.update_cumulative_item_totals",
+		"on_update_after_submit": "erpnext.accounts.doctype.cumulative_item_total.cumulative_item_total.update_cumulative_item_totals",
+	},
+	"Item": {
+		"on_update": ["erpnext.stock.doctype.item_search_trigram.item_search_trigram.update_item_search_index",
+			"erpnext.selling.doctype.pos_catalog_change.pos_catalog_change.log_item_change"],
+		"on_trash": ["erpnext.stock.doctype.item_search_trigram.item_search_trigram.update_item_search_index",
+			"erpnext.selling.doctype.pos_catalog_change.pos_catalog_change.log_item_change"],
+		"after_rename": ["erpnext.stock.doctype.item_search_trigram.item_search_trigram.update_item_search_index",
+			"erpnext.selling.doctype.pos_catalog_change.pos_catalog_change.log_item_change"],
+	},
+	("POS Profile", "Item Group"): {
+		"on_update": "erpnext.selling.doctype.pos_catalog_change.pos_catalog_change.reset_pos_catalog",
+		"on_trash": "erpnext.selling.doctype.pos_catalog_change.pos_catalog_change.reset_pos_catalog",
+		"after_rename": "erpnext.selling.doctype.pos_catalog_change.pos_catalog_change.reset_pos_catalog",
+	},
+	("Item Group", "Brand"): {
+		"after_rename": "erpnext.stock.doctype.item_search_trigram.item_search_trigram.reindex_items_of_renamed_link",
+	},
+	("Item Group", "Customer Group", "Territory", "Supplier Group", "Warehouse", "Cost Center", "Account"): {
+		"on_update": "erpnext.utilities.tree_closure.clear_tree_closure",
+		"on_trash": "erpnext.utilities.tree_closure.clear_tree_closure",
+		"after_rename": "erpnext.utilities.tree_closure.clear_tree_closure",
+	},
 }
 
 naming_series_variables = {
@@ -207,6 +234,11 @@ scheduler_events = {
 		"erpnext.maintenance.doctype.maintenance_schedule.maintenance_schedule.send_maintenance_schedule_reminder_notifications",
 		"erpnext.selling.doctype.customer.customer.send_customer_birthday_notifications",
 	],
+	"cron": {
+		"*/5 * * * *": [
+			"erpnext.stock.doctype.stock_repost_job.stock_repost_job.process_repost_jobs",
+		],
+	},
 	"hourly": [
 		'erpnext.hr.doctype.daily_work_summary_group.daily_work_summary_group.trigger_emails',
 		"erpnext.accounts.doctype.subscription.subscription.process_all",
@@ -244,6 +276,8 @@ scheduler_events = {
 		"erpnext.hr.doctype.leave_ledger_entry.leave_ledger_entry.process_expired_allocation",
 		"erpnext.hr.doctype.leave_encashment.leave_encashment.generate_leave_encashment",
 		"erpnext.maintenance.doctype.maintenance_schedule.maintenance_schedule.auto_schedule_next_project_templates",
+		"erpnext.accounts.doctype.account_balance_snapshot.account_balance_snapshot.build_snapshots_for_all_companies",
+		"erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot.build_snapshots_for_all_companies",
 	],
 	"monthly_long": [
 		"erpnext.accounts.deferred_revenue.convert_deferred_revenue_to_income",
@@ -651,7 +651,8 @@ class BOM(Document):
 
 	def add_exploded_items(self):
 		"Add items to Flat BOM table"
-		if self.docstatus == 1:
+		# with bulk_cost_update the table is written together with other BOMs by the caller
+		if self.docstatus == 1 and not self.flags.bulk_cost_update:
 			frappe.db.sql("""delete from `tabBOM Explosion Item` where parent=%s""", self.name)
 
 		self.set('exploded_items', [])
@@ -665,7 +666,7 @@ class BOM(Document):
 			ch.stock_qty_consumed_per_unit = flt(ch.stock_qty) / flt(self.quantity)
 			ch.docstatus = self.docstatus
 
-			if self.docstatus == 1:
+			if self.docstatus == 1 and not self.flags.bulk_cost_update:
 				ch.db_insert()
 
 	def validate_bom_links(self):
@@ -867,6 +868,11 @@ def get_children(doctype, parent=None, is_root=False, **filters):
 
 
 def get_boms_in_bottom_up_order(bom_no=None):
+	return get_bom_graph().topological_sort(parent_bom=bom_no)
+
+
+def get_bom_graph():
+	"""Returns the graph of active BOMs and their child BOMs"""
 	from erpnext.manufacturing.doctype.bom.bom_tree import BOMGraph
 
 	bom_nos = frappe.db.sql_list("""
@@ -886,9 +892,7 @@ def get_boms_in_bottom_up_order(bom_no=None):
 	for d in bom_edges:
 		bom_graph.add_edge(d.parent, d.child)
 
-	sorted_boms = bom_graph.topological_sort(parent_bom=bom_no)
-
-	return sorted_boms
+	return bom_graph
 
 
 def add_additional_cost(stock_entry, work_order):
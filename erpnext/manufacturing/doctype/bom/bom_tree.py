@@ -1,10 +1,45 @@
 class BOMGraph:
 	def __init__(self, bom_nos):
 		self.graph = {}
+		self.parents = {}
 		self.bom_nos = bom_nos
 
 	def add_edge(self, parent, child):
 		self.graph.setdefault(parent, []).append(child)
+		self.parents.setdefault(child, []).append(parent)
+
+	def get_ancestors(self, bom_nos):
+		"""Returns the BOMs and all BOMs using them, directly or through other BOMs"""
+		ancestors = set()
+		stack = list(bom_nos)
+		while stack:
+			bom_no = stack.pop()
+			if bom_no not in ancestors:
+				ancestors.add(bom_no)
+				stack += self.parents.get(bom_no, [])
+
+		return ancestors
+
+	def get_levels(self, bom_nos):
+		"""
+			Returns the BOMs in levels, each BOM in a level after the levels of all of its child BOMs among them,
+			so that the BOMs of a level do not depend on each other
+		"""
+		bom_nos = set(bom_nos)
+		bom_levels = {}
+		levels = []
+
+		for bom_no in self.topological_sort():
+			if bom_no not in bom_nos:
+				continue
+
+			level = max([bom_levels[child] + 1 for child in self.graph.get(bom_no, []) if child in bom_levels] or [0])
+			bom_levels[bom_no] = level
+			if level == len(levels):
+				levels.append([])
+			levels[level].append(bom_no)
+
+		return levels
 
 	def topological_sort(self, parent_bom=None):
 		visited = set()
@@ -3,13 +3,24 @@
 # For license information, please see license.txt
 
 import frappe, json
-from frappe.utils import cstr, flt
+from frappe.utils import cstr, flt, now
 from frappe import _
 from six import string_types
-from erpnext.manufacturing.doctype.bom.bom import get_boms_in_bottom_up_order
+from erpnext.manufacturing.doctype.bom.bom import get_bom_graph
+from erpnext.utilities.bulk import insert_rows, update_rows
 from frappe.model.document import Document
 import click
 
+bom_cost_fields = ["operating_cost", "base_operating_cost", "additional_operating_cost",
+	"base_additional_operating_cost", "total_operating_cost", "base_total_operating_cost", "raw_material_cost",
+	"base_raw_material_cost", "scrap_material_cost", "base_scrap_material_cost", "total_cost", "base_total_cost",
+	"total_raw_material_qty"]
+bom_item_cost_fields = ["conversion_factor", "stock_qty", "rate", "amount", "base_rate", "base_amount",
+	"qty_consumed_per_unit"]
+
+# BOMs of a level are updated in background jobs of this many BOMs
+bom_cost_chunk_size = 200
+
 
 class BOMUpdateTool(Document):
 	def replace_bom(self):
@@ -103,7 +114,7 @@ def enqueue_update_cost():
 
 def update_latest_price_in_all_boms():
 	if frappe.db.get_single_value("Manufacturing Settings", "update_bom_costs_automatically"):
-		update_cost()
+		update_cost(only_changed=True)
 
 
 def replace_bom(args):
@@ -118,10 +129,192 @@ def replace_bom(args):
 	frappe.db.auto_commit_on_many_writes = 0
 
 
-def update_cost():
-	frappe.db.auto_commit_on_many_writes = 1
-	bom_list = get_boms_in_bottom_up_order()
-	for bom in bom_list:
-		frappe.get_doc("BOM", bom).update_cost(update_parent=False, from_child_bom=True)
-
-	frappe.db.auto_commit_on_many_writes = 0
+def update_cost(only_changed=False):
+	"""
+		Update costs of active BOMs level by level, from sub-assemblies up to finished goods. The BOMs of a level
+		are split between background jobs, and the last job of a level to finish starts the next level.
+
+		With only_changed, only BOMs with raw materials whose stock, prices or details changed since the last
+		update are updated, along with the BOMs using them if their costs change.
+	"""
+	timestamp = now()
+	last_timestamp = frappe.db.get_global("bom_cost_update_timestamp")
+
+	bom_graph = get_bom_graph()
+	if only_changed and last_timestamp:
+		active_boms = set(bom_graph.bom_nos)
+		changed_boms = [d for d in get_boms_with_changed_items(last_timestamp) if d in active_boms]
+		bom_nos = bom_graph.get_ancestors(changed_boms)
+	else:
+		changed_boms = None
+		bom_nos = bom_graph.bom_nos
+
+	rollup = frappe._dict({
+		"levels": bom_graph.get_levels(bom_nos),
+		"changed_boms": changed_boms,
+		"timestamp": timestamp
+	})
+
+	if not rollup.levels:
+		frappe.db.set_global("bom_cost_update_timestamp", timestamp)
+		return
+
+	rollup_id = frappe.generate_hash(length=10)
+	frappe.cache().set_value("bom_cost_rollup::{0}".format(rollup_id), rollup, expires_in_sec=86400)
+	enqueue_bom_cost_level(rollup_id, rollup, 0)
+
+
+def get_boms_with_changed_items(timestamp):
+	"""
+		Returns BOMs with raw materials or scrap items whose stock value, Item, Item Prices or purchases changed
+		since timestamp. Purchases are checked as they update the last purchase rate of Items without changing
+		their modified timestamp
+	"""
+	changed_items = """
+		select item_code from `tabBin` where modified >= %(timestamp)s
+		union select name from `tabItem` where modified >= %(timestamp)s
+		union select item_code from `tabItem Price` where modified >= %(timestamp)s
+	"""
+
+	for purchase_doctype in ("Purchase Order", "Purchase Receipt", "Purchase Invoice"):
+		changed_items += """
+			union select child.item_code
+			from `tab{0} Item` child, `tab{0}` parent
+			where child.parent = parent.name and parent.modified >= %(timestamp)s
+		""".format(purchase_doctype)
+
+	return frappe.db.sql_list("""
+		select distinct parent
+		from `tabBOM Item`
+		where parenttype = 'BOM' and item_code in ({0})
+		union
+		select distinct parent
+		from `tabBOM Scrap Item`
+		where parenttype = 'BOM' and item_code in ({0})
+	""".format(changed_items), {"timestamp": timestamp})
+
+
+def enqueue_bom_cost_level(rollup_id, rollup, level):
+	bom_nos = rollup.levels[level]
+	for start in range(0, len(bom_nos), bom_cost_chunk_size):
+		frappe.enqueue("erpnext.manufacturing.doctype.bom_update_tool.bom_update_tool.update_bom_cost_chunk",
+			rollup_id=rollup_id, level=level, start=start, queue="long", timeout=40000, now=frappe.flags.in_test)
+
+
+def update_bom_cost_chunk(rollup_id, level, start):
+	rollup_key = "bom_cost_rollup::{0}".format(rollup_id)
+	rollup = frappe.cache().get_value(rollup_key)
+	if not rollup:
+		return
+
+	bom_nos = rollup.levels[level][start:start + bom_cost_chunk_size]
+
+	# BOMs with unchanged raw materials are only updated if the cost of one of their child BOMs changed
+	if rollup.changed_boms is not None:
+		updated_boms = [frappe.safe_decode(d) for d in frappe.cache().smembers(rollup_key + "::updated")]
+		bom_nos = get_boms_to_update(bom_nos, set(rollup.changed_boms), updated_boms)
+
+	updated_boms, failed = update_bom_costs(bom_nos)
+	if updated_boms:
+		frappe.cache().sadd(rollup_key + "::updated", *updated_boms)
+		frappe.cache().expire(frappe.cache().make_key(rollup_key + "::updated"), 86400)
+	if failed:
+		frappe.cache().set_value(rollup_key + "::failed", 1, expires_in_sec=86400)
+
+	frappe.db.commit()
+
+	# the last job of the level to finish starts the next level
+	chunks = (len(rollup.levels[level]) + bom_cost_chunk_size - 1) // bom_cost_chunk_size
+	completed_key = frappe.cache().make_key("{0}::{1}::completed".format(rollup_key, level))
+	completed_chunks = frappe.cache().incr(completed_key)
+	frappe.cache().expire(completed_key, 86400)
+	if completed_chunks < chunks:
+		return
+
+	if level + 1 < len(rollup.levels):
+		enqueue_bom_cost_level(rollup_id, rollup, level + 1)
+	else:
+		# BOMs that failed are updated again by the next run
+		if not frappe.cache().get_value(rollup_key + "::failed"):
+			frappe.db.set_global("bom_cost_update_timestamp", rollup.timestamp)
+			frappe.db.commit()
+
+		frappe.cache().delete_value([rollup_key, rollup_key + "::updated", rollup_key + "::failed"]
+			+ ["{0}::{1}::completed".format(rollup_key, i) for i in range(len(rollup.levels))])
+
+
+def get_boms_to_update(bom_nos, changed_boms, updated_boms):
+	if not bom_nos:
+		return []
+
+	boms_with_updated_children = set()
+	if updated_boms:
+		boms_with_updated_children = set(frappe.db.sql_list("""
+			select distinct parent
+			from `tabBOM Item`
+			where parenttype = 'BOM' and parent in %s and bom_no in %s
+		""", (bom_nos, updated_boms)))
+
+	return [d for d in bom_nos if d in changed_boms or d in boms_with_updated_children]
+
+
+def update_bom_costs(bom_nos):
+	"""
+		Recalculate costs of BOMs that do not use each other and write the BOMs whose costs changed in bulk.
+		Returns the changed BOMs and whether any BOM failed.
+	"""
+	bom_rows, bom_item_rows, explosion_rows, updated_boms = [], [], [], []
+	failed = False
+	timestamp = now()
+
+	bom_item_fields = bom_item_cost_fields + [df.fieldname for df in frappe.get_meta("BOM Item").fields
+		if df.fetch_from and df.fetch_from.startswith("item_code.")]
+	explosion_fields = None
+
+	for bom_no in bom_nos:
+		try:
+			bom = frappe.get_doc("BOM", bom_no)
+			existing_costs = get_bom_costs(bom)
+
+			bom.flags.bulk_cost_update = True
+			bom.update_cost(update_parent=False, from_child_bom=True, save=False)
+		except Exception:
+			frappe.log_error(message=frappe.get_traceback(), reference_doctype="BOM", reference_name=bom_no)
+			failed = True
+			continue
+
+		if get_bom_costs(bom) == existing_costs:
+			continue
+
+		updated_boms.append(bom.name)
+		bom_rows.append([bom.name] + [bom.get(f) for f in bom_cost_fields])
+		for d in bom.get("items"):
+			bom_item_rows.append([d.name] + [d.get(f) for f in bom_item_fields])
+
+		for d in bom.get("exploded_items"):
+			d.name = frappe.generate_hash(length=10)
+			d.creation = d.modified = timestamp
+			d.owner = d.modified_by = frappe.session.user
+			row = d.get_valid_dict()
+			explosion_fields = explosion_fields or list(row)
+			explosion_rows.append([row.get(f) for f in explosion_fields])
+
+	if updated_boms:
+		update_rows("BOM", bom_cost_fields, bom_rows)
+		update_rows("BOM Item", bom_item_fields, bom_item_rows)
+		frappe.db.sql("delete from `tabBOM Explosion Item` where parent in %s", [updated_boms])
+		if explosion_rows:
+			insert_rows("BOM Explosion Item", explosion_fields, explosion_rows)
+
+	return updated_boms, failed
+
+
+def get_bom_costs(bom):
+	"""Returns costs of the BOM and rates of its items, rounded as they are stored, to compare before and after"""
+	costs = [flt(bom.get(f), bom.precision(f)) for f in bom_cost_fields]
+	costs += [(d.name, flt(d.rate, d.precision("rate")), flt(d.amount, d.precision("amount")))
+		for d in bom.get("items")]
+	costs += [(d.item_code, d.uom, flt(d.qty, d.precision("qty")), flt(d.rate, d.precision("rate")))
+		for d in bom.get("exploded_items")]
+
+	return costs
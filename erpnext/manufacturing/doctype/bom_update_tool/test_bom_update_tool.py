@@ -4,9 +4,12 @@
 
 import unittest
 import frappe
+from frappe.utils import now
 from erpnext.stock.doctype.item.test_item import create_item
 from erpnext.manufacturing.doctype.production_plan.test_production_plan import make_bom
-from erpnext.manufacturing.doctype.bom_update_tool.bom_update_tool import update_cost
+from erpnext.manufacturing.doctype.bom_update_tool.bom_update_tool import update_cost, get_boms_with_changed_items
+from erpnext.accounts.doctype.purchase_invoice.test_purchase_invoice import make_purchase_invoice
+from erpnext.manufacturing.doctype.bom.bom_tree import BOMGraph
 
 test_records = frappe.get_test_records('BOM')
 
@@ -57,3 +60,59 @@ class TestBOMUpdateTool(unittest.TestCase):
 
 		doc.load_from_db()
 		self.assertEquals(doc.total_cost, 200)
+
+	def test_update_cost_of_changed_items(self):
+		for item in ["BOM Cost Test Item 1", "BOM Cost Test Item 2", "BOM Cost Test Item 3"]:
+			item_doc = create_item(item, valuation_rate=100)
+			if item_doc.valuation_rate != 100.00:
+				frappe.db.set_value("Item", item_doc.name, "valuation_rate", 100)
+
+		bom_no = frappe.db.get_value('BOM', {'item': 'BOM Cost Test Item 1'}, "name")
+		if not bom_no:
+			doc = make_bom(item = 'BOM Cost Test Item 1',
+				raw_materials =['BOM Cost Test Item 2', 'BOM Cost Test Item 3'], currency="INR")
+		else:
+			doc = frappe.get_doc("BOM", bom_no)
+
+		update_cost()
+		doc.load_from_db()
+		self.assertEqual(doc.total_cost, 200)
+
+		frappe.db.set_value("Item", "BOM Cost Test Item 3", "valuation_rate", 150)
+		update_cost(only_changed=True)
+
+		doc.load_from_db()
+		self.assertEqual(doc.total_cost, 250)
+		self.assertEqual(sum([d.amount for d in doc.exploded_items]), 250)
+
+		frappe.db.set_value("Item", "BOM Cost Test Item 3", "valuation_rate", 100)
+		update_cost(only_changed=True)
+
+		doc.load_from_db()
+		self.assertEqual(doc.total_cost, 200)
+
+	def test_purchase_changes_bom_items(self):
+		for item in ["BOM Cost Test Item 1", "BOM Cost Test Item 2", "BOM Cost Test Item 3"]:
+			create_item(item, valuation_rate=100)
+
+		bom_no = frappe.db.get_value('BOM', {'item': 'BOM Cost Test Item 1'}, "name")
+		if not bom_no:
+			bom_no = make_bom(item = 'BOM Cost Test Item 1',
+				raw_materials =['BOM Cost Test Item 2', 'BOM Cost Test Item 3'], currency="INR").name
+
+		timestamp = now()
+		self.assertNotIn(bom_no, get_boms_with_changed_items(timestamp))
+
+		# a purchase invoice not updating stock only changes the last purchase rate of the item
+		make_purchase_invoice(item_code="BOM Cost Test Item 2", rate=120)
+		self.assertIn(bom_no, get_boms_with_changed_items(timestamp))
+
+	def test_bom_graph_levels(self):
+		bom_graph = BOMGraph(["FG", "SA1", "SA2", "RM"])
+		bom_graph.add_edge("FG", "SA1")
+		bom_graph.add_edge("FG", "SA2")
+		bom_graph.add_edge("SA1", "RM")
+
+		self.assertEqual(bom_graph.get_ancestors(["RM"]), {"RM", "SA1", "FG"})
+		self.assertEqual(bom_graph.get_levels(["FG", "SA1", "SA2", "RM"]), [["RM", "SA2"], ["SA1"], ["FG"]])
+		self.assertEqual(bom_graph.get_levels(["FG", "SA1"]), [["SA1"], ["FG"]])
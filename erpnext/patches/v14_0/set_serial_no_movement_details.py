@@ -0,0 +1,20 @@
+import frappe
+
+
+def execute():
+	frappe.reload_doctype("Stock Ledger Entry Serial No")
+
+	frappe.db.sql("""
+		update `tabStock Ledger Entry Serial No` sr
+		inner join `tabStock Ledger Entry` sle on sle.name = sr.parent
+		set sr.item_code = sle.item_code,
+			sr.company = sle.company,
+			sr.warehouse = sle.warehouse,
+			sr.direction = case when sle.actual_qty > 0 then 'In' when sle.actual_qty < 0 then 'Out' else '' end,
+			sr.voucher_type = sle.voucher_type,
+			sr.voucher_no = sle.voucher_no,
+			sr.posting_date = sle.posting_date,
+			sr.posting_time = sle.posting_time,
+			sr.is_cancelled = sle.is_cancelled,
+			sr.creation = sle.creation
+	""")
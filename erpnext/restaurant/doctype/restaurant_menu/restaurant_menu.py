@@ -4,6 +4,7 @@
 
 import frappe
 from frappe.model.document import Document
+from erpnext.stock.doctype.item_price.item_price import clear_item_price_cache
 
 class RestaurantMenu(Document):
 	def validate(self):
@@ -23,7 +24,10 @@ class RestaurantMenu(Document):
 		'''clear all item prices for this menu'''
 		if not price_list:
 			price_list = self.get_price_list().name
+		item_codes = frappe.get_all('Item Price', filters={'price_list': price_list}, pluck='item_code')
 		frappe.db.sql('delete from `tabItem Price` where price_list = %s', price_list)
+		for item_code in set(item_codes):
+			clear_item_price_cache(item_code)
 
 	def make_price_list(self):
 		# create price list for menu
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""
+	POS Catalog Change holds one row per Item, and per Item and Warehouse for stock, whose modified timestamp
+	is the last time the Item's details, prices or stock changed. Point of Sale terminals keep a snapshot of
+	the catalog and ask for Items changed since the version of their snapshot.
+
+	Changes are collected during a transaction and written by a job queued to run after it commits, so that
+	a change is timestamped after the commit of the transaction making it, however long the transaction ran.
+	Changes are logged only while Point of Sale is in use, i.e. there is an enabled POS Profile.
+
+	Changes that affect many Items at once, like a change of POS Profile or of the Item Group tree, change
+	the catalog epoch instead, after which terminals download a new snapshot. The epoch also changes every day,
+	as a snapshot holds the prices valid on the day it was loaded.
+"""
+
+import hashlib
+from datetime import timedelta
+
+import frappe
+from frappe.utils import cstr, get_datetime, now, nowdate
+from frappe.model.document import Document
+
+# changes are read from a while before the version, for changes written while the terminal was reading
+catalog_sync_overlap = 60
+
+
+class POSCatalogChange(Document):
+	pass
+
+
+def is_pos_in_use():
+	in_use = frappe.cache().get_value("pos_in_use")
+	if in_use is None:
+		in_use = 1 if frappe.db.exists("POS Profile", {"disabled": 0}) else 0
+		frappe.cache().set_value("pos_in_use", in_use)
+
+	return in_use
+
+
+def log_pos_catalog_changes(item_codes, warehouse=None):
+	"""Mark the items as changed, or their stock in the warehouse if given, once the transaction commits"""
+	changes = [(item_code, warehouse) for item_code in item_codes if item_code]
+	if not changes or not is_pos_in_use():
+		return
+
+	if frappe.flags.in_test:
+		insert_pos_catalog_changes(changes)
+		return
+
+	# one job per transaction, enqueued with the list it runs with and extended until the transaction commits
+	pending = getattr(frappe.local, "pending_pos_catalog_changes", None)
+	if not pending or pending.jobs is not frappe.flags.enqueue_after_commit:
+		pending = frappe._dict(changes=[])
+		pending.jobs = frappe.enqueue("erpnext.selling.doctype.pos_catalog_change.pos_catalog_change.insert_pos_catalog_changes",
+			queue="short", changes=pending.changes, enqueue_after_commit=True)
+		frappe.local.pending_pos_catalog_changes = pending
+
+	pending.changes.extend(changes)
+
+
+def insert_pos_catalog_changes(changes):
+	changes = list(set([tuple(d) for d in changes]))
+	timestamp = now()
+
+	values = []
+	for item_code, warehouse in changes:
+		name = hashlib.md5("{0}::{1}".format(item_code, cstr(warehouse)).encode("utf-8")).hexdigest()
+		values += [name, timestamp, timestamp, frappe.session.user, frappe.session.user, item_code, warehouse]
+
+	frappe.db.sql("""
+		insert into `tabPOS Catalog Change` (name, creation, modified, owner, modified_by, item_code, warehouse)
+		values {0}
+		on duplicate key update modified = values(modified), modified_by = values(modified_by)
+	""".format(", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(changes))), values)
+
+
+def log_item_change(doc, method=None, old=None, new=None, merge=False):
+	if method == "after_rename":
+		log_pos_catalog_changes([old, new])
+	else:
+		log_pos_catalog_changes([doc.get("item_code") or doc.name])
+
+
+def get_changed_items(version, warehouse=None):
+	"""Returns items changed since the version, including stock changes in the warehouse or in any warehouse"""
+	conditions = ""
+	if warehouse:
+		conditions = "and ifnull(warehouse, '') in ('', %(warehouse)s)"
+
+	return frappe.db.sql_list("""
+		select distinct item_code
+		from `tabPOS Catalog Change`
+		where modified >= %(from_timestamp)s {0}
+	""".format(conditions), {
+		"from_timestamp": get_datetime(version) - timedelta(seconds=catalog_sync_overlap),
+		"warehouse": warehouse
+	})
+
+
+def get_pos_catalog_epoch():
+	epoch = frappe.cache().get_value("pos_catalog_epoch", generator=frappe.generate_hash)
+	return "{0}::{1}".format(epoch, nowdate())
+
+
+def reset_pos_catalog(doc=None, method=None, *args):
+	"""Make terminals download a new catalog snapshot, now and again once the change is committed"""
+	clear_pos_catalog()
+	frappe.enqueue("erpnext.selling.doctype.pos_catalog_change.pos_catalog_change.clear_pos_catalog",
+		queue="short", enqueue_after_commit=True)
+
+
+def clear_pos_catalog():
+	frappe.cache().set_value("pos_catalog_epoch", frappe.generate_hash())
+	frappe.cache().delete_value(["pos_catalog_snapshot", "pos_in_use"])
+
+
+def on_doctype_update():
+	frappe.db.add_index("POS Catalog Change", ["modified"])
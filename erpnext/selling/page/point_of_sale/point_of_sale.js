@@ -1274,15 +1274,180 @@ class POSItems {
 	}
 
 	load_items_data() {
-		// bootstrap with 20 items
-		this.get_items()
-			.then(({ items }) => {
+		this.load_catalog()
+			.then(() => {
+				const items = this.search_catalog();
 				this.all_items = items;
 				this.items = items;
 				this.render_items(items);
 			});
 	}
 
+	get_catalog_key() {
+		return `pos_catalog:${frappe.boot.sitename}:${this.frm.doc.pos_profile || ''}:${this.frm.doc.selling_price_list}`;
+	}
+
+	load_catalog() {
+		// items, prices, stock and barcodes are kept in the terminal, and changes are polled
+		const key = this.get_catalog_key();
+		if (this.catalog && this.catalog.key === key) {
+			return Promise.resolve();
+		}
+
+		let stored = null;
+		try {
+			stored = JSON.parse(localStorage.getItem(key));
+		} catch (e) {
+			stored = null;
+		}
+
+		const loaded = stored ? Promise.resolve(stored) : frappe.call({
+			method: "erpnext.selling.page.point_of_sale.point_of_sale.get_catalog_snapshot",
+			freeze: true,
+			args: {
+				price_list: this.frm.doc.selling_price_list,
+				pos_profile: this.frm.doc.pos_profile
+			}
+		}).then(r => r.message);
+
+		return loaded.then(snapshot => {
+			this.set_catalog(key, snapshot);
+			if (stored) {
+				return this.sync_catalog();
+			}
+		}).then(() => {
+			clearInterval(this.catalog_sync_interval);
+			this.catalog_sync_interval = setInterval(() => this.sync_catalog(), 60000);
+		});
+	}
+
+	set_catalog(key, snapshot) {
+		this.catalog = {
+			key: key,
+			epoch: snapshot.epoch,
+			version: snapshot.version,
+			item_groups: snapshot.item_groups,
+			display_items_in_stock: snapshot.display_items_in_stock,
+			items: {},
+			barcodes: {}
+		};
+
+		snapshot.items.forEach(item => this.update_catalog_item(item));
+		this.store_catalog();
+	}
+
+	update_catalog_item(item) {
+		this.remove_catalog_item(item.item_code);
+		this.catalog.items[item.item_code] = item;
+		(item.barcodes || []).forEach(barcode => {
+			this.catalog.barcodes[barcode] = item.item_code;
+		});
+	}
+
+	remove_catalog_item(item_code) {
+		const item = this.catalog.items[item_code];
+		if (item) {
+			(item.barcodes || []).forEach(barcode => {
+				delete this.catalog.barcodes[barcode];
+			});
+			delete this.catalog.items[item_code];
+		}
+	}
+
+	store_catalog() {
+		const catalog = this.catalog;
+		try {
+			localStorage.setItem(catalog.key, JSON.stringify({
+				epoch: catalog.epoch,
+				version: catalog.version,
+				item_groups: catalog.item_groups,
+				display_items_in_stock: catalog.display_items_in_stock,
+				items: Object.values(catalog.items)
+			}));
+		} catch (e) {
+			// catalog too large for local storage, downloaded again on reload
+		}
+	}
+
+	sync_catalog() {
+		if (!this.catalog || this.syncing_catalog) return Promise.resolve();
+
+		const catalog = this.catalog;
+		this.syncing_catalog = true;
+		return frappe.call({
+			method: "erpnext.selling.page.point_of_sale.point_of_sale.get_catalog_changes",
+			args: {
+				price_list: this.frm.doc.selling_price_list,
+				pos_profile: this.frm.doc.pos_profile,
+				version: catalog.version,
+				epoch: catalog.epoch
+			},
+			// while offline, the terminal keeps selling from the local catalog
+			always: () => {
+				this.syncing_catalog = false;
+			}
+		}).then(r => {
+			const changes = r.message;
+			if (!changes || catalog !== this.catalog) return;
+
+			if (changes.reset) {
+				localStorage.removeItem(catalog.key);
+				this.catalog = null;
+				return this.load_catalog().then(() => this.filter_items(this.get_filters()));
+			}
+
+			if (changes.items.length || changes.removed.length) {
+				changes.items.forEach(item => this.update_catalog_item(item));
+				changes.removed.forEach(item_code => this.remove_catalog_item(item_code));
+				catalog.version = changes.version;
+				this.store_catalog();
+				this.filter_items(this.get_filters());
+			} else {
+				catalog.version = changes.version;
+			}
+		});
+	}
+
+	get_filters() {
+		return {
+			search_term: this.search_field ? this.search_field.get_value() || '' : '',
+			item_group: this.item_group_field ?
+				this.item_group_field.get_value() || this.parent_item_group : this.parent_item_group
+		};
+	}
+
+	search_catalog(search_term='', item_group=this.parent_item_group, page_length=40) {
+		const catalog = this.catalog;
+		const group_range = catalog.item_groups[item_group];
+		const allowed_groups = new Set(Object.keys(catalog.item_groups).filter(name => {
+			const range = catalog.item_groups[name];
+			return !group_range || (range[0] >= group_range[0] && range[1] <= group_range[1]);
+		}));
+
+		search_term = search_term.toLowerCase();
+
+		const items = Object.values(catalog.items).filter(item => {
+			if (!allowed_groups.has(item.item_group)) return false;
+			if (catalog.display_items_in_stock && !(item.actual_qty > 0)) return false;
+
+			return !search_term || item.item_code.toLowerCase().includes(search_term)
+				|| (item.item_name || '').toLowerCase().includes(search_term);
+		});
+
+		items.sort((a, b) => {
+			if (search_term) {
+				const position = item => {
+					const i = item.item_code.toLowerCase().indexOf(search_term);
+					return i === -1 ? 99999 : i;
+				};
+				if (position(a) !== position(b)) return position(a) - position(b);
+			}
+			return b.idx - a.idx;
+		});
+
+		return items.slice(0, page_length);
+	}
+
 	reset_items() {
 		this.wrapper.find('.pos-items').empty();
 		this.init_clusterize();
@@ -1400,6 +1565,25 @@ class POSItems {
 	}
 
 	filter_items({ search_term='', item_group=this.parent_item_group }={}) {
+		if (this.catalog) {
+			const barcode_item = search_term && this.catalog.barcodes[search_term];
+			if (barcode_item) {
+				const items = [this.catalog.items[barcode_item]];
+				this.items = items;
+				this.render_items(items);
+				this.set_item_in_the_cart(items, null, null, search_term);
+				return;
+			}
+
+			const items = this.search_catalog(search_term, item_group);
+			if (items.length || !search_term) {
+				this.items = items;
+				this.render_items(items);
+				return;
+			}
+			// not found in the catalog, search serial and batch nos
+		}
+
 		if (search_term) {
 			search_term = search_term.toLowerCase();
 
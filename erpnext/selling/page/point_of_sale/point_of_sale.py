@@ -3,8 +3,9 @@
 
 import frappe, json
 from frappe.utils.nestedset import get_root_of
-from frappe.utils import cint
+from frappe.utils import cint, nowdate, now, now_datetime, get_datetime, add_to_date
 from erpnext.accounts.doctype.pos_profile.pos_profile import get_item_groups
+from erpnext.selling.doctype.pos_catalog_change.pos_catalog_change import get_pos_catalog_epoch, get_changed_items
 
 from six import string_types
 
@@ -68,13 +69,8 @@ def get_items(start, page_length, price_list, item_group, search_value="", pos_p
 
 	if items_data:
 		items = [d.item_code for d in items_data]
-		item_prices_data = frappe.get_all("Item Price",
-			fields = ["item_code", "price_list_rate", "currency"],
-			filters = {'price_list': price_list, 'item_code': ['in', items]})
-
-		item_prices, bin_data = {}, {}
-		for d in item_prices_data:
-			item_prices[d.item_code] = d
+		item_prices = get_item_prices(price_list, items_data)
+		bin_data = {}
 
 		# prepare filter for bin query
 		bin_filters = {'item_code': ['in', items]}
@@ -132,6 +128,137 @@ def get_items(start, page_length, price_list, item_group, search_value="", pos_p
 
 	return res
 
+def get_item_prices(price_list, items_data):
+	"""Returns {item_code: {price_list_rate, currency}} of the general price valid today in the item's stock uom"""
+	from erpnext.stock.get_item_details import get_item_price
+	from erpnext.stock.doctype.item_price.item_price import get_item_price_intervals
+
+	# load prices of all items together
+	get_item_price_intervals(price_list, [d.item_code for d in items_data])
+	currency = frappe.get_cached_value("Price List", price_list, "currency")
+
+	item_prices = {}
+	for d in items_data:
+		item_price = get_item_price(frappe._dict({"price_list": price_list, "uom": d.stock_uom,
+			"transaction_date": nowdate()}), d.item_code)
+		if item_price:
+			item_prices[d.item_code] = {"price_list_rate": item_price.price_list_rate, "currency": currency}
+
+	return item_prices
+
+@frappe.whitelist()
+def get_catalog_snapshot(price_list, pos_profile=None):
+	"""
+		Returns all items shown in Point of Sale for the POS Profile and price list, with their barcodes, price and
+		stock, for terminals to search locally. The snapshot is shared by terminals until the catalog epoch changes
+		or it is a day old, and terminals get later changes with get_catalog_changes since its version.
+	"""
+	key = "{0}::{1}".format(pos_profile or "", price_list)
+	epoch = get_pos_catalog_epoch()
+
+	snapshot = frappe.cache().hget("pos_catalog_snapshot", key)
+	if snapshot and snapshot.get("epoch") == epoch \
+			and get_datetime(snapshot.get("version")) > add_to_date(now_datetime(), days=-1):
+		return snapshot
+
+	# version is taken before reading, so that changes made while reading are sent again as changes
+	snapshot = {
+		"epoch": epoch,
+		"version": now(),
+		"items": get_catalog_items(price_list, pos_profile),
+		"item_groups": get_catalog_item_groups(),
+		"display_items_in_stock": cint(frappe.db.get_value("POS Profile", pos_profile, "display_items_in_stock"))
+			if pos_profile else 0
+	}
+
+	frappe.cache().hset("pos_catalog_snapshot", key, snapshot)
+	return snapshot
+
+@frappe.whitelist()
+def get_catalog_changes(price_list, version, epoch, pos_profile=None):
+	"""Returns items changed since the version of the terminal's catalog, or reset if it has to be downloaded again"""
+	if epoch != get_pos_catalog_epoch():
+		return {"reset": 1}
+
+	new_version = now()
+	warehouse = frappe.db.get_value("POS Profile", pos_profile, "warehouse") if pos_profile else None
+
+	changed_items = get_changed_items(version, warehouse)
+	items = get_catalog_items(price_list, pos_profile, changed_items) if changed_items else []
+
+	found = set([d.item_code for d in items])
+	return {
+		"epoch": epoch,
+		"version": new_version,
+		"items": items,
+		"removed": [d for d in changed_items if d not in found]
+	}
+
+def get_catalog_items(price_list, pos_profile=None, item_codes=None):
+	warehouse = frappe.db.get_value("POS Profile", pos_profile, "warehouse") if pos_profile else None
+
+	condition = get_item_group_condition(pos_profile).replace("%", "%%") if pos_profile else ""
+	if item_codes:
+		condition += " and name in %(item_codes)s"
+
+	items_data = frappe.db.sql("""
+		SELECT
+			name AS item_code,
+			item_name,
+			item_group,
+			stock_uom,
+			image AS item_image,
+			idx AS idx,
+			is_stock_item
+		FROM
+			`tabItem`
+		WHERE
+			disabled = 0
+				AND has_variants = 0
+				AND is_sales_item = 1
+				{condition}
+		ORDER BY
+			idx desc""".format(condition=condition), {"item_codes": item_codes}, as_dict=1)
+
+	for i in range(0, len(items_data), 1000):
+		set_catalog_item_details(items_data[i:i + 1000], price_list, warehouse)
+
+	return items_data
+
+def set_catalog_item_details(items_data, price_list, warehouse=None):
+	items = [d.item_code for d in items_data]
+	item_prices = get_item_prices(price_list, items_data)
+
+	barcodes = {}
+	for d in frappe.db.sql("""
+		select parent, barcode
+		from `tabItem Barcode`
+		where parenttype = 'Item' and parent in %s
+	""", [items], as_dict=1):
+		barcodes.setdefault(d.parent, []).append(d.barcode)
+
+	bin_filters = {'item_code': ['in', items]}
+	if warehouse:
+		bin_filters['warehouse'] = warehouse
+
+	bin_dict = {}
+	for b in frappe.get_all('Bin', fields=['item_code', 'sum(actual_qty) as actual_qty'],
+			filters=bin_filters, group_by='item_code'):
+		bin_dict[b.item_code] = b.actual_qty
+
+	for item in items_data:
+		item_price = item_prices.get(item.item_code) or {}
+		item.update({
+			'barcodes': barcodes.get(item.item_code, []),
+			'price_list_rate': item_price.get('price_list_rate'),
+			'currency': item_price.get('currency'),
+			'actual_qty': bin_dict.get(item.item_code),
+		})
+
+def get_catalog_item_groups():
+	"""Returns {item_group: [lft, rgt]} for filtering items by item group in the terminal"""
+	return {d.name: [d.lft, d.rgt] for d in frappe.get_all("Item Group", fields=["name", "lft", "rgt"])}
+
 @frappe.whitelist()
 def search_serial_or_batch_or_barcode_number(search_value):
 	# search barcode no
@@ -128,8 +128,17 @@ class ItemDefaultRule(Document):
 
 def get_item_default_values(item, transaction=None):
 	filters = get_filters_dict(item, transaction)
-	applicable_rules = get_applicable_rules_for_filters(filters)
-	return get_default_values_dict(applicable_rules)
+
+	# computed once for the rows of get_items_details
+	batch = frappe.flags.item_details_batch
+	if batch is not None:
+		key = ("item_default_values", tuple(sorted(filters.items())))
+		if key not in batch:
+			batch[key] = get_default_values_for_filters(filters)
+
+		return frappe._dict(batch[key])
+
+	return get_default_values_for_filters(filters)
 
 
 def get_default_values_for_filters(filters):
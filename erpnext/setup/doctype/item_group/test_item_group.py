@@ -5,6 +5,7 @@ import unittest
 import frappe
 from frappe.utils.nestedset import NestedSetRecursionError, NestedSetMultipleRootsError, \
 	NestedSetChildExistsError, NestedSetInvalidMergeError, rebuild_tree, get_ancestors_of
+from erpnext.utilities.tree_closure import get_ancestors, get_descendants
 
 test_records = frappe.get_test_records('Item Group')
 
@@ -99,6 +100,24 @@ class TestItem(unittest.TestCase):
 
 		self.move_it_back()
 
+	def test_tree_closure_after_move(self):
+		def assert_tree_closure():
+			for d in frappe.get_all("Item Group", fields=["name", "lft", "rgt"]):
+				self.assertEqual(set(get_ancestors("Item Group", d.name)), set(frappe.get_all("Item Group",
+					filters={"lft": ["<=", d.lft], "rgt": [">=", d.rgt]}, pluck="name")))
+				self.assertEqual(get_descendants("Item Group", d.name), frappe.get_all("Item Group",
+					filters={"lft": [">=", d.lft], "rgt": ["<=", d.rgt]}, order_by="lft", pluck="name"))
+
+		assert_tree_closure()
+
+		group_b = frappe.get_doc("Item Group", "_Test Item Group B")
+		group_b.parent_item_group = "_Test Item Group C"
+		group_b.save()
+		assert_tree_closure()
+
+		self.move_it_back()
+		assert_tree_closure()
+
 	def test_move_group_into_root(self):
 		group_b = frappe.get_doc("Item Group", "_Test Item Group B")
 		group_b.parent_item_group = ""
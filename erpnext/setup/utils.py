@@ -49,6 +49,9 @@ def before_tests():
 	frappe.db.sql("delete from `tabSalary Slip`")
 	frappe.db.sql("delete from `tabItem Price`")
 
+	from erpnext.stock.doctype.item_price.item_price import clear_item_price_cache
+	clear_item_price_cache()
+
 	frappe.db.set_value("Stock Settings", None, "auto_insert_price_list_rate_if_missing", 0)
 	enable_all_roles_and_domains()
 
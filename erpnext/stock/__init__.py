@@ -50,7 +50,9 @@ def get_warehouse_account(warehouse, warehouse_account=None):
 				account = warehouse_account.get(warehouse.parent_warehouse).account
 			else:
 				from frappe.utils.nestedset import rebuild_tree
+				from erpnext.utilities.tree_closure import invalidate_tree_closure
 				rebuild_tree("Warehouse", "parent_warehouse")
+				invalidate_tree_closure("Warehouse")
 		else:
 			account = frappe.db.sql("""
 				select
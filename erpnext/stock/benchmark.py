@@ -0,0 +1,420 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+"""
+	Stock repost benchmark
+
+	Generates a synthetic stock ledger (items, warehouses, batches, serial nos and
+	repack dependency chains) on a test site and measures wall time, queries issued
+	and rows touched by the stock posting and reporting hot paths.
+
+	Usage: bench --site test_site stock-repost-benchmark --sles 100000
+
+	It runs only on sites with allow_tests or developer_mode set in site_config.json.
+"""
+
+import random
+import time
+
+import frappe
+import erpnext
+from frappe import _
+from frappe.utils import add_days, cint, flt, getdate, nowdate, now_datetime, random_string
+from erpnext.utilities.profiler import QueryCounter
+from erpnext.utilities.bulk import insert_rows
+from erpnext.accounts.doctype.account_balance_snapshot.account_balance_snapshot import \
+	invalidate_account_balance_snapshots
+
+BENCHMARK_PREFIX = "_Bench"
+
+
+def measure(name, fn, *args, **kwargs):
+	start = time.perf_counter()
+	with QueryCounter() as counter:
+		out = fn(*args, **kwargs)
+
+	result = frappe._dict({
+		"name": name,
+		"time": round(time.perf_counter() - start, 4),
+		"queries": counter.queries,
+		"rows": counter.rows,
+	})
+
+	if isinstance(out, dict):
+		result.update(out)
+
+	return result
+
+
+class SyntheticStockLedger(object):
+	def __init__(self, company, sles=10000, items=100, warehouses=5, days=365,
+			batch_item_ratio=0.2, serial_item_ratio=0.05, repack_ratio=0.1, seed=0):
+		self.company = company
+		self.abbr = frappe.get_cached_value("Company", company, "abbr")
+		self.sle_count = cint(sles)
+		self.item_count = max(cint(items), 2)
+		self.warehouse_count = max(cint(warehouses), 1)
+		self.days = max(cint(days), 1)
+		self.batch_item_ratio = flt(batch_item_ratio)
+		self.serial_item_ratio = flt(serial_item_ratio)
+		self.repack_ratio = flt(repack_ratio)
+		self.random = random.Random(seed)
+
+		self.run_id = random_string(6).upper()
+		self.items = []
+		self.item_map = {}
+		self.warehouses = []
+		self.batches = {}
+		self.fiscal_years = {}
+
+		self.sle_rows = []
+		self.dependency_rows = []
+		self.serial_no_rows = []
+		self.voucher_rows = []
+		self.serial_nos = []
+
+		# running balances to avoid generating negative stock
+		self.bin_qty = {}
+		self.bin_serial_nos = {}
+
+	def make(self):
+		self.make_items()
+		self.make_warehouses()
+		self.make_batches()
+		self.make_sl_entries()
+		self.insert_ledger()
+
+		return frappe._dict({
+			"items": len(self.items),
+			"warehouses": len(self.warehouses),
+			"batches": sum(len(d) for d in self.batches.values()),
+			"serial_nos": len(self.serial_nos),
+			"sles": len(self.sle_rows),
+			"dependencies": len(self.dependency_rows),
+		})
+
+	def make_items(self):
+		item_group = frappe.db.get_single_value("Stock Settings", "item_group") or "All Item Groups"
+		stock_uom = frappe.db.get_single_value("Stock Settings", "stock_uom") or "Nos"
+
+		for i in range(self.item_count):
+			has_serial_no = self.random.random() < self.serial_item_ratio
+			has_batch_no = not has_serial_no and self.random.random() < self.batch_item_ratio
+
+			item = frappe.get_doc({
+				"doctype": "Item",
+				"item_code": "{0} Item {1} {2:06d}".format(BENCHMARK_PREFIX, self.run_id, i),
+				"item_name": "{0} Item {1:06d}".format(BENCHMARK_PREFIX, i),
+				"item_group": item_group,
+				"stock_uom": stock_uom,
+				"is_stock_item": 1,
+				"has_batch_no": cint(has_batch_no),
+				"has_serial_no": cint(has_serial_no),
+				"valuation_method": self.random.choice(["FIFO", "Moving Average"]),
+			})
+			item.flags.ignore_mandatory = True
+			item.insert(ignore_permissions=True)
+
+			self.items.append(frappe._dict({
+				"item_code": item.name,
+				"stock_uom": stock_uom,
+				"has_batch_no": has_batch_no,
+				"has_serial_no": has_serial_no,
+			}))
+			self.item_map[item.name] = self.items[-1]
+
+	def make_warehouses(self):
+		for i in range(self.warehouse_count):
+			warehouse = frappe.get_doc({
+				"doctype": "Warehouse",
+				"warehouse_name": "{0} Warehouse {1} {2:03d}".format(BENCHMARK_PREFIX, self.run_id, i),
+				"company": self.company,
+			})
+			warehouse.insert(ignore_permissions=True)
+			self.warehouses.append(warehouse.name)
+
+	def make_batches(self):
+		for item in self.items:
+			if not item.has_batch_no:
+				continue
+
+			for i in range(3):
+				batch = frappe.get_doc({
+					"doctype": "Batch",
+					"batch_id": "{0}-{1}-{2}".format(item.item_code, self.run_id, i),
+					"item": item.item_code,
+				})
+				batch.insert(ignore_permissions=True)
+				self.batches.setdefault(item.item_code, []).append(batch.name)
+
+	def make_sl_entries(self):
+		start_date = add_days(nowdate(), -self.days)
+		timestamps = sorted(
+			(self.random.randint(0, self.days - 1), self.random.randint(0, 86399))
+			for i in range(self.sle_count)
+		)
+
+		voucher_no = 0
+		index = 0
+		while index < len(timestamps):
+			day, seconds = timestamps[index]
+			posting_date = getdate(add_days(start_date, day))
+			posting_time = "{0:02d}:{1:02d}:{2:02d}".format(seconds // 3600, (seconds // 60) % 60, seconds % 60)
+			voucher_no += 1
+
+			if index + 1 < len(timestamps) and self.random.random() < self.repack_ratio:
+				index += self.make_repack_entries(voucher_no, posting_date, posting_time)
+			else:
+				index += self.make_single_entry(voucher_no, posting_date, posting_time)
+
+	def make_single_entry(self, voucher_no, posting_date, posting_time):
+		item = self.random.choice(self.items)
+		warehouse = self.random.choice(self.warehouses)
+		batch_no = self.random.choice(self.batches[item.item_code]) if item.has_batch_no else None
+
+		balance = self.bin_qty.get((item.item_code, warehouse, batch_no), 0)
+		if balance > 0 and self.random.random() < 0.5:
+			qty = -self.random.randint(1, min(balance, 10))
+		else:
+			qty = self.random.randint(1, 10)
+
+		self.add_sle(voucher_no, posting_date, posting_time, item, warehouse, batch_no, qty,
+			incoming_rate=self.random.choice([10, 12.5, 15, 20]) if qty > 0 else 0)
+		return 1
+
+	def make_repack_entries(self, voucher_no, posting_date, posting_time):
+		"""Consume a raw material with stock and produce a finished good valued from it"""
+		candidates = [key for key, qty in self.bin_qty.items() if qty > 0]
+		if not candidates:
+			return self.make_single_entry(voucher_no, posting_date, posting_time)
+
+		item_code, warehouse, batch_no = self.random.choice(candidates)
+		raw_material = self.item_map[item_code]
+		finished_good = self.random.choice([d for d in self.items if d.item_code != item_code])
+		fg_warehouse = self.random.choice(self.warehouses)
+		fg_batch_no = self.random.choice(self.batches[finished_good.item_code]) if finished_good.has_batch_no else None
+
+		qty = self.random.randint(1, min(self.bin_qty[(item_code, warehouse, batch_no)], 10))
+		rm_sle = self.add_sle(voucher_no, posting_date, posting_time, raw_material, warehouse, batch_no, -qty)
+		fg_sle = self.add_sle(voucher_no, posting_date, posting_time, finished_good, fg_warehouse, fg_batch_no,
+			self.random.randint(1, 10))
+
+		self.dependency_rows.append((
+			frappe.generate_hash(length=10), fg_sle[0], "Stock Ledger Entry", "dependencies", 1, 1,
+			rm_sle[8], rm_sle[9], rm_sle[10], "Amount", 100, ""
+		))
+		return 2
+
+	def add_sle(self, voucher_no, posting_date, posting_time, item, warehouse, batch_no, qty, incoming_rate=0):
+		voucher_no = "{0}-SE-{1}-{2:08d}".format(BENCHMARK_PREFIX, self.run_id, voucher_no)
+		name = frappe.generate_hash(length=10)
+
+		serial_nos = self.get_serial_nos(item, warehouse, qty) if item.has_serial_no else []
+		if serial_nos:
+			qty = len(serial_nos) if qty > 0 else -len(serial_nos)
+
+		bin_key = (item.item_code, warehouse, batch_no)
+		self.bin_qty[bin_key] = self.bin_qty.get(bin_key, 0) + qty
+
+		row = (
+			name, now_datetime(), now_datetime(), "Administrator", "Administrator", 1,
+			item.item_code, warehouse,
+			"Stock Entry", voucher_no, frappe.generate_hash(length=10),
+			batch_no, "\n".join(serial_nos), posting_date, posting_time,
+			qty, incoming_rate, item.stock_uom, self.company, self.get_fiscal_year(posting_date), "No", 0
+		)
+		self.sle_rows.append(row)
+
+		if not self.voucher_rows or self.voucher_rows[-1][0] != voucher_no:
+			self.voucher_rows.append((voucher_no, now_datetime(), now_datetime(), "Administrator", "Administrator",
+				1, self.company, posting_date, posting_time))
+
+		for serial_no in serial_nos:
+			self.serial_no_rows.append((frappe.generate_hash(length=10), now_datetime(), name, "Stock Ledger Entry",
+				"serial_numbers", 1, serial_no, item.item_code, self.company, warehouse, "In" if qty > 0 else "Out",
+				"Stock Entry", voucher_no, posting_date, posting_time, "No"))
+
+		return row
+
+	def get_serial_nos(self, item, warehouse, qty):
+		available = self.bin_serial_nos.setdefault((item.item_code, warehouse), [])
+		if qty < 0:
+			serial_nos = available[:abs(qty)]
+			del available[:abs(qty)]
+		else:
+			serial_nos = ["{0}-{1}-{2:08d}".format(BENCHMARK_PREFIX, self.run_id, len(self.serial_nos) + i)
+				for i in range(qty)]
+			self.serial_nos += [(d, item.item_code) for d in serial_nos]
+			available += serial_nos
+
+		return serial_nos
+
+	def get_fiscal_year(self, posting_date):
+		from erpnext.accounts.utils import get_fiscal_year
+
+		if posting_date not in self.fiscal_years:
+			self.fiscal_years[posting_date] = get_fiscal_year(posting_date, company=self.company)[0]
+		return self.fiscal_years[posting_date]
+
+	def insert_ledger(self):
+		insert_rows("Stock Entry", ["name", "creation", "modified", "owner", "modified_by",
+			"docstatus", "company", "posting_date", "posting_time"], self.voucher_rows)
+
+		insert_rows("Serial No", ["name", "creation", "modified", "owner", "modified_by", "serial_no",
+			"item_code", "company"],
+			[(d[0], now_datetime(), now_datetime(), "Administrator", "Administrator", d[0], d[1], self.company)
+				for d in self.serial_nos])
+
+		insert_rows("Stock Ledger Entry", ["name", "creation", "modified", "owner", "modified_by", "docstatus",
+			"item_code", "warehouse", "voucher_type", "voucher_no", "voucher_detail_no", "batch_no", "serial_no",
+			"posting_date", "posting_time", "actual_qty", "incoming_rate", "stock_uom", "company", "fiscal_year",
+			"is_cancelled", "is_processed"], self.sle_rows)
+
+		insert_rows("Stock Ledger Entry Serial No", ["name", "creation", "parent", "parenttype", "parentfield", "idx",
+			"docstatus", "serial_no", "item_code", "company", "warehouse", "direction", "voucher_type", "voucher_no",
+			"posting_date", "posting_time", "is_cancelled"], [d[:6] + (1,) + d[6:] for d in self.serial_no_rows])
+
+		insert_rows("Stock Ledger Entry Dependency", ["name", "parent", "parenttype", "parentfield", "idx",
+			"docstatus", "dependent_voucher_type", "dependent_voucher_no", "dependent_voucher_detail_no",
+			"dependency_type", "dependency_percentage", "dependency_qty_filter"], self.dependency_rows)
+
+		frappe.db.commit()
+
+	def get_bins(self):
+		return sorted(set((d[6], d[7]) for d in self.sle_rows))
+
+	def repost_all(self):
+		from erpnext.stock.stock_ledger import update_entries_after
+
+		bins = self.get_bins()
+		sles_reposted = 0
+		for item_code, warehouse in bins:
+			repost = update_entries_after({"item_code": item_code, "warehouse": warehouse},
+				allow_negative_stock=1)
+			sles_reposted += repost.get_repost_summary().sles_reposted
+
+		frappe.db.commit()
+		return {"calls": len(bins), "sles_reposted": sles_reposted}
+
+	def make_backdated_entries(self, count):
+		"""Post backdated receipts in the middle of the ledger, reposting all entries after them"""
+		from erpnext.stock.stock_ledger import make_sl_entries
+
+		items = [d for d in self.items if not d.has_batch_no and not d.has_serial_no]
+		if not items:
+			return {"calls": 0}
+
+		for i in range(count):
+			item = self.random.choice(items)
+			posting_date = add_days(nowdate(), -self.random.randint(1, self.days))
+			voucher_no = "{0}-SE-{1}-B{2:06d}".format(BENCHMARK_PREFIX, self.run_id, i)
+			insert_rows("Stock Entry", ["name", "creation", "modified", "owner", "modified_by", "docstatus",
+				"company", "posting_date", "posting_time"],
+				[(voucher_no, now_datetime(), now_datetime(), "Administrator", "Administrator", 1,
+					self.company, posting_date, "12:00:00")])
+
+			make_sl_entries([frappe._dict({
+				"item_code": item.item_code,
+				"warehouse": self.random.choice(self.warehouses),
+				"posting_date": posting_date,
+				"posting_time": "12:00:00",
+				"voucher_type": "Stock Entry",
+				"voucher_no": voucher_no,
+				"voucher_detail_no": frappe.generate_hash(length=10),
+				"actual_qty": 1,
+				"incoming_rate": 10,
+				"stock_uom": item.stock_uom,
+				"company": self.company,
+				"fiscal_year": self.get_fiscal_year(getdate(posting_date)),
+				"is_cancelled": "No",
+			})], allow_negative_stock=True)
+
+		frappe.db.commit()
+		return {"calls": count}
+
+	def get_stock_balances(self, count):
+		from erpnext.stock.utils import get_stock_balance
+
+		bins = self.get_bins()
+		for i in range(count):
+			item_code, warehouse = self.random.choice(bins)
+			get_stock_balance(item_code, warehouse,
+				posting_date=add_days(nowdate(), -self.random.randint(0, self.days)), with_valuation_rate=True)
+
+		return {"calls": count}
+
+	def run_stock_balance_report(self):
+		from erpnext.stock.report.stock_balance.stock_balance import execute
+
+		columns, data = execute(frappe._dict({
+			"company": self.company,
+			"from_date": add_days(nowdate(), -self.days),
+			"to_date": nowdate(),
+		}))[:2]
+		return {"calls": 1, "result_rows": len(data)}
+
+	def run_stock_ledger_report(self):
+		from erpnext.stock.report.stock_ledger.stock_ledger import execute
+
+		columns, data = execute(frappe._dict({
+			"company": self.company,
+			"from_date": add_days(nowdate(), -self.days),
+			"to_date": nowdate(),
+		}))[:2]
+		return {"calls": 1, "result_rows": len(data)}
+
+	def cleanup(self):
+		like = "{0}%{1}%".format(BENCHMARK_PREFIX, self.run_id)
+		for doctype in ("Stock Ledger Entry Serial No", "Stock Ledger Entry Dependency"):
+			frappe.db.sql("""
+				delete ch from `tab{0}` ch
+				inner join `tabStock Ledger Entry` sle on sle.name = ch.parent
+				where sle.item_code like %s
+			""".format(doctype), like)
+
+		for doctype, fieldname in (("Stock Ledger Entry", "item_code"), ("Bin", "item_code"),
+				("Serial No", "item_code"), ("Batch", "item"), ("Stock Entry", "name"),
+				("Stock Repost Job", "item_code"), ("Item Search Trigram", "item_code"),
+				("POS Catalog Change", "item_code"), ("Cumulative Item Total", "item_code"),
+				("Stock Balance Snapshot", "item_code"), ("Item", "name"), ("Warehouse", "name")):
+			frappe.db.sql("delete from `tab{0}` where `{1}` like %s".format(doctype, fieldname), like)
+
+		# snapshots built while the ledger existed are rebuilt without it
+		invalidate_account_balance_snapshots(self.company, add_days(nowdate(), -self.days))
+
+		frappe.db.commit()
+
+
+def run_benchmark(company=None, sles=10000, items=100, warehouses=5, days=365, backdated_entries=20,
+		balance_lookups=200, repack_ratio=0.1, seed=0, cleanup=True):
+	if not (frappe.conf.get("allow_tests") or frappe.conf.get("developer_mode")):
+		frappe.throw(_("The stock repost benchmark can only be run on a site with allow_tests or developer_mode set"))
+
+	company = company or erpnext.get_default_company() or frappe.db.get_value("Company", {}, "name")
+
+	ledger = SyntheticStockLedger(company, sles=sles, items=items, warehouses=warehouses, days=days,
+		repack_ratio=repack_ratio, seed=seed)
+
+	report = frappe._dict({
+		"site": frappe.local.site,
+		"config": {
+			"company": company, "sles": cint(sles), "items": cint(items), "warehouses": cint(warehouses),
+			"days": cint(days), "backdated_entries": cint(backdated_entries),
+			"balance_lookups": cint(balance_lookups), "repack_ratio": flt(repack_ratio), "seed": seed,
+		},
+		"results": [],
+	})
+
+	try:
+		report.results.append(measure("generate_ledger", ledger.make))
+		report.results.append(measure("update_entries_after", ledger.repost_all))
+		report.results.append(measure("make_sl_entries", ledger.make_backdated_entries, cint(backdated_entries)))
+		report.results.append(measure("get_stock_balance", ledger.get_stock_balances, cint(balance_lookups)))
+		report.results.append(measure("stock_balance_report", ledger.run_stock_balance_report))
+		report.results.append(measure("stock_ledger_report", ledger.run_stock_ledger_report))
+	finally:
+		if cleanup:
+			frappe.db.rollback()
+			ledger.cleanup()
+
+	return report
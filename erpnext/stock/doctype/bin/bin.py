@@ -2,7 +2,7 @@
 # License: GNU General Public License v3. See license.txt
 
 import frappe
-from frappe.utils import flt, nowdate
+from frappe.utils import flt, cint, nowdate
 import frappe.defaults
 from frappe.model.document import Document
 
@@ -35,7 +35,8 @@ class Bin(Document):
 				"creation": args.get("creation"),
 				"sle_id": args.get("sle_id"),
 				"voucher_no": args.get("voucher_no")
-			}, allow_negative_stock=allow_negative_stock, via_landed_cost_voucher=via_landed_cost_voucher)
+			}, allow_negative_stock=allow_negative_stock, via_landed_cost_voucher=via_landed_cost_voucher,
+				defer_future_entries=cint(frappe.db.get_single_value("Stock Settings", "repost_in_background", cache=True)))
 
 	def update_qty(self, args):
 		# update the stock values (for current quantities)
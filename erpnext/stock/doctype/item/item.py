@@ -24,6 +24,7 @@ from erpnext.controllers.item_variant import (
 	validate_item_variant_attributes
 )
 from erpnext.setup.doctype.uom_conversion_factor.uom_conversion_factor import UOMConversionGraph
+from erpnext.stock.doctype.item_price.item_price import clear_item_price_cache
 from frappe.utils.html_utils import clean_html
 from frappe.model.document import Document
 import json
@@ -388,6 +389,9 @@ class Item(Document):
 			where item_code=%s
 		""", (self.item_name, self.description, self.item_group, self.brand, self.name))
 
+		# cached prices include the item's uoms
+		clear_item_price_cache(self.name)
+
 	def update_serial_no(self):
 		if self.has_serial_no:
 			frappe.db.sql("update `tabSerial No` set item_name=%s, item_group=%s, brand=%s where item_code=%s",
@@ -405,6 +409,7 @@ class Item(Document):
 	def on_trash(self):
 		frappe.db.sql("""delete from tabBin where item_code=%s""", self.name)
 		frappe.db.sql("delete from `tabItem Price` where item_code=%s", self.name)
+		clear_item_price_cache(self.name)
 		for variant_of in frappe.get_all("Item", filters={"variant_of": self.name}):
 			frappe.delete_doc("Item", variant_of.name)
 
@@ -427,6 +432,8 @@ class Item(Document):
 			self.validate_duplicate_item_in_stock_reconciliation(old_name, new_name)
 
 		frappe.db.set_value("Item", new_name, "item_code", new_name)
+		clear_item_price_cache(old_name)
+		clear_item_price_cache(new_name)
 
 		if merge:
 			self.set_last_purchase_rate(new_name)
@@ -13,6 +13,10 @@ from erpnext.stock.doctype.item.item import get_uom_conv_factor
 from frappe.model.rename_doc import rename_doc
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
 from erpnext.stock.get_item_details import get_item_details
+from erpnext.stock.doctype.item_price.item_price import clear_item_price_cache
+from erpnext.stock.doctype.item_search_trigram.item_search_trigram import (build_item_search_index,
+	clear_item_search_index, get_item_search_candidates)
+from erpnext.controllers.queries import item_query
 
 from six import iteritems
 
@@ -58,6 +62,7 @@ class TestItem(unittest.TestCase):
 	def test_get_item_details(self):
 		# delete modified item price record and make as per test_records
 		frappe.db.sql("""delete from `tabItem Price`""")
+		clear_item_price_cache()
 
 		to_check = {
 			"item_code": "_Test Item",
@@ -104,6 +109,36 @@ class TestItem(unittest.TestCase):
 		for key, value in iteritems(to_check):
 			self.assertEqual(value, details.get(key))
 
+	def test_get_items_details(self):
+		from erpnext.stock.get_item_details import get_items_details
+
+		make_test_objects("Item Price")
+
+		args = {
+			"company": "_Test Company",
+			"price_list": "_Test Price List",
+			"currency": "_Test Currency",
+			"doctype": "Sales Order",
+			"conversion_rate": 1,
+			"price_list_currency": "_Test Currency",
+			"plc_conversion_rate": 1,
+			"order_type": "Sales",
+			"customer": "_Test Customer",
+			"conversion_factor": 1,
+			"price_list_uom_dependant": 1,
+			"ignore_pricing_rule": 1
+		}
+		items = [{"item_code": "_Test Item", "qty": 1}, {"item_code": "_Test Item 2", "qty": 2},
+			{"item_code": "_Test Item", "qty": 3, "warehouse": "_Test Warehouse 1 - _TC"}]
+
+		out = get_items_details(args, items)
+		self.assertEqual(len(out), len(items))
+
+		for item, details in zip(items, out):
+			item_args = args.copy()
+			item_args.update(item)
+			self.assertEqual(details, get_item_details(item_args))
+
 	def test_item_tax_template(self):
 		expected_item_tax_template = [
 			{"item_code": "_Test Item With Item Tax Template", "tax_category": "",
@@ -655,6 +690,53 @@ class TestItem(unittest.TestCase):
 		new_barcode.barcode_type = 'EAN'
 		self.assertRaises(InvalidBarcode, item_doc.save)
 
+	def test_item_search_index(self):
+		build_item_search_index()
+
+		try:
+			item = create_item("_Test Item Search Index")
+			item.item_name = "Söme Searchable Name"
+			item.append("barcodes", {"barcode": "SRCH-0042"})
+			item.save()
+
+			item.description = "Described only here"
+			item.save()
+
+			def search(txt):
+				return [d[0] for d in item_query("Item", txt, "name", 0, 20, {})]
+
+			def search_index(txt):
+				query, values = get_item_search_candidates(txt)
+				return frappe.db.sql_list(query, values)
+
+			self.assertIn(item.name, search_index("some search"))
+			self.assertIn(item.name, search_index("RCH-004"))
+			self.assertNotIn(item.name, search_index("unrelated text"))
+
+			# the index does not cover description, which is still searched on smaller item masters
+			self.assertNotIn(item.name, search_index("only here"))
+			self.assertIn(item.name, search("only here"))
+
+			item.item_name = "Renamed Product"
+			item.save()
+			self.assertNotIn(item.name, search_index("some search"))
+			self.assertIn(item.name, search_index("named prod"))
+			self.assertIn(item.name, search("named prod"))
+		finally:
+			clear_item_search_index()
+
+	def test_item_search_index_maintained_while_building(self):
+		clear_item_search_index()
+		frappe.db.set_global("item_search_index_building", 1)
+
+		try:
+			item = create_item("_Test Item Search Index Building")
+			item.item_name = "Saved During Build"
+			item.save()
+			self.assertTrue(frappe.db.exists("Item Search Trigram", {"item_code": item.name, "trigram": "bui"}))
+		finally:
+			clear_item_search_index()
+
 def set_item_variant_settings(fields):
 	doc = frappe.get_doc('Item Variant Settings')
 	doc.set('fields', fields)
@@ -2,14 +2,16 @@
 # License: GNU General Public License v3. See license.txt
 
 import frappe
+from bisect import bisect_right
 from frappe import _
-from frappe.utils import getdate
+from frappe.utils import cstr, getdate
 
 
 class ItemPriceDuplicateItem(frappe.ValidationError): pass
 
 
 from frappe.model.document import Document
+from erpnext.selling.doctype.pos_catalog_change.pos_catalog_change import log_pos_catalog_changes, reset_pos_catalog
 
 
 class ItemPrice(Document):
@@ -77,6 +79,151 @@ class ItemPrice(Document):
 			# if only buying then remove customer
 			self.customer = None
 
+	def on_update(self):
+		clear_item_price_cache(self.item_code)
+
+		doc_before_save = self.get_doc_before_save()
+		if doc_before_save and doc_before_save.item_code != self.item_code:
+			clear_item_price_cache(doc_before_save.item_code)
+
+	def on_trash(self):
+		clear_item_price_cache(self.item_code)
+
+	def after_rename(self, old, new, merge):
+		clear_item_price_cache(self.item_code)
+
+
+"""
+	Item Prices of an item in a price list are cached together with the item's UOMs, grouped by party and
+	sorted by validity start, so that the price applicable on a date is found with a binary search.
+	The cache of an item is cleared on change of any of its Item Prices or of the Item.
+"""
+
+item_price_fields = ["name", "price_list_rate", "uom", "valid_from", "valid_upto", "packing_unit"]
+
+
+def get_item_price_cache_key(item_code):
+	return "item_price_intervals::{0}".format(item_code)
+
+
+def clear_item_price_cache(item_code=None):
+	"""
+		Clear cached Item Prices of the item, or of all items, on change of their Item Prices.
+		The cache is cleared again after commit, as a concurrent request may cache the Item Prices as they
+		were before the change was committed
+	"""
+	delete_item_price_cache(item_code)
+	frappe.enqueue("erpnext.stock.doctype.item_price.item_price.delete_item_price_cache", queue="short",
+		item_code=item_code, enqueue_after_commit=True)
+
+	if item_code:
+		log_pos_catalog_changes([item_code])
+	else:
+		reset_pos_catalog()
+
+
+def delete_item_price_cache(item_code=None):
+	if item_code:
+		frappe.cache().delete_value(get_item_price_cache_key(item_code))
+	else:
+		frappe.cache().delete_keys("item_price_intervals::")
+
+
+def get_item_price_intervals(price_list, item_codes):
+	"""Returns {item_code: intervals} of Item Prices of the items in the price list, loading uncached items together"""
+	out = {}
+	for item_code in item_codes:
+		intervals = frappe.cache().hget(get_item_price_cache_key(item_code), price_list)
+		if intervals is not None:
+			out[item_code] = intervals
+
+	to_load = list(set([d for d in item_codes if d not in out]))
+	if to_load:
+		for item_code, intervals in load_item_price_intervals(price_list, to_load).items():
+			frappe.cache().hset(get_item_price_cache_key(item_code), price_list, intervals)
+			out[item_code] = intervals
+
+	return out
+
+
+def load_item_price_intervals(price_list, item_codes):
+	items = {d.name: {"prices": [], "parties": {}, "stock_uom": d.stock_uom, "item_uoms": []}
+		for d in frappe.get_all("Item", fields=["name", "stock_uom"], filters={"name": ["in", item_codes]})}
+
+	for d in frappe.db.sql("""
+		select parent, uom
+		from `tabUOM Conversion Detail`
+		where parenttype = 'Item' and parent in %s
+		order by idx
+	""", [item_codes], as_dict=1):
+		if d.parent in items:
+			items[d.parent]["item_uoms"].append(d.uom)
+
+	prices = frappe.db.sql("""
+		select item_code, name, price_list_rate, uom,
+			ifnull(valid_from, '2000-01-01') as valid_from,
+			ifnull(valid_upto, '2500-12-31') as valid_upto,
+			packing_unit, customer, supplier
+		from `tabItem Price`
+		where price_list = %s and item_code in %s
+		order by ifnull(valid_from, '2000-01-01') desc, uom desc
+	""", [price_list, item_codes], as_dict=1)
+
+	for d in prices:
+		intervals = items.setdefault(d.item_code, {"prices": [], "parties": {}, "stock_uom": None, "item_uoms": []})
+
+		rank = len(intervals["prices"])
+		intervals["prices"].append({f: d.get(f) for f in item_price_fields})
+
+		party_keys = [("*", "*")]
+		if d.customer:
+			party_keys.append(("customer", d.customer))
+		if d.supplier:
+			party_keys.append(("supplier", d.supplier))
+		if not d.customer and not d.supplier:
+			party_keys.append(("", ""))
+
+		for party_key in party_keys:
+			intervals["parties"].setdefault(party_key, []).append((getdate(d.valid_from), rank))
+
+	for intervals in items.values():
+		for party_key, group in intervals["parties"].items():
+			group.sort()
+			intervals["parties"][party_key] = ([valid_from for valid_from, rank in group], [rank for valid_from, rank in group])
+
+	return items
+
+
+def get_prices_from_intervals(intervals, args, ignore_party=False):
+	"""
+		Returns Item Prices applicable for args in the order of the Item Price query of get_item_price,
+		i.e. latest valid from first, or earliest first for args.period == 'future'
+	"""
+	if ignore_party:
+		party_key = ("*", "*")
+	elif args.get("customer"):
+		party_key = ("customer", args.get("customer"))
+	elif args.get("supplier"):
+		party_key = ("supplier", args.get("supplier"))
+	else:
+		party_key = ("", "")
+
+	valid_from_dates, ranks = intervals["parties"].get(party_key, ([], []))
+	prices = intervals["prices"]
+
+	if not args.get("transaction_date"):
+		return [frappe._dict(prices[rank]) for rank in sorted(ranks)]
+
+	transaction_date = getdate(args.get("transaction_date"))
+	i = bisect_right(valid_from_dates, transaction_date)
+
+	if args.get("period") == "future":
+		return [frappe._dict(prices[rank]) for rank in ranks[i:]
+			if args.get("uom") is not None and cstr(prices[rank]["uom"]) == args.get("uom")]
+	else:
+		return [frappe._dict(prices[rank]) for rank in sorted(ranks[:i])
+			if getdate(prices[rank]["valid_upto"]) >= transaction_date]
+
 
 def on_doctype_update():
 	frappe.db.add_index("Item Price", ["item_code", "price_list"])
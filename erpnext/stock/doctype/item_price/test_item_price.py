@@ -5,12 +5,13 @@ import unittest
 import frappe
 from frappe.test_runner import make_test_records_for_doctype
 from erpnext.stock.get_item_details import get_price_list_rate, process_args
-from erpnext.stock.doctype.item_price.item_price import ItemPriceDuplicateItem
+from erpnext.stock.doctype.item_price.item_price import ItemPriceDuplicateItem, clear_item_price_cache
 
 
 class TestItemPrice(unittest.TestCase):
 	def setUp(self):
 		frappe.db.sql("delete from `tabItem Price`")
+		clear_item_price_cache()
 		make_test_records_for_doctype("Item Price", force=True)
 
 	def test_duplicate_item(self):
@@ -122,6 +123,24 @@ class TestItemPrice(unittest.TestCase):
 		price = get_price_list_rate(doc.item_code, args.get("price_list"), args)
 		self.assertEqual(price, 10)
 
+	def test_price_after_update(self):
+		args = {
+			"price_list": "_Test Price List Rest of the World",
+			"uom": "_Test UOM",
+			"qty": 7,
+		}
+
+		price = get_price_list_rate("_Test Item", args.get("price_list"), args)
+		self.assertEqual(price, 10)
+
+		doc = frappe.get_doc("Item Price", frappe.db.get_value("Item Price",
+			{"item_code": "_Test Item", "price_list": args.get("price_list")}))
+		doc.price_list_rate = 15
+		doc.save()
+
+		price = get_price_list_rate("_Test Item", args.get("price_list"), args)
+		self.assertEqual(price, 15)
+
 
 	def test_invalid_item(self):
 		doc = frappe.copy_doc(test_records[1])
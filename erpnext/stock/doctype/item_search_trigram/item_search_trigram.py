@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""
+	Item Search Trigram holds the distinct three character substrings of the search fields and barcodes of every
+	Item, so that Items containing a search text are found from the index by its trigrams instead of a like
+	scan of all Items. Matches from the index are candidates that item_query still matches against the text, used only when
+	there are too many Items for item_query to scan descriptions, as the index does not cover them.
+
+	The index is built with build_item_search_index, queued on enabling it in Stock Settings, and is used only
+	while the search fields of Item are the same as the ones it was built with. Items are reindexed on save from
+	the start of the build, so that items saved while it runs are not left out.
+"""
+
+import unicodedata
+
+import frappe
+from frappe.utils import cint, cstr, now
+from frappe.model.document import Document
+from erpnext.utilities.bulk import insert_rows
+
+
+class ItemSearchTrigram(Document):
+	pass
+
+
+def get_item_search_fields():
+	"""Fields of Item searched by item_query, other than description"""
+	searchfields = frappe.get_meta("Item", cached=True).get_search_fields()
+	if "description" in searchfields:
+		searchfields.remove("description")
+
+	return searchfields + [f for f in ["name", "item_code", "item_group", "item_name"] if f not in searchfields]
+
+
+def is_item_search_index_enabled():
+	return cstr(frappe.db.get_global("item_search_index_fields")) == ",".join(get_item_search_fields())
+
+
+def is_item_search_index_maintained():
+	"""Whether changes to Items are reindexed, which is also while the index is being built"""
+	return bool(frappe.db.get_global("item_search_index_fields")
+		or cint(frappe.db.get_global("item_search_index_building")))
+
+
+def normalize_search_text(text):
+	"""Lower case text without accents, comparable the way the database compares like conditions"""
+	text = unicodedata.normalize("NFKD", cstr(text).lower())
+	return "".join([c for c in text if not unicodedata.combining(c)])
+
+
+def get_trigrams(text):
+	text = normalize_search_text(text)
+	return set([text[i:i + 3] for i in range(len(text) - 2)])
+
+
+def get_item_trigrams(item_codes):
+	"""Returns {item_code: trigrams} of the search fields and barcodes of the items"""
+	searchfields = get_item_search_fields()
+
+	out = {}
+	for d in frappe.get_all("Item", fields=searchfields, filters={"name": ["in", item_codes]}):
+		trigrams = out.setdefault(d.name, set())
+		for field in searchfields:
+			trigrams |= get_trigrams(d.get(field))
+
+	for d in frappe.db.sql("""
+		select parent, barcode
+		from `tabItem Barcode`
+		where parenttype = 'Item' and parent in %s
+	""", [item_codes], as_dict=1):
+		if d.parent in out:
+			out[d.parent] |= get_trigrams(d.barcode)
+
+	return out
+
+
+def index_items(item_codes):
+	if not item_codes:
+		return
+
+	frappe.db.sql("delete from `tabItem Search Trigram` where item_code in %s", [item_codes])
+
+	timestamp = now()
+	fields = ["name", "creation", "modified", "owner", "modified_by", "item_code", "trigram"]
+
+	rows = []
+	for item_code, trigrams in get_item_trigrams(item_codes).items():
+		for trigram in trigrams:
+			rows.append([frappe.generate_hash(length=20), timestamp, timestamp, frappe.session.user,
+				frappe.session.user, item_code, trigram])
+
+	insert_rows("Item Search Trigram", fields, rows)
+
+
+def update_item_search_index(doc, method=None, old=None, new=None, merge=False):
+	"""Reindex the Item on update and rename, and remove it from the index on trash"""
+	if not is_item_search_index_maintained():
+		return
+
+	if method == "on_trash":
+		frappe.db.sql("delete from `tabItem Search Trigram` where item_code = %s", doc.name)
+	elif method == "after_rename":
+		frappe.db.sql("delete from `tabItem Search Trigram` where item_code = %s", old)
+		index_items([new])
+	else:
+		index_items([doc.name])
+
+
+def reindex_items_of_renamed_link(doc, method=None, old=None, new=None, merge=False):
+	"""Renaming a record linked in the search fields of Item changes Items without saving them"""
+	if not is_item_search_index_maintained():
+		return
+
+	meta = frappe.get_meta("Item")
+	link_fields = [f for f in get_item_search_fields()
+		if meta.get_field(f) and meta.get_field(f).fieldtype == "Link" and meta.get_field(f).options == doc.doctype]
+
+	if link_fields:
+		frappe.enqueue("erpnext.stock.doctype.item_search_trigram.item_search_trigram.reindex_items_linked_to",
+			link_fields=link_fields, value=new, enqueue_after_commit=True)
+
+
+def reindex_items_linked_to(link_fields, value):
+	item_codes = set()
+	for field in link_fields:
+		item_codes |= set(frappe.get_all("Item", filters={field: value}, pluck="name"))
+
+	item_codes = list(item_codes)
+	for i in range(0, len(item_codes), 1000):
+		index_items(item_codes[i:i + 1000])
+
+
+def build_item_search_index():
+	"""Rebuild Item Search Trigram from all Items and start maintaining it"""
+	build_started = now()
+
+	# committed, so that Items saved by other requests during the build are reindexed by them
+	frappe.db.set_global("item_search_index_fields", "")
+	frappe.db.set_global("item_search_index_building", 1)
+	frappe.db.sql("delete from `tabItem Search Trigram`")
+	frappe.db.commit()
+
+	item_codes = frappe.get_all("Item", pluck="name")
+	for i in range(0, len(item_codes), 1000):
+		index_items(item_codes[i:i + 1000])
+
+	# Items saved while their chunk was being read may have been indexed with the values before the save
+	item_codes = frappe.get_all("Item", filters={"modified": (">=", build_started)}, pluck="name")
+	for i in range(0, len(item_codes), 1000):
+		index_items(item_codes[i:i + 1000])
+
+	frappe.db.set_global("item_search_index_fields", ",".join(get_item_search_fields()))
+	frappe.db.set_global("item_search_index_building", 0)
+	frappe.db.commit()
+
+
+def clear_item_search_index():
+	frappe.db.set_global("item_search_index_fields", "")
+	frappe.db.set_global("item_search_index_building", 0)
+	frappe.db.sql("delete from `tabItem Search Trigram`")
+
+
+def get_item_search_candidates(txt, searchfield=None):
+	"""
+		Returns (query, values) of a subquery selecting the names of Items having all trigrams of txt in their
+		search fields or barcodes, or None if the index cannot answer the search
+	"""
+	if not txt or "%" in txt or "_" in txt:
+		return None
+
+	if searchfield and searchfield not in get_item_search_fields():
+		return None
+
+	trigrams = list(get_trigrams(txt))
+	if not trigrams or not is_item_search_index_enabled():
+		return None
+
+	return """
+		select item_code
+		from `tabItem Search Trigram`
+		where trigram in %(search_trigrams)s
+		group by item_code
+		having count(distinct trigram) = %(search_trigram_count)s
+	""", {"search_trigrams": trigrams, "search_trigram_count": len(trigrams)}
+
+
+def get_item_search_backend():
+	"""
+		Method returning a subquery of candidate Items for a search text, as (query, values) with named
+		placeholders, overridable with the item_search_backend hook
+	"""
+	backend = frappe.get_hooks("item_search_backend")
+	if backend:
+		return frappe.get_attr(backend[-1])
+
+	return get_item_search_candidates
+
+
+def on_doctype_update():
+	frappe.db.add_index("Item Search Trigram", ["trigram", "item_code"])
+	frappe.db.add_index("Item Search Trigram", ["item_code"])
@@ -22,6 +22,10 @@ class SerialNoBatchError(ValidationError): pass
 class SerialNoNotExistsError(ValidationError): pass
 class SerialNoDuplicateError(ValidationError): pass
 
+# parsed Serial Nos by their text, since the same text is parsed many times while a voucher is submitted
+_parsed_serial_nos = {}
+max_parsed_serial_nos = 1000
+
 
 class SerialNo(StockController):
 	def __init__(self, *args, **kwargs):
@@ -256,21 +260,18 @@ class SerialNo(StockController):
 		if not serial_no:
 			serial_no = self.name
 
-		sl_entries = frappe.db.sql("""
-			SELECT voucher_type, voucher_no, voucher_detail_no,
-				posting_date, posting_time, incoming_rate, actual_qty, serial_no
+		return frappe.db.sql("""
+			SELECT sle.voucher_type, sle.voucher_no, sle.voucher_detail_no,
+				sle.posting_date, sle.posting_time, sle.incoming_rate, sle.actual_qty, sle.serial_no
 			FROM
-				`tabStock Ledger Entry`
+				`tabStock Ledger Entry Serial No` sr
+			INNER JOIN
+				`tabStock Ledger Entry` sle on sle.name = sr.parent
 			WHERE
-				item_code=%s AND company = %s AND ifnull(is_cancelled, 'No')='No'
-				AND exists(select sr.name from `tabStock Ledger Entry Serial No` sr
-					where sr.parent = `tabStock Ledger Entry`.name and sr.serial_no = %s)
+				sr.serial_no = %s AND sr.item_code = %s AND sr.company = %s AND ifnull(sr.is_cancelled, 'No')='No'
 			ORDER BY
-				posting_date, posting_time, creation
-		""", (self.item_code, self.company, serial_no), as_dict=1)
-
-		sl_entries = [sle for sle in sl_entries if serial_no.upper() in get_serial_nos(sle.serial_no)]
-		return sl_entries
+				sr.posting_date, sr.posting_time, sr.creation
+		""", (serial_no, self.item_code, self.company), as_dict=1)
 
 	def update_serial_no_reference(self, serial_no=None):
 		last_sle = self.get_last_sle(serial_no)
@@ -482,22 +483,9 @@ def validate_serial_no_ledger(serial_nos, item_code, voucher_type, voucher_no, c
 
 	is_vehicle = frappe.get_cached_value("Item", item_code, "is_vehicle")
 
-	sl_entries = frappe.db.sql("""
-		select name, posting_date, posting_time, creation, voucher_type, voucher_no, serial_no, warehouse, actual_qty,
-			timestamp(posting_date, posting_time) as timestamp
-		from `tabStock Ledger Entry`
-		where item_code=%s and company=%s and ifnull(is_cancelled, 'No')='No'
-			and exists(select sr.name from `tabStock Ledger Entry Serial No` sr
-				where sr.parent = `tabStock Ledger Entry`.name and sr.serial_no in %s)
-		order by posting_date, posting_time, creation
-	""", (item_code, company, serial_nos), as_dict=1)
-
 	serial_no_sl_map = {}
-	for sle in sl_entries:
-		current_sle_serial_nos = get_serial_nos(sle.serial_no)
-		for serial_no in current_sle_serial_nos:
-			if serial_no in serial_nos:
-				serial_no_sl_map.setdefault(serial_no, []).append(sle)
+	for sle in get_serial_no_movements(serial_nos, item_code, company):
+		serial_no_sl_map.setdefault(sle.serial_no, []).append(sle)
 
 	for serial_no, serial_no_sl_entries in serial_no_sl_map.items():
 		serial_no_link = frappe.get_desk_link('Vehicle' if is_vehicle else 'Serial No', serial_no)
@@ -530,6 +518,33 @@ def validate_serial_no_ledger(serial_nos, item_code, voucher_type, voucher_no, c
 				last_issue_sle = sle
 
 
+def validate_serial_no_ledger_of_entries(sl_entries, voucher_type, voucher_no):
+	"""Validate Serial No ledgers of all the Stock Ledger Entries of a voucher at once"""
+	item_serial_nos = {}
+	for sle in sl_entries:
+		serial_nos = get_serial_nos(sle.get("serial_no"))
+		if serial_nos:
+			item_serial_nos.setdefault((sle.get("item_code"), sle.get("company")), set()).update(serial_nos)
+
+	for (item_code, company), serial_nos in item_serial_nos.items():
+		validate_serial_no_ledger(list(serial_nos), item_code, voucher_type, voucher_no, company)
+
+
+def get_serial_no_movements(serial_nos, item_code, company):
+	"""
+		Returns movements of the Serial Nos from the index of Stock Ledger Entry Serial No, in posting order,
+		with actual_qty as 1 for incoming and -1 for outgoing
+	"""
+	return frappe.db.sql("""
+		select parent as name, serial_no, posting_date, posting_time, creation, voucher_type, voucher_no, warehouse,
+			case direction when 'In' then 1 when 'Out' then -1 else 0 end as actual_qty,
+			timestamp(posting_date, posting_time) as timestamp
+		from `tabStock Ledger Entry Serial No`
+		where serial_no in %s and item_code = %s and company = %s and ifnull(is_cancelled, 'No') = 'No'
+		order by posting_date, posting_time, creation
+	""", (serial_nos, item_code, company), as_dict=1)
+
+
 def get_serial_no_last_available_sle(sl_entries, exclude=None):
 	available_sle = None
 
@@ -663,8 +678,29 @@ def get_serial_nos(serial_no):
 	if isinstance(serial_no, list):
 		return serial_no
 
-	return [s.strip() for s in cstr(serial_no).strip().upper().replace(',', '\n').split('\n')
-		if s.strip()]
+	return list(parse_serial_nos(serial_no))
+
+
+def parse_serial_nos(serial_no):
+	"""Returns the Serial Nos of newline or comma separated text as a tuple, parsed once per text"""
+	serial_no = cstr(serial_no)
+	if serial_no not in _parsed_serial_nos:
+		if len(_parsed_serial_nos) >= max_parsed_serial_nos:
+			_parsed_serial_nos.clear()
+
+		_parsed_serial_nos[serial_no] = tuple([s.strip() for s in serial_no.strip().upper().replace(',', '\n')
+			.split('\n') if s.strip()])
+
+	return _parsed_serial_nos[serial_no]
+
+
+def join_serial_nos(serial_nos):
+	"""Returns the text of Serial Nos returned by parse_serial_nos, which is then not parsed again"""
+	serial_no = "\n".join(serial_nos)
+	if serial_no not in _parsed_serial_nos and len(_parsed_serial_nos) < max_parsed_serial_nos:
+		_parsed_serial_nos[serial_no] = tuple(serial_nos)
+
+	return serial_no
 
 
 def update_serial_nos_after_submit(controller, parentfield):
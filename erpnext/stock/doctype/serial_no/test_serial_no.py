@@ -7,6 +7,7 @@
 import frappe, unittest
 
 from erpnext.stock.doctype.stock_entry.test_stock_entry import make_serialized_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
 from erpnext.stock.doctype.purchase_receipt.test_purchase_receipt import make_purchase_receipt
 from erpnext.stock.doctype.delivery_note.test_delivery_note import create_delivery_note
 from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
@@ -53,5 +54,54 @@ class TestSerialNo(unittest.TestCase):
 		self.assertEqual(serial_no.warehouse, wh)
 		self.assertEqual(serial_no.company, "_Test Company 1")
 
+	def test_serial_no_ledger_on_transfer(self):
+		se = make_serialized_item(target_warehouse="_Test Warehouse - _TC")
+		serial_no = get_serial_nos(se.get("items")[0].serial_no)[0]
+
+		transfer = make_stock_entry(item_code="_Test Serialized Item With Series", serial_no=serial_no, qty=1,
+			from_warehouse="_Test Warehouse - _TC", to_warehouse="_Test Warehouse 1 - _TC")
+
+		self.assertEqual(get_movements(serial_no), [("_Test Warehouse - _TC", 1), ("_Test Warehouse - _TC", -1),
+			("_Test Warehouse 1 - _TC", 1)])
+		validate_serial_no_ledger([serial_no], "_Test Serialized Item With Series", transfer.doctype, transfer.name,
+			transfer.company)
+
+		# no longer available in the source warehouse
+		self.assertRaises(frappe.ValidationError, make_stock_entry, item_code="_Test Serialized Item With Series",
+			serial_no=serial_no, qty=1, from_warehouse="_Test Warehouse - _TC")
+
+	def test_serial_no_ledger_on_cancel(self):
+		se = make_serialized_item(target_warehouse="_Test Warehouse - _TC")
+		serial_no = get_serial_nos(se.get("items")[0].serial_no)[0]
+
+		transfer = make_stock_entry(item_code="_Test Serialized Item With Series", serial_no=serial_no, qty=1,
+			from_warehouse="_Test Warehouse - _TC", to_warehouse="_Test Warehouse 1 - _TC")
+
+		# the receipt cannot be cancelled while the serial no is transferred after it
+		self.assertRaises(frappe.ValidationError, se.cancel)
+
+		transfer.cancel()
+		self.assertEqual(get_movements(serial_no), [("_Test Warehouse - _TC", 1)])
+		validate_serial_no_ledger([serial_no], "_Test Serialized Item With Series", transfer.doctype, transfer.name,
+			transfer.company)
+
+		se.reload()
+		se.cancel()
+		self.assertEqual(get_movements(serial_no), [])
+
+	def test_parse_serial_nos(self):
+		self.assertEqual(get_serial_nos(" sr1, Sr2\n\nsr3 "), ["SR1", "SR2", "SR3"])
+
+		serial_nos = get_serial_nos("sr1\nsr2")
+		serial_nos.append("SR3")
+		self.assertEqual(get_serial_nos("sr1\nsr2"), ["SR1", "SR2"])
+
+		self.assertEqual(join_serial_nos(parse_serial_nos("sr1,sr2")), "SR1\nSR2")
+		self.assertEqual(parse_serial_nos("SR1\nSR2"), ("SR1", "SR2"))
+
 	def tearDown(self):
-		frappe.db.rollback()
\ No newline at end of file
+		frappe.db.rollback()
+
+def get_movements(serial_no):
+	return [(d.warehouse, d.actual_qty)
+		for d in get_serial_no_movements([serial_no], "_Test Serialized Item With Series", "_Test Company")]
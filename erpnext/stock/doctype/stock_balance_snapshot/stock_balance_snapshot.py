@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+"""
+	Stock Balance Snapshot holds the closing qty, value and stock ageing FIFO queue of every Item, Warehouse,
+	Batch and Package with stock, dated on the last day of each month. Snapshots of a company exist for every
+	month from its first Stock Ledger Entry up to its latest snapshot date, and are deleted from the month of
+	any entry posted or cancelled on or before it. The latest snapshot date is kept as a global default, since
+	months without stock have no rows.
+
+	A month is built from the snapshot of the month before it and the entries of the month, and is not built
+	while a valuation repost of it is pending. Snapshots are invalidated by every repost of entries, through
+	update_entries_after.
+
+	A month is committed as soon as it is built and its entries are counted again, since an entry posted or
+	reposted while the month was being built may be missing from it. Its invalidation either waits for the
+	snapshot to be committed and deletes it, or the count finds it.
+"""
+
+import json
+
+import frappe
+from frappe.utils import add_days, add_months, flt, get_last_day, getdate, now, today
+from frappe.model.document import Document
+from erpnext.stock.report.stock_balance.stock_balance import get_key, get_key_fields
+from erpnext.stock.report.stock_ageing.stock_ageing import update_fifo_queue
+from erpnext.utilities.bulk import insert_rows
+
+snapshot_key_fields = get_key_fields(include_warehouse=True, include_batch=True, include_package=True)
+
+
+class StockBalanceSnapshot(Document):
+	pass
+
+
+def get_latest_snapshot_date(company):
+	snapshot_date = frappe.db.get_global("stock_balance_snapshot_date::{0}".format(company))
+	return getdate(snapshot_date) if snapshot_date else None
+
+
+def set_latest_snapshot_date(company, snapshot_date):
+	frappe.db.set_global("stock_balance_snapshot_date::{0}".format(company), snapshot_date)
+
+
+def get_snapshot_rows(snapshot_date, conditions=None, item_codes=None, include_fifo_queue=False):
+	"""Returns snapshot rows of the date, with a list of conditions on `tabStock Balance Snapshot`"""
+	conditions = list(conditions or [])
+	if item_codes:
+		conditions.append("item_code in ({0})".format(", ".join([frappe.db.escape(i) for i in item_codes])))
+
+	rows = frappe.db.sql("""
+		select {fields}, qty, stock_value {fifo_queue_field}
+		from `tabStock Balance Snapshot`
+		where period_end_date = %s {conditions}
+	""".format(
+		fields=", ".join(snapshot_key_fields),
+		fifo_queue_field=", fifo_queue" if include_fifo_queue else "",
+		conditions="".join([" and " + c for c in conditions])
+	), snapshot_date, as_dict=1)
+
+	if include_fifo_queue:
+		for d in rows:
+			d.fifo_queue = load_fifo_queue(d.fifo_queue)
+
+	return rows
+
+
+def get_fifo_queue_map(snapshot_rows):
+	"""Returns unsorted FIFO queues of snapshot rows, to continue the replay of get_fifo_queue from"""
+	fifo_queue_map = {}
+	for d in snapshot_rows:
+		key = get_key(d, include_warehouse=True, include_batch=True, include_package=True)
+		fifo_queue_map[key] = frappe._dict({
+			"details": frappe._dict(zip(snapshot_key_fields, key)),
+			"fifo_queue": d.fifo_queue,
+			"total_qty": flt(d.qty)
+		})
+
+	return fifo_queue_map
+
+
+def load_fifo_queue(fifo_queue):
+	return [[qty, getdate(date) if date else None] for qty, date in json.loads(fifo_queue or "[]")]
+
+
+def dump_fifo_queue(fifo_queue):
+	return json.dumps([[qty, str(date) if date else None] for qty, date in fifo_queue])
+
+
+def build_stock_balance_snapshots(company, upto_date=None):
+	"""Build missing monthly snapshots of the company up to the month of upto_date, by default the last closed month"""
+	upto_date = get_last_day(upto_date or add_months(today(), -1))
+
+	pending_repost_date = frappe.db.sql("""
+		select min(posting_date)
+		from `tabStock Repost Job`
+		where status in ('Queued', 'In Progress')
+	""")[0][0]
+	if pending_repost_date:
+		upto_date = min(upto_date, get_last_day(add_months(pending_repost_date, -1)))
+
+	snapshot_date = get_latest_snapshot_date(company)
+	if snapshot_date:
+		from_date = add_days(snapshot_date, 1)
+		snapshot_rows = get_snapshot_rows(snapshot_date, ["company = {0}".format(frappe.db.escape(company))],
+			include_fifo_queue=True)
+	else:
+		from_date = frappe.db.sql("""
+			select min(posting_date)
+			from `tabStock Ledger Entry`
+			where company = %s and docstatus < 2
+		""", company)[0][0]
+		if not from_date:
+			return
+		snapshot_rows = []
+
+	fifo_queue_map = get_fifo_queue_map(snapshot_rows)
+	stock_values = {}
+	for d in snapshot_rows:
+		stock_values[get_key(d, include_warehouse=True, include_batch=True, include_package=True)] = flt(d.stock_value)
+
+	fields = ["name", "creation", "modified", "owner", "modified_by", "period_end_date"] + snapshot_key_fields \
+		+ ["qty", "stock_value", "fifo_queue"]
+
+	month_start = getdate(from_date).replace(day=1)
+	while month_start <= getdate(upto_date):
+		month_end = get_last_day(month_start)
+		month_totals = get_month_totals(company, month_start, month_end)
+
+		sles = frappe.db.sql("""
+			select
+				item_code, warehouse, company, batch_no, packing_slip, serial_no,
+				actual_qty, qty_after_transaction, stock_value_difference, posting_date, voucher_no
+			from `tabStock Ledger Entry` force index (posting_sort_index)
+			where company = %s and posting_date between %s and %s and docstatus < 2
+			order by posting_date, posting_time, creation, actual_qty
+		""", (company, month_start, month_end), as_dict=1)
+
+		update_fifo_queue(sles, include_warehouse=True, include_batch=True, include_package=True,
+			fifo_queue_map=fifo_queue_map)
+
+		for sle in sles:
+			key = get_key(sle, include_warehouse=True, include_batch=True, include_package=True)
+			stock_values[key] = stock_values.get(key, 0) + flt(sle.stock_value_difference)
+
+		timestamp = now()
+		rows = []
+		for key in list(fifo_queue_map):
+			fifo_dict = fifo_queue_map[key]
+			fifo_dict.total_qty = flt(fifo_dict.total_qty, 9)
+			stock_values[key] = flt(stock_values.get(key), 9)
+
+			# keys without stock are not kept, the same as when continuing from the stored snapshot
+			if not fifo_dict.total_qty and not stock_values[key] and not fifo_dict.fifo_queue:
+				del fifo_queue_map[key]
+				stock_values.pop(key, None)
+				continue
+
+			rows.append([frappe.generate_hash(length=10), timestamp, timestamp, frappe.session.user,
+				frappe.session.user, month_end] + list(key)
+				+ [fifo_dict.total_qty, stock_values[key], dump_fifo_queue(fifo_dict.fifo_queue)])
+
+		insert_rows("Stock Balance Snapshot", fields, rows)
+		set_latest_snapshot_date(company, month_end)
+		frappe.db.commit()
+
+		# an entry of the month committed after it was read is missing from the snapshot, and may have been posted
+		# while there was no snapshot for its invalidation to delete, so the month is read again once it is committed
+		if get_month_totals(company, month_start, month_end) != month_totals:
+			invalidate_stock_balance_snapshots(company, month_start)
+			frappe.db.commit()
+			break
+
+		month_start = add_days(month_end, 1)
+
+
+def get_month_totals(company, month_start, month_end):
+	return frappe.db.sql("""
+		select count(*), sum(actual_qty), sum(stock_value_difference)
+		from `tabStock Ledger Entry`
+		where company = %s and posting_date between %s and %s and docstatus < 2
+	""", (company, month_start, month_end))[0]
+
+
+def invalidate_stock_balance_snapshots(company, posting_date):
+	"""Delete snapshots of the month of posting_date onwards, since entries of that month have changed"""
+	if not company or not posting_date:
+		return
+
+	# deleted even without a snapshot of the month, to hold back the insert of a snapshot being built until commit
+	frappe.db.sql("""
+		delete from `tabStock Balance Snapshot`
+		where company = %s and period_end_date >= %s
+	""", (company, get_last_day(posting_date)))
+
+	snapshot_date = get_latest_snapshot_date(company)
+	if snapshot_date and snapshot_date >= get_last_day(posting_date):
+		set_latest_snapshot_date(company, get_last_day(add_months(posting_date, -1)))
+
+
+def get_usable_snapshot_date(from_date, company=None):
+	"""
+		Returns the latest snapshot date before from_date, for the company or else for all companies with stock,
+		from which a report can continue with entries posted after it
+	"""
+	from_date = getdate(from_date)
+	snapshot_date = get_last_day(add_months(from_date, -1))
+
+	if company:
+		companies = [company]
+	else:
+		companies = frappe.db.sql_list("""
+			select distinct wh.company
+			from `tabBin` bin
+			inner join `tabWarehouse` wh on wh.name = bin.warehouse
+		""")
+
+	for company in companies:
+		latest_snapshot_date = get_latest_snapshot_date(company)
+		if not latest_snapshot_date:
+			return None
+
+		snapshot_date = min(snapshot_date, latest_snapshot_date)
+
+	return snapshot_date
+
+
+def build_snapshots_for_all_companies():
+	"""Scheduled job to build snapshots of closed months"""
+	for company in frappe.get_all("Company", pluck="name"):
+		build_stock_balance_snapshots(company)
+		frappe.db.commit()
+
+
+def on_doctype_update():
+	frappe.db.add_index("Stock Balance Snapshot", ["company", "period_end_date"])
+	frappe.db.add_index("Stock Balance Snapshot", ["period_end_date", "item_code"])
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+import unittest
+from frappe.utils import add_days, add_months, get_first_day, get_last_day, today
+from erpnext.stock.doctype.item.test_item import create_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (build_stock_balance_snapshots,
+	get_latest_snapshot_date, set_latest_snapshot_date)
+from erpnext.stock.report.stock_balance.stock_balance import execute as stock_balance
+from erpnext.stock.stock_balance import repost_actual_qty
+
+company = "_Test Company"
+test_item = "_Test Stock Balance Snapshot Item"
+test_warehouse = "_Test Warehouse - _TC"
+
+
+class TestStockBalanceSnapshot(unittest.TestCase):
+	def test_stock_balance_with_snapshots(self):
+		create_item(test_item, is_stock_item=1)
+		posting_date = get_last_day(add_months(today(), -3))
+
+		make_stock_entry(item_code=test_item, to_warehouse=test_warehouse, qty=10, rate=100,
+			posting_date=posting_date)
+		make_stock_entry(item_code=test_item, from_warehouse=test_warehouse, qty=4,
+			posting_date=add_days(posting_date, 20))
+
+		build_stock_balance_snapshots(company)
+		self.assertEqual(get_latest_snapshot_date(company), get_last_day(add_months(today(), -1)))
+		self.assertEqual(get_stock_balance(), get_stock_balance(without_snapshots=True))
+
+		# reposting a bin, as when merging items or warehouses, deletes snapshots from the month of the repost
+		build_stock_balance_snapshots(company)
+		repost_actual_qty(test_item, test_warehouse, posting_date=add_days(posting_date, 20), posting_time="00:00")
+		self.assertEqual(get_latest_snapshot_date(company), get_last_day(posting_date))
+
+		# as does a backdated entry
+		build_stock_balance_snapshots(company)
+		make_stock_entry(item_code=test_item, to_warehouse=test_warehouse, qty=5, rate=200,
+			posting_date=add_days(posting_date, 1))
+		self.assertEqual(get_latest_snapshot_date(company), get_last_day(posting_date))
+
+		self.assertEqual(get_stock_balance(), get_stock_balance(without_snapshots=True))
+		build_stock_balance_snapshots(company)
+		self.assertEqual(get_stock_balance(), get_stock_balance(without_snapshots=True))
+
+
+def get_stock_balance(without_snapshots=False):
+	if without_snapshots:
+		frappe.db.sql("delete from `tabStock Balance Snapshot` where company = %s", company)
+		set_latest_snapshot_date(company, None)
+
+	columns, data = stock_balance({
+		"company": company,
+		"from_date": get_first_day(today()),
+		"to_date": today(),
+		"show_amounts": 1
+	})
+
+	return data
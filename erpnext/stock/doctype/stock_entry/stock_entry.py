@@ -14,7 +14,7 @@ from erpnext.stock.doctype.item_alternative.item_alternative import has_alternat
 from erpnext.manufacturing.doctype.bom.bom import validate_bom_no, add_additional_cost
 from erpnext.manufacturing.doctype.work_order.work_order import get_qty_with_allowance
 from frappe.model.mapper import get_mapped_doc
-from erpnext.stock.doctype.serial_no.serial_no import update_serial_nos_after_submit, get_serial_nos
+from erpnext.stock.doctype.serial_no.serial_no import update_serial_nos_after_submit
 from erpnext.stock.doctype.stock_reconciliation.stock_reconciliation import OpeningEntryAccountError
 from erpnext.controllers.transaction_controller import TransactionController
 import json
@@ -1639,7 +1639,7 @@ class StockEntry(TransactionController):
 	def validate_reserved_serial_no_consumption(self):
 		for item in self.items:
 			if item.s_warehouse and not item.t_warehouse and item.serial_no:
-				for sr in get_serial_nos(item.serial_no):
+				for sr in self.get_row_serial_nos(item):
 					sales_order = frappe.db.get_value("Serial No", sr, "sales_order")
 					if sales_order:
 						frappe.throw(_("Item {0} (Serial No: {1}) cannot be consumed as is reserverd\
@@ -4,7 +4,7 @@
 
 import frappe
 from frappe import _
-from frappe.utils import getdate, add_days, formatdate, today
+from frappe.utils import flt, getdate, add_days, formatdate, today
 from frappe.model.document import Document
 from datetime import date
 from erpnext.controllers.item_variant import ItemTemplateCannotHaveStock
@@ -184,7 +184,27 @@ class StockLedgerEntry(Document):
 
 		self.serial_numbers = []
 		for serial_no in serial_nos:
-			self.append('serial_numbers', {'serial_no': serial_no})
+			self.append('serial_numbers', {
+				'serial_no': serial_no,
+				'item_code': self.item_code,
+				'company': self.company,
+				'warehouse': self.warehouse,
+				'direction': get_serial_no_direction(self.actual_qty),
+				'voucher_type': self.voucher_type,
+				'voucher_no': self.voucher_no,
+				'posting_date': self.posting_date,
+				'posting_time': self.posting_time,
+				'is_cancelled': self.is_cancelled,
+			})
+
+
+def get_serial_no_direction(actual_qty):
+	if flt(actual_qty) > 0:
+		return "In"
+	elif flt(actual_qty) < 0:
+		return "Out"
+	else:
+		return ""
 
 
 def on_doctype_update():
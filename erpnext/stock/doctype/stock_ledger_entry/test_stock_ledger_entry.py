@@ -4,8 +4,159 @@
 
 import frappe
 import unittest
+from frappe.utils import add_days, nowdate
+from erpnext.stock.doctype.item.test_item import create_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
 
 # test_records = frappe.get_test_records('Stock Ledger Entry')
 
+company = "_Test Company"
+warehouse = "_Test Warehouse - _TC"
+target_warehouse = "_Test Warehouse 1 - _TC"
+
+
 class TestStockLedgerEntry(unittest.TestCase):
-	pass
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_backdated_entry_reposts_dependent_bins(self):
+		in_order = make_repack_ledger("_Test SLE In Order", backdated=False)
+		backdated = make_repack_ledger("_Test SLE Backdated", backdated=True)
+
+		# a backdated receipt of the raw material changes the repack, and through it the finished good
+		# in both warehouses, to the same values as posting the entries in order
+		self.assertEqual(get_ledger_values(backdated), get_ledger_values(in_order))
+
+	def test_repost_in_write_batches(self):
+		in_order = make_repack_ledger("_Test SLE In Order", backdated=False)
+
+		# reposted values are written back after every entry, as with a ledger larger than the batch size
+		frappe.db.set_value("Stock Settings", None, "repost_write_batch_size", 1)
+		try:
+			backdated = make_repack_ledger("_Test SLE Write Batch", backdated=True)
+		finally:
+			frappe.db.set_value("Stock Settings", None, "repost_write_batch_size", 0)
+
+		self.assertEqual(get_ledger_values(backdated), get_ledger_values(in_order))
+
+	def test_dependencies_on_several_reposted_bins(self):
+		def make_ledger(prefix, backdated):
+			rm_items = [prefix + " RM 1", prefix + " RM 2"]
+			fg_item = prefix + " FG"
+			for item_code in rm_items + [fg_item]:
+				create_item(item_code, is_stock_item=1)
+				frappe.db.set_value("Item", item_code, "valuation_method", "Moving Average")
+
+			def make_second_receipts():
+				return [make_stock_entry(item_code=item_code, to_warehouse=warehouse, qty=10, rate=rate,
+					posting_date=add_days(nowdate(), -4)) for item_code, rate in zip(rm_items, (200, 400))]
+
+			vouchers = frappe._dict()
+			for i, item_code in enumerate(rm_items):
+				vouchers["first_receipt_{0}".format(i)] = make_stock_entry(item_code=item_code, to_warehouse=warehouse,
+					qty=10, rate=100, posting_date=add_days(nowdate(), -5))
+			if not backdated:
+				vouchers.second_receipt_0, vouchers.second_receipt_1 = make_second_receipts()
+
+			vouchers.repack = make_repack(rm_items, fg_item, posting_date=add_days(nowdate(), -3))
+			if backdated:
+				vouchers.second_receipt_0, vouchers.second_receipt_1 = make_second_receipts()
+
+			items = {rm_items[0]: "RM 1", rm_items[1]: "RM 2", fg_item: "FG"}
+			return frappe._dict({"vouchers": vouchers, "items": items})
+
+		in_order = make_ledger("_Test SLE Dependencies In Order", backdated=False)
+		backdated = make_ledger("_Test SLE Dependencies Backdated", backdated=True)
+		self.assertEqual(get_ledger_values(backdated), get_ledger_values(in_order))
+
+		# the finished good is valued at the raw materials consumed, as reposted in their own bins
+		repack_sles = get_ledger_values(backdated).sles["repack"]
+		fg_value = sum([d[6] for d in repack_sles if d[0] == "FG"])
+		rm_value = sum([d[6] for d in repack_sles if d[0] != "FG"])
+		self.assertEqual(fg_value, 5 * 150 + 5 * 250)
+		self.assertEqual(fg_value, -rm_value)
+
+
+def make_repack_ledger(prefix, backdated=False):
+	"""
+		Receives a raw material twice, repacks it into a finished good that is transferred to another warehouse,
+		and issues the rest of the raw material. With backdated, the second receipt is made last.
+		Returns the vouchers by step and the items
+	"""
+	rm_item, fg_item = prefix + " RM", prefix + " FG"
+	for item_code in (rm_item, fg_item):
+		create_item(item_code, is_stock_item=1)
+		frappe.db.set_value("Item", item_code, "valuation_method", "Moving Average")
+
+	def make_second_receipt():
+		return make_stock_entry(item_code=rm_item, to_warehouse=warehouse, qty=10, rate=200,
+			posting_date=add_days(nowdate(), -4))
+
+	vouchers = frappe._dict()
+	vouchers.first_receipt = make_stock_entry(item_code=rm_item, to_warehouse=warehouse, qty=10, rate=100,
+		posting_date=add_days(nowdate(), -5))
+	if not backdated:
+		vouchers.second_receipt = make_second_receipt()
+
+	vouchers.repack = make_repack(rm_item, fg_item, posting_date=add_days(nowdate(), -3))
+	vouchers.transfer = make_stock_entry(item_code=fg_item, from_warehouse=warehouse, to_warehouse=target_warehouse,
+		qty=1, posting_date=add_days(nowdate(), -2))
+	vouchers.issue = make_stock_entry(item_code=rm_item, from_warehouse=warehouse, qty=2,
+		posting_date=add_days(nowdate(), -1))
+
+	if backdated:
+		vouchers.second_receipt = make_second_receipt()
+
+	return frappe._dict({"vouchers": vouchers, "items": {rm_item: "RM", fg_item: "FG"}})
+
+
+def make_repack(rm_items, fg_item, posting_date, rm_qty=5):
+	if not isinstance(rm_items, (list, tuple)):
+		rm_items = [rm_items]
+
+	repack = frappe.new_doc("Stock Entry")
+	repack.purpose = "Repack"
+	repack.company = company
+	repack.set_posting_time = 1
+	repack.posting_date = posting_date
+
+	rows = [(rm_item, rm_qty, "s_warehouse") for rm_item in rm_items] + [(fg_item, 1, "t_warehouse")]
+	for item_code, qty, field in rows:
+		repack.append("items", {
+			"item_code": item_code,
+			field: warehouse,
+			"qty": qty,
+			"uom": "Nos",
+			"stock_uom": "Nos",
+			"conversion_factor": 1,
+			"cost_center": "_Test Cost Center - _TC",
+			"expense_account": "Stock Adjustment - _TC"
+		})
+
+	repack.set_stock_entry_type()
+	repack.insert()
+	repack.submit()
+	return repack
+
+
+def get_ledger_values(ledger):
+	"""Returns SLE and GL values of each step and Bin values, with items named by their role"""
+	values = frappe._dict({"sles": {}, "gl_entries": {}, "bins": {}})
+
+	for step, voucher in ledger.vouchers.items():
+		values.sles[step] = [(ledger.items[d.item_code], d.warehouse, d.actual_qty, d.qty_after_transaction,
+				d.valuation_rate, d.stock_value, d.stock_value_difference)
+			for d in frappe.get_all("Stock Ledger Entry", filters={"voucher_type": "Stock Entry", "voucher_no": voucher.name},
+				fields=["item_code", "warehouse", "actual_qty", "qty_after_transaction", "valuation_rate", "stock_value",
+					"stock_value_difference"])]
+		values.sles[step].sort()
+
+		values.gl_entries[step] = sorted([(d.account, d.debit, d.credit)
+			for d in frappe.get_all("GL Entry", filters={"voucher_type": "Stock Entry", "voucher_no": voucher.name},
+				fields=["account", "debit", "credit"])])
+
+	for d in frappe.get_all("Bin", filters={"item_code": ["in", list(ledger.items)]},
+			fields=["item_code", "warehouse", "actual_qty", "valuation_rate", "stock_value"]):
+		values.bins[(ledger.items[d.item_code], d.warehouse)] = (d.actual_qty, d.valuation_rate, d.stock_value)
+
+	return values
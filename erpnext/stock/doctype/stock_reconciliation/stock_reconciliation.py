@@ -155,7 +155,7 @@ class StockReconciliation(StockController):
 					_("Negative Quantity is not allowed")))
 
 			# serial nos qty validation
-			if row.serial_no and len(get_serial_nos(row.serial_no)) != row.total_qty:
+			if row.serial_no and len(self.get_row_serial_nos(row)) != row.total_qty:
 				self.validation_messages.append(_get_msg(row_num,
 					_("Quantity and number of Serial Nos do not match")))
 
@@ -225,9 +225,9 @@ class StockReconciliation(StockController):
 	def validate_serial_no_ledger(self):
 		item_serial_nos = {}
 		for d in self.items:
-			for serial_no in get_serial_nos(d.serial_no):
+			for serial_no in self.get_row_serial_nos(d):
 				item_serial_nos.setdefault(d.item_code, []).append(serial_no)
-			for serial_no in get_serial_nos(d.current_serial_no):
+			for serial_no in self.get_row_serial_nos(d, 'current_serial_no'):
 				item_serial_nos.setdefault(d.item_code, []).append(serial_no)
 
 		for item_code, serial_nos in item_serial_nos.items():
@@ -252,8 +252,8 @@ class StockReconciliation(StockController):
 			"reset_rate": cint(self.reset_rate),
 		}
 
-		current_serial_nos = set(get_serial_nos(d.get('current_serial_no')))
-		serial_nos = set(get_serial_nos(d.get('serial_no')))
+		current_serial_nos = set(self.get_row_serial_nos(d, 'current_serial_no'))
+		serial_nos = set(self.get_row_serial_nos(d))
 
 		if cint(self.reset_rate):
 			sle["actual_qty"] = -1 * len(current_serial_nos)
@@ -279,8 +279,8 @@ class StockReconciliation(StockController):
 			"incoming_rate": d.valuation_rate
 		}
 
-		current_serial_nos = set(get_serial_nos(d.get('current_serial_no')))
-		serial_nos = set(get_serial_nos(d.get('serial_no')))
+		current_serial_nos = set(self.get_row_serial_nos(d, 'current_serial_no'))
+		serial_nos = set(self.get_row_serial_nos(d))
 
 		if cint(self.reset_rate):
 			sle["actual_qty"] = len(serial_nos)
@@ -0,0 +1,12 @@
+// Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on('Stock Repost Job', {
+	refresh: function(frm) {
+		if (frm.doc.status == "Failed") {
+			frm.add_custom_button(__("Retry"), function() {
+				frm.call("retry").then(() => frm.reload_doc());
+			});
+		}
+	}
+});
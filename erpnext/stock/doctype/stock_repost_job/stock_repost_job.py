@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import add_to_date, cint, now_datetime, time_diff_in_seconds
+from frappe.model.document import Document
+
+# each job is run in a background job of this timeout, after which a job still In Progress was interrupted
+repost_job_timeout = 3600
+repost_job_stale_after = repost_job_timeout + 600
+
+# a run stops at the first checkpoint after this time, and the job continues in a new background job
+repost_job_time_limit = repost_job_timeout - 600
+
+
+class RepostTimeLimitReached(Exception):
+	pass
+
+
+class StockRepostJob(Document):
+	def get_repost_args(self):
+		start = self.get_start()
+		return frappe._dict({
+			"item_code": self.item_code,
+			"warehouse": self.warehouse,
+			"batch_no": self.batch_no,
+			"posting_date": start.posting_date,
+			"posting_time": start.posting_time,
+			"creation": start.creation,
+			"sle_id": start.sle_id,
+			"voucher_no": self.voucher_no,
+		})
+
+	def get_start(self):
+		"""Returns the entry to repost from, which is the checkpoint of an interrupted run if any"""
+		if self.resume_sle_id:
+			return frappe._dict({
+				"posting_date": self.resume_posting_date,
+				"posting_time": self.resume_posting_time,
+				"creation": self.resume_sle_creation,
+				"sle_id": self.resume_sle_id,
+			})
+
+		start = get_job_start(self)
+		start.sle_id = self.sle_id
+		return start
+
+	def merge_queued_jobs(self):
+		"""Merge other queued jobs of the same bin into this one, keeping the earliest starting point"""
+		from erpnext.stock.stock_ledger import get_sle_sort_key
+
+		other_jobs = frappe.get_all("Stock Repost Job", filters={
+			"item_code": self.item_code,
+			"warehouse": self.warehouse,
+			"status": "Queued",
+			"name": ["!=", self.name]
+		}, fields=["name", "batch_no", "posting_date", "posting_time", "sle_creation", "sle_id",
+			"voucher_type", "voucher_no", "allow_negative_stock", "via_landed_cost_voucher"])
+
+		for d in other_jobs:
+			if get_sle_sort_key(get_job_start(d)) < get_sle_sort_key(self.get_start()):
+				self.set_start(d)
+
+			self.allow_negative_stock = cint(self.allow_negative_stock or d.allow_negative_stock)
+			self.via_landed_cost_voucher = cint(self.via_landed_cost_voucher and d.via_landed_cost_voucher)
+
+			frappe.db.set_value("Stock Repost Job", d.name, {
+				"status": "Merged",
+				"merged_into": self.name
+			}, update_modified=False)
+
+	def set_start(self, d):
+		self.batch_no = d.batch_no
+		self.posting_date = d.posting_date
+		self.posting_time = d.posting_time
+		self.sle_creation = d.sle_creation
+		self.sle_id = d.sle_id
+		self.voucher_type = d.voucher_type
+		self.voucher_no = d.voucher_no
+
+		# reposting from an earlier entry than the checkpoint covers it
+		self.set_resume_point(None)
+
+	def set_resume_point(self, sle):
+		self.resume_posting_date = sle.posting_date if sle else None
+		self.resume_posting_time = sle.posting_time if sle else None
+		self.resume_sle_creation = sle.creation if sle else None
+		self.resume_sle_id = sle.name if sle else None
+
+	def get_pending_dependents(self):
+		return [frappe._dict(d) for d in json.loads(self.pending_dependents or "[]")]
+
+	def run(self):
+		from erpnext.stock.stock_ledger import update_entries_after, RepostQueue
+		from erpnext.controllers.stock_controller import update_gl_entries_for_reposted_stock_vouchers
+
+		# the job has been claimed as In Progress by get_next_repost_job, and is resumed from its last checkpoint
+		# if this run is interrupted
+		self.merge_queued_jobs()
+		self.error_log = None
+		self.db_update()
+		frappe.db.commit()
+
+		try:
+			frappe.flags.stock_ledger_vouchers_reposted = None
+			self.sles_reposted_before_run = cint(self.sles_reposted)
+
+			repost_queue = RepostQueue()
+			repost_queue.add_entries(self.get_pending_dependents())
+			update_entries_after(self.get_repost_args(),
+				allow_negative_stock=cint(self.allow_negative_stock),
+				via_landed_cost_voucher=cint(self.via_landed_cost_voucher),
+				repost_queue=repost_queue,
+				checkpoint=self.save_checkpoint,
+				checkpoint_interval=get_repost_checkpoint_interval())
+
+			update_gl_entries_for_reposted_stock_vouchers()
+
+			# dependent bins are queued as their own jobs and committed with this job's completion
+			dependent_jobs = make_repost_jobs_from_queue(repost_queue,
+				allow_negative_stock=self.allow_negative_stock, via_landed_cost_voucher=self.via_landed_cost_voucher)
+
+			summary = repost_queue.get_summary()
+			self.bins_reposted = summary.bins_reposted
+			self.sles_reposted = self.sles_reposted_before_run + summary.sles_reposted
+			self.dependent_jobs = len(dependent_jobs)
+			self.set_resume_point(None)
+			self.pending_dependents = None
+			self.status = "Completed"
+			self.completed_on = now_datetime()
+			self.db_update()
+			frappe.db.commit()
+		except RepostTimeLimitReached:
+			# the progress up to the last checkpoint is committed, the rest is reposted by a new background job
+			frappe.db.rollback()
+			frappe.flags.stock_ledger_vouchers_reposted = None
+
+			self.started_on = now_datetime()
+			self.db_update()
+			frappe.db.commit()
+			enqueue_repost_job(self.name)
+		except Exception:
+			frappe.db.rollback()
+			frappe.flags.stock_ledger_vouchers_reposted = None
+
+			self.status = "Failed"
+			self.error_log = frappe.get_traceback()
+			self.db_update()
+			frappe.db.commit()
+
+	def save_checkpoint(self, next_sle, sles_processed, repost_queue):
+		"""Commit the entries reposted so far, to resume from next_sle if this run is interrupted"""
+		from erpnext.controllers.stock_controller import update_gl_entries_for_reposted_stock_vouchers
+
+		# a resumed run only knows the vouchers after the checkpoint
+		update_gl_entries_for_reposted_stock_vouchers()
+		frappe.flags.stock_ledger_vouchers_reposted = []
+		frappe.flags.stock_ledger_vouchers_visited = set()
+		frappe.flags.stock_ledger_vouchers_value_changed = set()
+
+		self.set_resume_point(next_sle)
+		self.pending_dependents = frappe.as_json(repost_queue.get_pending())
+		self.sles_reposted = self.sles_reposted_before_run + sles_processed
+		self.db_update()
+		frappe.db.commit()
+
+		if time_diff_in_seconds(now_datetime(), self.started_on) > repost_job_time_limit:
+			raise RepostTimeLimitReached
+
+	@frappe.whitelist()
+	def retry(self):
+		if self.status != "Failed":
+			frappe.throw(_("Only failed jobs can be retried"))
+
+		self.status = "Queued"
+		self.error_log = None
+		self.save()
+
+
+def get_job_start(d):
+	return frappe._dict({
+		"posting_date": d.posting_date,
+		"posting_time": d.posting_time,
+		"creation": d.sle_creation,
+	})
+
+
+def make_repost_job(sle, allow_negative_stock=False, via_landed_cost_voucher=False):
+	"""Queue reposting of a bin from the given Stock Ledger Entry, merging with an already queued job of the bin"""
+	from erpnext.stock.stock_ledger import get_sle_sort_key
+
+	start = frappe._dict({
+		"batch_no": sle.batch_no,
+		"posting_date": sle.posting_date,
+		"posting_time": sle.posting_time,
+		"sle_creation": sle.creation,
+		"sle_id": sle.name,
+		"voucher_type": sle.voucher_type,
+		"voucher_no": sle.voucher_no,
+	})
+
+	existing = frappe.db.get_value("Stock Repost Job", {
+		"item_code": sle.item_code,
+		"warehouse": sle.warehouse,
+		"status": "Queued"
+	}, "name")
+
+	if existing:
+		job = frappe.get_doc("Stock Repost Job", existing)
+		if get_sle_sort_key(get_job_start(start)) < get_sle_sort_key(get_job_start(job)):
+			job.set_start(start)
+
+		job.allow_negative_stock = cint(job.allow_negative_stock or allow_negative_stock)
+		job.via_landed_cost_voucher = cint(job.via_landed_cost_voucher and via_landed_cost_voucher)
+		job.save(ignore_permissions=True)
+	else:
+		job = frappe.new_doc("Stock Repost Job")
+		job.update(start)
+		job.update({
+			"item_code": sle.item_code,
+			"warehouse": sle.warehouse,
+			"allow_negative_stock": cint(allow_negative_stock),
+			"via_landed_cost_voucher": cint(via_landed_cost_voucher),
+		})
+		job.insert(ignore_permissions=True)
+
+	return job
+
+
+def make_repost_jobs_from_queue(repost_queue, allow_negative_stock=False, via_landed_cost_voucher=False):
+	jobs = []
+	while True:
+		d = repost_queue.pop()
+		if not d:
+			break
+
+		jobs.append(make_repost_job(d, allow_negative_stock=allow_negative_stock,
+			via_landed_cost_voucher=via_landed_cost_voucher))
+
+	return jobs
+
+
+def get_next_repost_job():
+	"""
+		Claims and returns the next job, resuming interrupted jobs first. Queued jobs of a bin being reposted by
+		another run are left for later.
+	"""
+	stale_before = add_to_date(now_datetime(), seconds=-repost_job_stale_after)
+
+	jobs = frappe.db.sql_list("""
+		select job.name
+		from `tabStock Repost Job` job
+		where (job.status = 'Queued' or (job.status = 'In Progress' and job.started_on < %(stale_before)s))
+			and not exists(select running.name from `tabStock Repost Job` running
+				where running.item_code = job.item_code and running.warehouse = job.warehouse
+					and running.status = 'In Progress' and running.started_on >= %(stale_before)s)
+		order by job.status = 'In Progress' desc, job.posting_date, job.posting_time, job.sle_creation
+		limit 10
+	""", {"stale_before": stale_before})
+
+	for name in jobs:
+		if claim_repost_job(name, stale_before):
+			return frappe.get_doc("Stock Repost Job", name)
+
+	return None
+
+
+def claim_repost_job(name, stale_before):
+	"""Marks the job In Progress for this run, unless another run claimed it first"""
+	worker = frappe.generate_hash(length=10)
+
+	# the update re-checks the status after waiting for the row lock of a concurrent claim
+	frappe.db.sql("""
+		update `tabStock Repost Job`
+		set status = 'In Progress', worker = %s, started_on = %s
+		where name = %s and (status = 'Queued' or (status = 'In Progress' and started_on < %s))
+	""", (worker, now_datetime(), name, stale_before))
+	frappe.db.commit()
+
+	return frappe.db.get_value("Stock Repost Job", name, "worker") == worker
+
+
+def get_repost_checkpoint_interval():
+	return cint(frappe.db.get_single_value("Stock Settings", "repost_checkpoint_interval", cache=True)) or 5000
+
+
+def process_repost_jobs():
+	"""Scheduled job to claim the next queued stock repost and run it in its own background job"""
+	job = get_next_repost_job()
+	if job:
+		enqueue_repost_job(job.name)
+
+
+def enqueue_repost_job(repost_job):
+	frappe.enqueue("erpnext.stock.doctype.stock_repost_job.stock_repost_job.run_repost_job",
+		queue="long", timeout=repost_job_timeout, repost_job=repost_job, now=frappe.flags.in_test)
+
+
+def run_repost_job(repost_job):
+	job = frappe.get_doc("Stock Repost Job", repost_job)
+	job.run()
+
+	# the next job is claimed once this one is done, after the dependent bins it queued,
+	# unless it continues in a new background job
+	if job.status != "In Progress":
+		process_repost_jobs()
+
+
+def on_doctype_update():
+	frappe.db.add_index("Stock Repost Job", ["status", "item_code", "warehouse"])
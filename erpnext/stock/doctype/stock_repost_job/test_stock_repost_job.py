@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+import unittest
+from frappe.utils import add_days, add_to_date, now_datetime, nowdate
+from erpnext.stock.doctype.item.test_item import create_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.doctype.stock_repost_job.stock_repost_job import (make_repost_job, get_next_repost_job,
+	claim_repost_job, process_repost_jobs, repost_job_stale_after, repost_job_time_limit)
+from erpnext.stock.stock_ledger import update_entries_after, NegativeStockError
+
+test_item = "_Test Stock Repost Job Item"
+test_warehouse = "_Test Warehouse - _TC"
+
+
+class TestStockRepostJob(unittest.TestCase):
+	def setUp(self):
+		create_item(test_item, is_stock_item=1)
+		frappe.db.sql("delete from `tabStock Repost Job`")
+
+	def tearDown(self):
+		frappe.db.set_value("Stock Settings", None, "repost_in_background", 0)
+		frappe.db.set_value("Stock Settings", None, "repost_checkpoint_interval", 0)
+		frappe.db.rollback()
+
+	def test_merge_queued_jobs(self):
+		se1 = make_stock_entry(item_code=test_item, to_warehouse=test_warehouse, qty=10, rate=100,
+			posting_date=add_days(nowdate(), -5))
+		se2 = make_stock_entry(item_code=test_item, to_warehouse=test_warehouse, qty=10, rate=100,
+			posting_date=add_days(nowdate(), -3))
+
+		job = make_repost_job(get_sle(se2))
+		self.assertEqual(make_repost_job(get_sle(se1)).name, job.name)
+
+		job.reload()
+		self.assertEqual(job.sle_id, get_sle(se1).name)
+		self.assertEqual(frappe.db.count("Stock Repost Job", {"item_code": test_item, "status": "Queued"}), 1)
+
+	def test_run_repost_job(self):
+		make_stock_entry(item_code=test_item, to_warehouse=test_warehouse, qty=10, rate=100,
+			posting_date=add_days(nowdate(), -5))
+		make_stock_entry(item_code=test_item, from_warehouse=test_warehouse, qty=5,
+			posting_date=add_days(nowdate(), -1))
+
+		frappe.db.set_value("Stock Settings", None, "repost_in_background", 1)
+		make_stock_entry(item_code=test_item, to_warehouse=test_warehouse, qty=10, rate=200,
+			posting_date=add_days(nowdate(), -3))
+
+		job_name = frappe.db.get_value("Stock Repost Job", {"item_code": test_item, "status": "Queued"})
+		self.assertTrue(job_name)
+
+		process_repost_jobs()
+		self.assertEqual(frappe.db.get_value("Stock Repost Job", job_name, "status"), "Completed")
+		self.assertEqual(frappe.db.get_value("Bin", {"item_code": test_item, "warehouse": test_warehouse},
+			"actual_qty"), 15)
+
+		# the same values as reposting the whole ledger of the bin in the foreground
+		reposted_values = get_ledger_values()
+		update_entries_after({
+			"item_code": test_item,
+			"warehouse": test_warehouse,
+			"posting_date": add_days(nowdate(), -10),
+			"posting_time": "00:00"
+		})
+		self.assertEqual(get_ledger_values(), reposted_values)
+
+	def test_resume_from_checkpoint(self):
+		make_stock_entry(item_code=test_item, to_warehouse=test_warehouse, qty=20, rate=100,
+			posting_date=add_days(nowdate(), -6))
+		for days in (-4, -3, -2, -1):
+			make_stock_entry(item_code=test_item, from_warehouse=test_warehouse, qty=2,
+				posting_date=add_days(nowdate(), days))
+
+		frappe.db.set_value("Stock Settings", None, "repost_in_background", 1)
+		frappe.db.set_value("Stock Settings", None, "repost_checkpoint_interval", 2)
+		make_stock_entry(item_code=test_item, to_warehouse=test_warehouse, qty=10, rate=400,
+			posting_date=add_days(nowdate(), -5))
+
+		# a run past its time limit stops at the first checkpoint and continues in a new background job
+		job = get_next_repost_job()
+		job.db_set("started_on", add_to_date(now_datetime(), seconds=-repost_job_time_limit - 60),
+			update_modified=False)
+		job.run()
+
+		job.reload()
+		self.assertEqual(job.status, "Completed")
+		self.assertEqual(job.sles_reposted, 4)
+		self.assertFalse(job.resume_sle_id)
+
+		reposted_values = get_ledger_values()
+		update_entries_after({
+			"item_code": test_item,
+			"warehouse": test_warehouse,
+			"posting_date": add_days(nowdate(), -10),
+			"posting_time": "00:00"
+		})
+		self.assertEqual(get_ledger_values(), reposted_values)
+
+	def test_negative_stock_of_deferred_entries(self):
+		make_stock_entry(item_code=test_item, to_warehouse=test_warehouse, qty=10, rate=100,
+			posting_date=add_days(nowdate(), -5))
+		make_stock_entry(item_code=test_item, from_warehouse=test_warehouse, qty=8,
+			posting_date=add_days(nowdate(), -1))
+
+		# the backdated issue leaves enough stock for itself but not for the later issue
+		frappe.db.set_value("Stock Settings", None, "repost_in_background", 1)
+		self.assertRaises(NegativeStockError, make_stock_entry, item_code=test_item, from_warehouse=test_warehouse,
+			qty=5, posting_date=add_days(nowdate(), -3))
+
+	def test_resume_interrupted_job(self):
+		se = make_stock_entry(item_code=test_item, to_warehouse=test_warehouse, qty=10, rate=100,
+			posting_date=add_days(nowdate(), -5))
+		job = make_repost_job(get_sle(se))
+
+		stale_before = add_to_date(now_datetime(), seconds=-repost_job_stale_after)
+		self.assertTrue(claim_repost_job(job.name, stale_before))
+
+		# a job being run is not claimed again by another run
+		self.assertFalse(claim_repost_job(job.name, stale_before))
+		self.assertEqual(get_next_repost_job(), None)
+
+		# until it was started longer ago than any run can take
+		frappe.db.set_value("Stock Repost Job", job.name, "started_on",
+			add_to_date(now_datetime(), seconds=-repost_job_stale_after - 60), update_modified=False)
+		resumed_job = get_next_repost_job()
+		self.assertEqual(resumed_job.name, job.name)
+
+		resumed_job.run()
+		self.assertEqual(frappe.db.get_value("Stock Repost Job", job.name, "status"), "Completed")
+
+
+def get_sle(stock_entry):
+	return frappe.get_all("Stock Ledger Entry", filters={"voucher_type": "Stock Entry", "voucher_no": stock_entry.name},
+		fields=["*"])[0]
+
+
+def get_ledger_values():
+	sles = frappe.get_all("Stock Ledger Entry", filters={"item_code": test_item, "warehouse": test_warehouse},
+		fields=["name", "qty_after_transaction", "valuation_rate", "stock_value", "stock_value_difference"],
+		order_by="posting_date, posting_time, creation")
+	bin_values = frappe.db.get_value("Bin", {"item_code": test_item, "warehouse": test_warehouse},
+		["actual_qty", "valuation_rate", "stock_value"], as_dict=1)
+
+	return sles, bin_values
@@ -8,6 +8,7 @@ from frappe import _
 from frappe.utils import cint
 from frappe.model.document import Document
 from frappe.utils.html_utils import clean_html
+from erpnext.stock.doctype.item_search_trigram.item_search_trigram import clear_item_search_index
 
 
 class StockSettings(Document):
@@ -18,6 +19,7 @@ class StockSettings(Document):
 		self.validate_warehouses()
 		self.cant_change_valuation_method()
 		self.validate_clean_description_html()
+		self.update_item_search_index()
 
 		if cint(self.enable_dynamic_bundling):
 			make_bundling_fields()
@@ -81,6 +83,17 @@ class StockSettings(Document):
 			frappe.enqueue('erpnext.stock.doctype.stock_settings.stock_settings.clean_all_descriptions', now=frappe.flags.in_test)
 
 
+	def update_item_search_index(self):
+		if cint(self.use_item_search_index) == cint(self.db_get('use_item_search_index')):
+			return
+
+		if cint(self.use_item_search_index):
+			frappe.enqueue('erpnext.stock.doctype.item_search_trigram.item_search_trigram.build_item_search_index',
+				queue='long', timeout=3600, enqueue_after_commit=True, now=frappe.flags.in_test)
+		else:
+			clear_item_search_index()
+
+
 def clean_all_descriptions():
 	for item in frappe.get_all('Item', ['name', 'description']):
 		if item.description:
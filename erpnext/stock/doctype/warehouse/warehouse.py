@@ -6,6 +6,7 @@ from frappe.utils import cint, nowdate
 from frappe import throw, _
 from frappe.utils.nestedset import NestedSet
 from erpnext.stock import get_warehouse_account
+from erpnext.utilities.tree_closure import get_descendants
 from frappe.contacts.address_and_contact import load_address_and_contact
 
 class Warehouse(NestedSet):
@@ -176,10 +177,7 @@ def convert_to_group_or_ledger():
 	return frappe.get_doc("Warehouse", args.docname).convert_to_group_or_ledger()
 
 def get_child_warehouses(warehouse):
-	lft, rgt = frappe.get_cached_value("Warehouse", warehouse, ["lft", "rgt"])
-
-	return frappe.db.sql_list("""select name from `tabWarehouse`
-		where lft >= %s and rgt <= %s""", (lft, rgt))
+	return get_descendants("Warehouse", warehouse)
 
 def get_warehouses_based_on_account(account, company=None):
 	warehouses = []
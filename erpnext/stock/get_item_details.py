@@ -11,6 +11,8 @@ from erpnext import get_company_currency
 from erpnext.stock.doctype.item.item import get_uom_conv_factor, convert_item_uom_for
 from erpnext.setup.doctype.item_default_rule.item_default_rule import get_item_default_values
 from erpnext.stock.doctype.price_list.price_list import get_price_list_details
+from erpnext.stock.doctype.item_price.item_price import (get_item_price_intervals, get_prices_from_intervals,
+	clear_item_price_cache)
 from erpnext.stock.doctype.item_manufacturer.item_manufacturer import get_item_manufacturer_part_no
 from erpnext.selling.doctype.sales_commission_category.sales_commission_category import get_commission_rate
 from erpnext.vehicles.doctype.vehicle.vehicle import get_vehicle_from_serial_no
@@ -104,6 +106,81 @@ def get_item_details(args, doc=None, for_validate=False, overwrite_warehouse=Tru
 	return out
 
 
+@frappe.whitelist()
+def get_items_details(args, items, doc=None, for_validate=False, overwrite_warehouse=True):
+	"""
+		Returns get_item_details of each row of items, in the same order
+
+		args: transaction level arguments as for get_item_details
+		items: list of row level arguments, e.g. [{"item_code": "", "qty": 1, "doctype": "", "name": ""}, ...]
+
+		Bins of the items are fetched together and lookups that do not depend on the row, like item defaults,
+		tax maps, exchange rates and pricing rule computations, are done once for all rows.
+	"""
+	if isinstance(args, str):
+		args = json.loads(args)
+	if isinstance(items, str):
+		items = json.loads(items)
+	if isinstance(doc, str):
+		doc = json.loads(doc)
+
+	args = frappe._dict(args)
+	items = [frappe._dict(d) for d in items]
+
+	previous_batches = frappe.flags.item_details_batch, frappe.flags.pricing_rule_batch
+	frappe.flags.item_details_batch = {}
+	frappe.flags.pricing_rule_batch = {}
+
+	try:
+		prefetch_bins(list(set([d.item_code for d in items if d.item_code])))
+
+		out = []
+		for d in items:
+			row_args = frappe._dict(args)
+			row_args.update(d)
+			out.append(get_item_details(row_args, doc, for_validate=for_validate, overwrite_warehouse=overwrite_warehouse))
+
+		return out
+	finally:
+		frappe.flags.item_details_batch, frappe.flags.pricing_rule_batch = previous_batches
+
+
+def get_item_details_batch_value(key, generator):
+	"""Returns the value of key computed once for the rows of get_items_details, if called from it"""
+	batch = frappe.flags.item_details_batch
+	if batch is None:
+		return generator()
+
+	if key not in batch:
+		batch[key] = generator()
+
+	return batch[key]
+
+
+def prefetch_bins(item_codes):
+	batch = frappe.flags.item_details_batch
+	batch["bins"] = {}
+	batch["bin_item_codes"] = set(item_codes)
+
+	if item_codes:
+		for d in frappe.db.sql("""
+			select item_code, warehouse, projected_qty, actual_qty, reserved_qty, valuation_rate
+			from `tabBin`
+			where item_code in %s
+		""", [item_codes], as_dict=1):
+			batch["bins"][(d.item_code, d.warehouse)] = d
+
+
+def get_prefetched_bin(item_code, warehouse):
+	"""Returns the Bin prefetched by get_items_details, an empty dict if there is no such Bin
+		or None if Bins of the item were not prefetched"""
+	batch = frappe.flags.item_details_batch
+	if batch is None or item_code not in batch.get("bin_item_codes", ()):
+		return None
+
+	return batch["bins"].get((item_code, warehouse), {})
+
+
 def update_stock(args, out):
 	if (args.get("doctype") == "Delivery Note" or
 		(args.get("doctype") == "Sales Invoice" and args.get('update_stock'))) \
@@ -471,6 +548,11 @@ def get_multiple_item_tax_maps(item_tax_templates, company, transaction_date=Non
 
 @frappe.whitelist()
 def get_item_tax_map(item_tax_template, company, transaction_date=None, as_json=True):
+	return get_item_details_batch_value(("item_tax_map", item_tax_template, company, cstr(transaction_date), cint(as_json)),
+		lambda: _get_item_tax_map(item_tax_template, company, transaction_date, as_json))
+
+
+def _get_item_tax_map(item_tax_template, company, transaction_date=None, as_json=True):
 	item_tax_map = {}
 
 	if item_tax_template:
@@ -807,6 +889,7 @@ def insert_item_price(args):
 			if item_price and item_price.name:
 				if item_price.price_list_rate != price_list_rate:
 					frappe.db.set_value('Item Price', item_price.name, "price_list_rate", price_list_rate)
+					clear_item_price_cache(args.item_code)
 					frappe.msgprint(_("Item Price updated for {0} in Price List {1}").format(args.item_code,
 						args.price_list), alert=True)
 			else:
@@ -902,41 +985,14 @@ def get_item_price(args, item_code, ignore_party=False):
 
 	args['item_code'] = item_code
 
-	conditions = """where item_code = %(item_code)s and price_list = %(price_list)s"""
-	order_by = "order by ifnull(valid_from, '2000-01-01') desc, uom desc"
+	if args.get('transaction_date') and args.get('period') == 'future':
+		args['uom'] = args.get('uom', '')
 
-	if not ignore_party:
-		if args.get("customer"):
-			conditions += " and customer=%(customer)s"
-		elif args.get("supplier"):
-			conditions += " and supplier=%(supplier)s"
-		else:
-			conditions += " and (customer is null or customer = '') and (supplier is null or supplier = '')"
+	intervals = get_item_price_intervals(args.get("price_list"), [item_code]).get(item_code)
+	if not intervals:
+		return None
 
-	if args.get('transaction_date'):
-		if args.get('period') == 'future':
-			args['uom'] = args.get('uom', '')
-			conditions += """ and ifnull(valid_from, '2000-01-01') > %(transaction_date)s and ifnull(uom, '') = %(uom)s"""
-			order_by = "order by valid_from asc "
-		else:
-			conditions += """ and (
-				%(transaction_date)s between valid_from and valid_upto
-				or (valid_upto is null and %(transaction_date)s >= valid_from)
-				or (valid_from is null and %(transaction_date)s <= valid_upto)
-				or (valid_from is null and valid_upto is null)
-			)"""
-
-	prices = frappe.db.sql("""
-		select name,
-			price_list_rate,
-			uom,
-			ifnull(valid_from, '2000-01-01') as valid_from,
-			ifnull(valid_upto, '2500-12-31') as valid_upto,
-			packing_unit
-		from `tabItem Price`
-		{conditions}
-		{order_by}
-	""".format(conditions=conditions, order_by=order_by), args, as_dict=1)
+	prices = get_prices_from_intervals(intervals, args, ignore_party=ignore_party)
 
 	matches_uom = [d for d in prices if cstr(d.uom) == cstr(args.get('uom'))]
 	if matches_uom:
@@ -945,12 +1001,11 @@ def get_item_price(args, item_code, ignore_party=False):
 	has_uom = [d for d in prices if d.uom]
 	if has_uom:
 		# there are item prices with uom other than the current uom
-		item = frappe.get_cached_doc("Item", item_code)
-		item_uoms = [d.uom for d in item.uoms]
+		item_uoms = intervals["item_uoms"]
 
 		convertible_prices = [d for d in has_uom if d.uom in item_uoms]
 		if convertible_prices:
-			has_uom_other_than_stock_uom = [d for d in convertible_prices if cstr(d.uom) != cstr(item.stock_uom)]
+			has_uom_other_than_stock_uom = [d for d in convertible_prices if cstr(d.uom) != cstr(intervals["stock_uom"])]
 			if has_uom_other_than_stock_uom:
 				return has_uom_other_than_stock_uom[0]
 
@@ -1193,6 +1248,11 @@ def get_projected_qty(item_code, warehouse):
 @frappe.whitelist()
 def get_bin_details(item_code, warehouse):
 	def generator():
+		bin = get_prefetched_bin(item_code, warehouse)
+		if bin is not None:
+			return frappe._dict({"projected_qty": bin.get("projected_qty"), "actual_qty": bin.get("actual_qty"),
+				"reserved_qty": bin.get("reserved_qty")}) if bin else {"projected_qty": 0, "actual_qty": 0, "reserved_qty": 0}
+
 		return frappe.db.get_value(
 			"Bin",
 			{"item_code": item_code, "warehouse": warehouse},
@@ -1335,8 +1395,10 @@ def get_price_list_currency_and_exchange_rate(args):
 	if (not plc_conversion_rate) or (price_list_currency and args.price_list_currency \
 		and price_list_currency != args.price_list_currency):
 			# cksgb 19/09/2016: added args.transaction_date as posting_date argument for get_exchange_rate
-			plc_conversion_rate = get_exchange_rate(price_list_currency, company_currency,
-				args.transaction_date, args.exchange_rate) or plc_conversion_rate
+			plc_conversion_rate = get_item_details_batch_value(("exchange_rate", price_list_currency, company_currency,
+				cstr(args.transaction_date), args.exchange_rate),
+				lambda: get_exchange_rate(price_list_currency, company_currency, args.transaction_date, args.exchange_rate)) \
+				or plc_conversion_rate
 
 	return frappe._dict({
 		"price_list_currency": price_list_currency,
@@ -1401,13 +1463,18 @@ def get_valuation_rate(item_code, company, warehouse=None, transaction_type_name
 		if not warehouse:
 			warehouse = default_values.get("default_warehouse")
 
+		bin = get_prefetched_bin(item_code, warehouse)
+		if bin is not None:
+			return frappe._dict({"valuation_rate": bin.get("valuation_rate")}) if bin else {"valuation_rate": 0}
+
 		return frappe.db.get_value("Bin", {"item_code": item_code, "warehouse": warehouse},
 			["valuation_rate"], as_dict=True) or {"valuation_rate": 0}
 
 	elif not item.get("is_stock_item"):
-		valuation_rate = frappe.db.sql("""select sum(base_net_amount) / sum(qty*conversion_factor)
-			from `tabPurchase Invoice Item`
-			where item_code = %s and docstatus=1""", item_code)
+		valuation_rate = get_item_details_batch_value(("purchase_valuation_rate", item_code),
+			lambda: frappe.db.sql("""select sum(base_net_amount) / sum(qty*conversion_factor)
+				from `tabPurchase Invoice Item`
+				where item_code = %s and docstatus=1""", item_code))
 
 		if valuation_rate:
 			return {"valuation_rate": valuation_rate[0][0] or 0.0}
@@ -1449,7 +1516,9 @@ def get_serial_no(args, serial_nos=None, sales_order=None):
 
 
 def update_party_blanket_order(args, out):
-	blanket_order_details = get_blanket_order_details(args)
+	blanket_order_details = get_item_details_batch_value(("blanket_order", args.item_code, args.company, args.doctype,
+		args.customer, args.supplier, args.blanket_order, cstr(args.transaction_date)),
+		lambda: get_blanket_order_details(args))
 	if blanket_order_details:
 		out.update(blanket_order_details)
 
@@ -32,12 +32,11 @@ class StockAgeingReport:
 		if not self.items and self.items is not None:
 			return self.columns, []
 
-		self.get_stock_ledger_entries()
-		if not self.sles:
+		self.get_fifo_queue_map()
+		if not self.fifo_queue_map:
 			return self.columns, []
 
 		self.get_item_details_map()
-		self.get_fifo_queue_map()
 		self.get_packing_slip_map()
 		self.get_rows()
 
@@ -47,15 +46,11 @@ class StockAgeingReport:
 		self.items = get_items_for_stock_report(self.filters)
 		return self.items
 
-	def get_stock_ledger_entries(self):
-		self.sles = get_stock_ledger_entries_for_stock_report(self.filters, self.items)
-		return self.sles
-
 	def get_item_details_map(self):
 		self.item_map = {}
 
 		if not self.items:
-			self.items = list(set([d.item_code for d in self.sles]))
+			self.items = list(set([d["details"].item_code for d in self.fifo_queue_map.values()]))
 		if not self.items:
 			return self.item_map
 
@@ -73,7 +68,8 @@ class StockAgeingReport:
 		return self.item_map
 
 	def get_fifo_queue_map(self):
-		self.fifo_queue_map = get_fifo_queue(self.sles,
+		sles = get_stock_ledger_entries_for_stock_report(self.filters, self.items)
+		self.fifo_queue_map = get_fifo_queue(sles,
 			include_warehouse=self.is_warehouse_included(),
 			include_batch=self.is_batch_included(),
 			include_package=self.is_package_included(),
@@ -189,16 +185,65 @@ class StockAgeingReport:
 		return self.columns
 
 
-def get_fifo_queue(sles, include_warehouse, include_batch, include_package):
-	fifo_queue_map = {}
-	transferred_item_details = {}
-	serial_no_batch_purchase_details = {}
+def get_fifo_queue(sles, include_warehouse, include_batch, include_package, fifo_queue_map=None):
+	fifo_queue_map = update_fifo_queue(sles, include_warehouse, include_batch, include_package,
+		fifo_queue_map=fifo_queue_map)
+	return sort_fifo_queue_map(fifo_queue_map)
+
+
+def sort_fifo_queue_map(fifo_queue_map):
+	# sort and filter
+	sort_key = lambda x: x[1]
+	for key in fifo_queue_map:
+		fifo_queue_map[key]['fifo_queue'] = sorted(filter(sort_key, fifo_queue_map[key]['fifo_queue']), key=sort_key)
+
+	return fifo_queue_map
+
+
+def update_fifo_queue(sles, include_warehouse, include_batch, include_package, fifo_queue_map=None):
+	"""
+		Replay sles over fifo_queue_map, the unsorted queues of a previous replay, or over empty queues.
+		Serial Nos continue with the purchase date of their queue entry, if any.
+	"""
+	fifo_queue_replay = FIFOQueueReplay(include_warehouse, include_batch, include_package,
+		fifo_queue_map=fifo_queue_map)
 
 	for sle in sles:
-		fifo_dict = get_fifo_dict(sle, fifo_queue_map,
-			include_warehouse=include_warehouse,
-			include_batch=include_batch,
-			include_package=include_package,
+		fifo_queue_replay.add_sle(sle)
+
+	return fifo_queue_replay.fifo_queue_map
+
+
+class FIFOQueueReplay(object):
+	"""Stock ageing FIFO queues updated one Stock Ledger Entry at a time, in posting order"""
+	def __init__(self, include_warehouse, include_batch, include_package, fifo_queue_map=None):
+		self.include_warehouse = include_warehouse
+		self.include_batch = include_batch
+		self.include_package = include_package
+
+		self.fifo_queue_map = fifo_queue_map if fifo_queue_map is not None else {}
+		self.transferred_item_details = {}
+		self.serial_no_batch_purchase_details = {}
+		self.posting_date = None
+
+		for fifo_dict in self.fifo_queue_map.values():
+			for batch in fifo_dict["fifo_queue"]:
+				if isinstance(batch[0], str):
+					self.serial_no_batch_purchase_details.setdefault(batch[0], batch[1])
+
+	def add_sle(self, sle):
+		# entries of a voucher are on the same date, so transfers of earlier dates are no longer needed
+		if sle.posting_date != self.posting_date:
+			self.transferred_item_details = {}
+			self.posting_date = sle.posting_date
+
+		transferred_item_details = self.transferred_item_details
+		serial_no_batch_purchase_details = self.serial_no_batch_purchase_details
+
+		fifo_dict = get_fifo_dict(sle, self.fifo_queue_map,
+			include_warehouse=self.include_warehouse,
+			include_batch=self.include_batch,
+			include_package=self.include_package,
 		)
 
 		fifo_queue = fifo_dict["fifo_queue"]
@@ -247,12 +292,8 @@ def get_fifo_queue(sles, include_warehouse, include_batch, include_package):
 		else:
 			fifo_dict["total_qty"] += sle.actual_qty
 
-	# sort and filter
-	sort_key = lambda x: x[1]
-	for key in fifo_queue_map:
-		fifo_queue_map[key]['fifo_queue'] = sorted(filter(sort_key, fifo_queue_map[key]['fifo_queue']), key=sort_key)
-
-	return fifo_queue_map
+	def get_sorted_fifo_queue_map(self):
+		return sort_fifo_queue_map(self.fifo_queue_map)
 
 
 def get_fifo_dict(sle, fifo_queue_map, include_warehouse, include_batch, include_package):
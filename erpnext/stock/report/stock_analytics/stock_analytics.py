@@ -139,7 +139,8 @@ def get_periodic_data(sles, filters):
 def get_data(filters):
 	data = []
 	items = get_items_for_stock_report(filters)
-	sles = get_stock_ledger_entries_for_stock_report(filters, items)
+	# fiscal year lookups of get_period may query, so entries are not processed as a stream
+	sles = list(get_stock_ledger_entries_for_stock_report(filters, items))
 	item_details = get_item_details(items, sles)
 	periodic_data = get_periodic_data(sles, filters)
 	ranges = get_period_date_ranges(filters)
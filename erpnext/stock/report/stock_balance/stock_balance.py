@@ -5,6 +5,7 @@ import frappe
 from frappe import _
 from frappe.utils import flt, cint, getdate, today, cstr, combine_datetime
 from erpnext.stock.utils import update_included_uom_in_dict_report, has_valuation_read_permission
+from erpnext.utilities.cursor import iterate_sql
 from frappe.desk.reportview import build_match_conditions
 from collections import OrderedDict
 
@@ -65,15 +66,15 @@ class StockBalanceReport:
 		if not self.items and self.items is not None:
 			return self.columns, []
 
-		self.get_stock_ledger_entries()
-		if not self.sles:
+		self.get_stock_balance_snapshot()
+		self.get_stock_balance_map()
+		if not self.stock_balance_map:
 			return self.columns, []
 
 		self.get_item_details_map()
 		self.get_item_reorder_map()
 		self.get_purchase_order_map()
-		self.get_ageing_fifo_queue()
-		self.get_stock_balance_map()
+		self.set_ordered_qty()
 		self.clean_stock_balance_map()
 		self.get_packing_slip_map()
 
@@ -95,9 +96,32 @@ class StockBalanceReport:
 		self.items = get_items_for_stock_report(self.filters)
 		return self.items
 
-	def get_stock_ledger_entries(self):
-		self.sles = get_stock_ledger_entries_for_stock_report(self.filters, self.items)
-		return self.sles
+	def get_stock_balance_snapshot(self):
+		from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import get_snapshot_rows
+
+		self.snapshot_date = self.get_usable_snapshot_date()
+		self.snapshot_rows = []
+
+		if self.snapshot_date:
+			self.snapshot_rows = get_snapshot_rows(self.snapshot_date,
+				get_stock_conditions(self.filters, "Stock Balance Snapshot"), self.items,
+				include_fifo_queue=self.include_stock_ageing_data())
+
+		return self.snapshot_rows
+
+	def get_usable_snapshot_date(self):
+		from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import get_usable_snapshot_date
+
+		# snapshots are not filtered by user permissions and do not keep items without stock
+		if build_match_conditions("Stock Ledger Entry") or self.filters.get("show_zero_qty_rows"):
+			return None
+
+		# FIFO queues of snapshots are kept only for each item, warehouse, batch and package
+		if self.include_stock_ageing_data() and not (self.is_warehouse_included() and self.is_batch_included()
+				and self.is_package_included()):
+			return None
+
+		return get_usable_snapshot_date(self.filters.from_date, self.filters.get("company"))
 
 	def get_purchase_order_map(self):
 		self.purchase_order_map = {}
@@ -121,22 +145,11 @@ class StockBalanceReport:
 
 		return self.purchase_order_map
 
-	def get_ageing_fifo_queue(self):
-		from erpnext.stock.report.stock_ageing.stock_ageing import get_fifo_queue
-
-		if self.include_stock_ageing_data():
-			self.fifo_queue_map = get_fifo_queue(self.sles,
-				include_warehouse=self.is_warehouse_included(),
-				include_batch=self.is_batch_included(),
-				include_package=self.is_package_included(),
-			)
-			return self.fifo_queue_map
-
 	def get_item_details_map(self):
 		self.item_map = {}
 
 		if not self.items:
-			self.items = list(set([d.item_code for d in self.sles]))
+			self.items = list(set([d.item_code for d in self.stock_balance_map.values()]))
 		if not self.items:
 			return self.item_map
 
@@ -199,9 +212,36 @@ class StockBalanceReport:
 		return self.packing_slip_map
 
 	def get_stock_balance_map(self):
+		from erpnext.stock.report.stock_ageing.stock_ageing import FIFOQueueReplay
+		from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import get_fifo_queue_map
+
 		self.stock_balance_map = OrderedDict()
 
-		for sle in self.sles:
+		fifo_queue_replay = None
+		if self.include_stock_ageing_data():
+			fifo_queue_replay = FIFOQueueReplay(
+				include_warehouse=self.is_warehouse_included(),
+				include_batch=self.is_batch_included(),
+				include_package=self.is_package_included(),
+				fifo_queue_map=get_fifo_queue_map(self.snapshot_rows),
+			)
+
+		for d in self.snapshot_rows:
+			stock_balance = self.get_balance_dict(self.get_balance_key(d))
+			stock_balance.opening_qty += flt(d.qty)
+			stock_balance.opening_val += flt(d.stock_value)
+			stock_balance.bal_qty += flt(d.qty)
+			stock_balance.bal_val += flt(d.stock_value)
+
+		for stock_balance in self.stock_balance_map.values():
+			if flt(stock_balance.bal_qty, 9):
+				stock_balance.val_rate = flt(stock_balance.bal_val / flt(stock_balance.bal_qty, 9), 9)
+
+		# entries are streamed, no other query can be run until the loop completes
+		for sle in get_stock_ledger_entries_for_stock_report(self.filters, self.items, after_date=self.snapshot_date):
+			if fifo_queue_replay:
+				fifo_queue_replay.add_sle(sle)
+
 			key = self.get_balance_key(sle)
 			stock_balance = self.get_balance_dict(key)
 
@@ -259,13 +299,16 @@ class StockBalanceReport:
 				stock_balance.val_rate = stock_balance.bal_val / flt(stock_balance.bal_qty, 9)
 				stock_balance.val_rate = flt(stock_balance.val_rate, 9)
 
-		if self.purchase_order_map:
-			for key, ordered_qty in self.purchase_order_map.items():
-				stock_balance = self.get_balance_dict(key)
-				stock_balance.ordered_qty = ordered_qty
+		if fifo_queue_replay:
+			self.fifo_queue_map = fifo_queue_replay.get_sorted_fifo_queue_map()
 
 		return self.stock_balance_map
 
+	def set_ordered_qty(self):
+		for key, ordered_qty in self.purchase_order_map.items():
+			stock_balance = self.get_balance_dict(key)
+			stock_balance.ordered_qty = ordered_qty
+
 	def clean_stock_balance_map(self):
 		to_remove = []
 
@@ -591,15 +634,21 @@ def get_items_for_stock_report(filters):
 	return items
 
 
-def get_stock_ledger_entries_for_stock_report(filters, item_list=None):
+def get_stock_ledger_entries_for_stock_report(filters, item_list=None, after_date=None):
+	"""
+		Yields Stock Ledger Entries up to to_date, or only the ones posted after after_date if given,
+		streamed with iterate_sql
+	"""
 	item_conditions = ""
 	if item_list:
 		item_conditions = " and item_code in ({0})".format(
 			', '.join([frappe.db.escape(i, percent=False) for i in item_list]))
 
 	sle_conditions = get_sle_conditions(filters)
+	if after_date:
+		sle_conditions += " and posting_date > {0}".format(frappe.db.escape(str(after_date)))
 
-	sles = frappe.db.sql("""
+	return iterate_sql("""
 		select
 			item_code, warehouse, company, batch_no, packing_slip, serial_no,
 			actual_qty, valuation_rate, qty_after_transaction, stock_value_difference,
@@ -607,33 +656,44 @@ def get_stock_ledger_entries_for_stock_report(filters, item_list=None):
 		from `tabStock Ledger Entry` force index (posting_sort_index)
 		where docstatus < 2 {0} {1}
 		order by posting_date, posting_time, creation, actual_qty
-	""".format(item_conditions, sle_conditions), as_dict=1)
-
-	return sles
+	""".format(item_conditions, sle_conditions))
 
 
 def get_sle_conditions(filters):
 	conditions = []
 
-	if filters.get("company"):
-		conditions.append("company = {0}".format(frappe.db.escape(filters.get("company"))))
-
 	if filters.get("to_date"):
 		conditions.append("posting_date <= {0}".format(frappe.db.escape(filters.get("to_date"))))
 
+	conditions += get_stock_conditions(filters, "Stock Ledger Entry")
+
+	match_conditions = build_match_conditions("Stock Ledger Entry")
+	if match_conditions:
+		conditions.append(match_conditions)
+
+	return " and {0}".format(" and ".join(conditions)) if conditions else ""
+
+
+def get_stock_conditions(filters, doctype):
+	"""Conditions on company, warehouse, batch and package of a table of doctype"""
+	conditions = []
+
+	if filters.get("company"):
+		conditions.append("company = {0}".format(frappe.db.escape(filters.get("company"))))
+
 	if filters.get("warehouse"):
 		warehouse_details = frappe.db.get_value("Warehouse", filters.get("warehouse"), ["lft", "rgt"], as_dict=1)
 		if not warehouse_details:
 			frappe.throw(_("Warehouse {0} does not exist").format(filters.get("warehouse")))
 
 		conditions.append("""exists (select wh.name from `tabWarehouse` wh
-			where wh.lft >= {0} and wh.rgt <= {1} and `tabStock Ledger Entry`.warehouse = wh.name)
-		""".format(warehouse_details.lft, warehouse_details.rgt))
+			where wh.lft >= {0} and wh.rgt <= {1} and `tab{2}`.warehouse = wh.name)
+		""".format(warehouse_details.lft, warehouse_details.rgt, doctype))
 
 	elif filters.get("warehouse_type"):
 		conditions.append("""exists (select name from `tabWarehouse` wh \
-			where wh.warehouse_type = {0} and `tabStock Ledger Entry`.warehouse = wh.name)
-		""".format(frappe.db.escape(filters.get("warehouse_type"))))
+			where wh.warehouse_type = {0} and `tab{1}`.warehouse = wh.name)
+		""".format(frappe.db.escape(filters.get("warehouse_type")), doctype))
 
 	if filters.get("batch_no"):
 		conditions.append("batch_no = {0}".format(frappe.db.escape(filters.get("batch_no"))))
@@ -646,11 +706,7 @@ def get_sle_conditions(filters):
 	elif filters.get("package_wise_stock") == "Unpacked Stock":
 		conditions.append("(packing_slip = '' or packing_slip is null)")
 
-	match_conditions = build_match_conditions("Stock Ledger Entry")
-	if match_conditions:
-		conditions.append(match_conditions)
-
-	return " and {0}".format(" and ".join(conditions)) if conditions else ""
+	return conditions
 
 
 def is_warehouse_included(filters):
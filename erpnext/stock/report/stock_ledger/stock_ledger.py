@@ -9,6 +9,7 @@ from erpnext.stock.report.stock_balance.stock_balance import get_items_for_stock
 from erpnext.accounts.party import set_party_name_in_list
 from frappe.desk.query_report import group_report_data
 from frappe.desk.reportview import build_match_conditions
+from erpnext.utilities.cursor import iterate_sql
 
 
 def execute(filters=None):
@@ -18,8 +19,7 @@ def execute(filters=None):
 
 	include_uom = filters.get("include_uom")
 	items = get_items_for_stock_report(filters)
-	sl_entries = get_stock_ledger_entries(filters, items)
-	item_details = get_item_details(items, sl_entries, include_uom)
+	item_details = get_item_details(items or get_stock_ledger_item_codes(filters), include_uom=include_uom)
 	opening_row = get_opening_balance(filters.item_code, filters.warehouse, filters.from_date)
 
 	data = []
@@ -37,7 +37,8 @@ def execute(filters=None):
 
 	actual_qty = stock_value = 0
 
-	for sle in sl_entries:
+	# entries are streamed, no other query can be run until the loop completes
+	for sle in get_stock_ledger_entries(filters, items):
 		item_detail = item_details[sle.item_code]
 		alt_uom_size = item_detail.alt_uom_size if filters.qty_field == "Contents Qty" and item_detail.alt_uom else 1.0
 
@@ -159,12 +160,8 @@ def get_columns(filters, item_details, show_amounts=True, show_item_name=True):
 
 
 def get_stock_ledger_entries(filters, items):
-	item_conditions_sql = ''
-	if items:
-		item_conditions_sql = 'and item_code in ({})'\
-			.format(', '.join([frappe.db.escape(i) for i in items]))
-
-	return frappe.db.sql("""select concat_ws(" ", posting_date, posting_time) as date,
+	"""Yields Stock Ledger Entries of the report, streamed with iterate_sql"""
+	return iterate_sql("""select concat_ws(" ", posting_date, posting_time) as date,
 			item_code, warehouse, actual_qty, qty_after_transaction, incoming_rate, valuation_rate,
 			stock_value, voucher_type, voucher_no, batch_no, serial_no, company, project, stock_value_difference,
 			party_type, party,
@@ -177,8 +174,22 @@ def get_stock_ledger_entries(filters, items):
 			order by posting_date asc, posting_time asc, creation asc"""\
 		.format(
 			sle_conditions=get_sle_conditions(filters),
-			item_conditions_sql=item_conditions_sql
-		), filters, as_dict=1)
+			item_conditions_sql=get_item_conditions(items)
+		), filters)
+
+
+def get_stock_ledger_item_codes(filters):
+	return frappe.db.sql_list("""select distinct item_code
+		from `tabStock Ledger Entry`
+		where posting_date between %(from_date)s and %(to_date)s
+			{sle_conditions}""".format(sle_conditions=get_sle_conditions(filters)), filters)
+
+
+def get_item_conditions(items):
+	if not items:
+		return ''
+
+	return 'and item_code in ({})'.format(', '.join([frappe.db.escape(i) for i in items]))
 
 
 def get_item_details(items, sl_entries=None, include_uom=None):
@@ -3,10 +3,12 @@
 import frappe
 import erpnext
 from frappe import _
-from frappe.utils import cint, flt, now, cstr
+from frappe.utils import cint, flt, now, cstr, getdate, get_datetime, to_timedelta
 from erpnext.stock.utils import get_valuation_method
-import json
+from erpnext.stock.valuation import load_stock_queue, dump_stock_queue
+from erpnext.utilities.profiler import profile_phase
 import datetime
+import heapq
 
 
 class NegativeStockError(frappe.ValidationError):
@@ -16,15 +18,18 @@ class NegativeStockError(frappe.ValidationError):
 _exceptions = frappe.local('stockledger_exceptions')
 
 
+@profile_phase("make_sl_entries")
 def make_sl_entries(sl_entries, is_amended=None, allow_negative_stock=False, via_landed_cost_voucher=False):
 	if sl_entries:
 		from erpnext.stock.utils import update_bin
+		from erpnext.stock.doctype.serial_no.serial_no import validate_serial_no_ledger_of_entries
 
 		cancel = True if sl_entries[0].get("is_cancelled") == "Yes" else False
 		if cancel:
 			set_as_cancel(sl_entries[0].get('voucher_no'), sl_entries[0].get('voucher_type'))
 
 		bins_to_update = []
+		serial_no_ledger_entries = []
 
 		for sle in sl_entries:
 			sle_id = None
@@ -35,10 +40,15 @@ def make_sl_entries(sl_entries, is_amended=None, allow_negative_stock=False, via
 			sle_allow_negative_stock = cint(sle.get('allow_negative_stock'))
 
 			if sle.get("actual_qty") or sle.get("voucher_type") == "Stock Reconciliation":
-				sle_doc = make_entry(sle, sle_allow_negative_stock or allow_negative_stock, via_landed_cost_voucher)
+				# serial no ledgers are validated for the whole voucher once all its entries are made
+				sle_doc = make_entry(sle, sle_allow_negative_stock or allow_negative_stock, via_landed_cost_voucher,
+					skip_serial_no_ledger_validation=True)
 				sle_id = sle_doc.get('name')
 				creation = sle_doc.get('creation')
 
+				if not via_landed_cost_voucher and not sle.get("skip_serial_no_ledger_validation"):
+					serial_no_ledger_entries.append(sle_doc)
+
 			args = sle.copy()
 			args.update({
 				"sle_id": sle_id,
@@ -48,6 +58,9 @@ def make_sl_entries(sl_entries, is_amended=None, allow_negative_stock=False, via
 			})
 			bins_to_update.append(args)
 
+		validate_serial_no_ledger_of_entries(serial_no_ledger_entries,
+			sl_entries[0].get('voucher_type'), sl_entries[0].get('voucher_no'))
+
 		for args in bins_to_update:
 			update_bin(args, args.get('allow_negative_stock') or allow_negative_stock, via_landed_cost_voucher)
 
@@ -62,13 +75,22 @@ def set_as_cancel(voucher_type, voucher_no):
 		where voucher_no=%s and voucher_type=%s
 	""", (now(), frappe.session.user, voucher_type, voucher_no))
 
+	frappe.db.sql("""
+		update `tabStock Ledger Entry Serial No` sr
+		inner join `tabStock Ledger Entry` sle on sle.name = sr.parent
+		set sr.is_cancelled = sle.is_cancelled
+		where sle.voucher_no=%s and sle.voucher_type=%s
+	""", (voucher_type, voucher_no))
+
 
-def make_entry(args, allow_negative_stock=False, via_landed_cost_voucher=False):
+def make_entry(args, allow_negative_stock=False, via_landed_cost_voucher=False, skip_serial_no_ledger_validation=False):
 	args.update({"doctype": "Stock Ledger Entry"})
 	sle = frappe.get_doc(args)
 	sle.flags.ignore_permissions = 1
 	sle.allow_negative_stock = allow_negative_stock
 	sle.via_landed_cost_voucher = via_landed_cost_voucher
+	if skip_serial_no_ledger_validation:
+		sle.skip_serial_no_ledger_validation = True
 	# sle.insert()
 	sle.submit()
 	return sle
@@ -114,8 +136,13 @@ class update_entries_after(object):
 				"posting_date": "2012-12-12",
 				"posting_time": "12:00"
 			}
+
+		:param checkpoint: called as checkpoint(next_sle, sles_processed, repost_queue) every checkpoint_interval
+			entries once their values are written, to save the progress of a long repost
 	"""
-	def __init__(self, args, allow_zero_rate=False, allow_negative_stock=None, via_landed_cost_voucher=False, verbose=1):
+	@profile_phase("update_entries_after")
+	def __init__(self, args, allow_zero_rate=False, allow_negative_stock=None, via_landed_cost_voucher=False, verbose=1,
+			repost_queue=None, defer_future_entries=False, checkpoint=None, checkpoint_interval=None):
 		from frappe.model.meta import get_field_precision
 
 		self.exceptions = []
@@ -123,9 +150,16 @@ class update_entries_after(object):
 		self.allow_zero_rate = allow_zero_rate
 		self.allow_negative_stock = allow_negative_stock
 		self.via_landed_cost_voucher = via_landed_cost_voucher
+		self.defer_future_entries = defer_future_entries
+		self.checkpoint = checkpoint
+		self.checkpoint_interval = cint(checkpoint_interval)
 		if not self.allow_negative_stock:
 			self.allow_negative_stock = get_allow_negative_stock()
 
+		# the first instance owns the queue and drains it, dependent bins only add to it
+		self.is_root_repost = repost_queue is None
+		self.repost_queue = repost_queue if repost_queue is not None else RepostQueue()
+
 		self.args = args
 		for key, value in args.items():
 			setattr(self, key, value)
@@ -148,8 +182,11 @@ class update_entries_after(object):
 			frappe.flags.stock_ledger_vouchers_visited = set()
 			frappe.flags.stock_ledger_vouchers_value_changed = set()
 
+		self.writer = StockLedgerEntryWriter()
+
 		self.prev_stock_value = self.previous_sle.stock_value or 0.0
-		self.stock_queue = json.loads(self.previous_sle.stock_queue or "[]")
+		self.stock_queue = load_stock_queue(self.previous_sle.stock_queue)
+		self.compact_stock_queue = cint(frappe.db.get_single_value("Stock Settings", "compact_stock_queue", cache=True))
 		self.valuation_method, self.batch_wise_valuation = get_valuation_method(self.item_code)
 		self.stock_value_difference = 0.0
 		self.build()
@@ -157,18 +194,126 @@ class update_entries_after(object):
 	def build(self):
 		# includes current entry!
 		entries_to_fix = self.get_sle_after_datetime()
+
+		future_entries = []
+		if self.defer_future_entries:
+			entries_to_fix, future_entries = self.split_future_entries(entries_to_fix)
+
 		self.sle_dependency_map = self.get_sle_dependency_map(entries_to_fix)
-		dependent_entries = self.get_dependent_entries_to_fix(entries_to_fix)
+		self.dependency_sle_index = self.get_dependency_sle_index(self.sle_dependency_map)
 
-		for sle in entries_to_fix:
+		# queued and invalidated before processing, so that a checkpoint keeps them for the rest of the repost
+		self.repost_queue.add_entries(self.get_dependent_entries_to_fix(entries_to_fix))
+		self.invalidate_stock_balance_snapshots(entries_to_fix)
+
+		for i, sle in enumerate(entries_to_fix):
 			self.process_sle(sle)
 
+			if self.checkpoint and self.checkpoint_interval and (i + 1) % self.checkpoint_interval == 0 \
+					and i + 1 < len(entries_to_fix) and not self.exceptions:
+				self.writer.flush()
+				self.checkpoint(entries_to_fix[i + 1], i + 1, self.repost_queue)
+
 		if self.exceptions:
 			self.raise_exceptions()
 
-		self.update_bin()
+		if future_entries and not cint(self.allow_negative_stock):
+			self.validate_deferred_negative_stock(entries_to_fix, future_entries)
+
+		self.writer.flush()
+
+		# bin values are set by the deferred repost once it reaches the last entry
+		if not future_entries:
+			self.update_bin()
+
+		self.repost_queue.mark_reposted(self.item_code, self.warehouse, len(entries_to_fix))
+		if future_entries:
+			self.repost_queue.add(future_entries[0])
+
+		if self.is_root_repost:
+			if self.defer_future_entries:
+				self.queue_deferred_reposts()
+			else:
+				self.repost_dependent_bins()
+
+	def invalidate_stock_balance_snapshots(self, entries_to_fix):
+		from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import \
+			invalidate_stock_balance_snapshots
+
+		# a repost without a posting date starts from the first entry of the bin
+		posting_date = self.args.get("posting_date") or (entries_to_fix[0].posting_date if entries_to_fix else None)
+		invalidate_stock_balance_snapshots(self.company, posting_date)
+
+	def split_future_entries(self, entries_to_fix):
+		"""Split entries into those up to the current entry and future entries to be reposted in background"""
+		current_sle_id = self.args.get("sle_id")
+		for i, sle in enumerate(entries_to_fix):
+			if sle.name == current_sle_id:
+				return entries_to_fix[:i + 1], entries_to_fix[i + 1:]
+
+		# current entry is not in the ledger (e.g. cancelled), everything after it is a future entry
+		return [], entries_to_fix
+
+	def validate_deferred_negative_stock(self, entries_to_fix, future_entries):
+		"""
+			Validate negative stock of the future entries deferred to the background repost, which would otherwise
+			only fail there, by adding the actual qty of the current entry to their quantities
+		"""
+		if entries_to_fix:
+			current_sle = entries_to_fix[-1]
+		else:
+			# the reversing entry of a cancelled voucher
+			current_sle = frappe.db.get_value("Stock Ledger Entry", self.args.get("sle_id"),
+				["actual_qty", "batch_no", "packing_slip"], as_dict=1) if self.args.get("sle_id") else None
+
+		if not current_sle or not flt(current_sle.actual_qty):
+			return
+
+		# a stock reconciliation sets the quantity, so entries after it are not affected
+		affected_entries = []
+		for sle in future_entries:
+			if sle.voucher_type == "Stock Reconciliation" and (not self.batch_wise_valuation
+					or sle.batch_no == current_sle.batch_no):
+				break
+			affected_entries.append(sle)
+
+		self.validate_shifted_qty(affected_entries, "qty_after_transaction", current_sle.actual_qty)
+
+		if self.batch_wise_valuation:
+			self.validate_shifted_qty([d for d in affected_entries if d.batch_no == current_sle.batch_no],
+				"batch_qty_after_transaction", current_sle.actual_qty, validate_batch=True)
+
+		packing_slip_key = (cstr(current_sle.batch_no), cstr(current_sle.packing_slip))
+		self.validate_shifted_qty([d for d in affected_entries if (cstr(d.batch_no), cstr(d.packing_slip)) == packing_slip_key],
+			"packed_qty_after_transaction", current_sle.actual_qty, validate_batch=self.batch_wise_valuation,
+			validate_packing_slip=True)
+
+		if self.exceptions:
+			self.raise_exceptions()
+
+	def validate_shifted_qty(self, sles, qty_field, actual_qty, validate_batch=False, validate_packing_slip=False):
+		if not sles:
+			return
+
+		sle = min(sles, key=lambda d: flt(d.get(qty_field)))
+		diff = flt(flt(sle.get(qty_field)) + flt(actual_qty), 9)
+		if diff < 0 and abs(diff) > 0.0001:
+			self.exceptions.append(sle.copy().update({
+				"diff": diff, "validate_batch": validate_batch, "validate_packing_slip": validate_packing_slip
+			}))
+
+	def queue_deferred_reposts(self):
+		from erpnext.stock.doctype.stock_repost_job.stock_repost_job import make_repost_jobs_from_queue
+		make_repost_jobs_from_queue(self.repost_queue, allow_negative_stock=self.allow_negative_stock,
+			via_landed_cost_voucher=self.via_landed_cost_voucher)
+
+	def repost_dependent_bins(self):
+		"""Repost dependent bins iteratively in the order of their earliest affected entry"""
+		while True:
+			d = self.repost_queue.pop()
+			if not d:
+				break
 
-		for d in dependent_entries:
 			update_entries_after({
 				"item_code": d.item_code,
 				"warehouse": d.warehouse,
@@ -178,7 +323,11 @@ class update_entries_after(object):
 				"creation": d.creation,
 				"sle_id": d.name,
 				"voucher_no": d.voucher_no
-			}, allow_negative_stock=self.allow_negative_stock, via_landed_cost_voucher=self.via_landed_cost_voucher)
+			}, allow_negative_stock=self.allow_negative_stock, via_landed_cost_voucher=self.via_landed_cost_voucher,
+				repost_queue=self.repost_queue)
+
+	def get_repost_summary(self):
+		return self.repost_queue.get_summary()
 
 	def update_bin(self):
 		# update bin
@@ -207,7 +356,7 @@ class update_entries_after(object):
 		bin_doc.save(ignore_permissions=True)
 
 	def process_sle(self, sle):
-		from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos, update_args_for_serial_no
+		from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
 
 		self.get_previous_packing_slip_sle(sle)
 		if self.batch_wise_valuation:
@@ -252,7 +401,7 @@ class update_entries_after(object):
 		sle.qty_after_transaction = self.qty_after_transaction
 		sle.valuation_rate = self.valuation_rate
 		sle.stock_value = self.stock_value
-		sle.stock_queue = json.dumps(self.stock_queue)
+		sle.stock_queue = dump_stock_queue(self.stock_queue, compact=self.compact_stock_queue)
 		sle.stock_value_difference = stock_value_difference
 
 		# Batch Values
@@ -280,13 +429,10 @@ class update_entries_after(object):
 				return
 
 		# update SLE and Serial Nos
-		sle.doctype = "Stock Ledger Entry"
 		sle.is_processed = 1
-		frappe.get_doc(sle).db_update()
-
-		for serial_no in serial_nos:
-			sr_doc = frappe.get_doc("Serial No", serial_no)
-			update_args_for_serial_no(sr_doc, serial_no, sle)
+		self.update_dependency_sle_index(sle)
+		self.writer.add_sle(sle)
+		self.writer.add_serial_nos(serial_nos, sle)
 
 		self.add_sle_to_reposted_flags(sle, stock_value_difference_changed)
 
@@ -344,6 +490,7 @@ class update_entries_after(object):
 		if not self.valuation_rate and sle.voucher_detail_no:
 			allow_zero_rate = self.check_if_allow_zero_valuation_rate(sle.voucher_type, sle.voucher_detail_no)
 			if not allow_zero_rate:
+				self.writer.flush_sles()
 				self.valuation_rate = get_valuation_rate(sle.item_code, sle.warehouse,
 					sle.voucher_type, sle.voucher_no, sle.batch_no, self.allow_zero_rate,
 					currency=erpnext.get_company_currency(sle.company), company=sle.company, batch_wise_valuation=0)
@@ -352,6 +499,7 @@ class update_entries_after(object):
 		self.stock_value = flt(self.qty_after_transaction) * flt(self.valuation_rate)
 
 	def get_incoming_value_for_serial_nos(self, sle, serial_nos):
+		self.writer.flush_sles()
 		previous_sle_map = get_previous_serial_no_sles(sle, incoming_only=True)
 
 		incoming_values = 0
@@ -414,6 +562,7 @@ class update_entries_after(object):
 			if not new_valuation_rate and sle.voucher_detail_no:
 				allow_zero_valuation_rate = self.check_if_allow_zero_valuation_rate(sle.voucher_type, sle.voucher_detail_no)
 				if not allow_zero_valuation_rate:
+					self.writer.flush_sles()
 					new_valuation_rate = get_valuation_rate(sle.item_code, sle.warehouse,
 						sle.voucher_type, sle.voucher_no, sle.batch_no, self.allow_zero_rate,
 						currency=erpnext.get_company_currency(sle.company), batch_wise_valuation=self.batch_wise_valuation)
@@ -440,80 +589,32 @@ class update_entries_after(object):
 		outgoing_rate = flt(sle.outgoing_rate)
 
 		if actual_qty > 0:
-			if not self.stock_queue:
-				self.stock_queue.append([0, 0])
-
-			# last row has the same rate, just updated the qty
-			if self.stock_queue[-1][1]==incoming_rate:
-				self.stock_queue[-1][0] += actual_qty
-				self.stock_queue[-1][0] = flt(self.stock_queue[-1][0], 9)
-			else:
-				if self.stock_queue[-1][0] > 0:
-					self.stock_queue.append([actual_qty, incoming_rate])
-				else:
-					qty = flt(self.stock_queue[-1][0] + actual_qty, 9)
-					self.stock_queue[-1] = [qty, incoming_rate]
+			self.stock_queue.add_stock(actual_qty, incoming_rate)
 		else:
-			qty_to_pop = abs(actual_qty)
-			while qty_to_pop:
-				if not self.stock_queue:
-					# Get valuation rate from last sle if exists or from valuation rate field in item master
-					allow_zero_valuation_rate = self.check_if_allow_zero_valuation_rate(sle.voucher_type, sle.voucher_detail_no)
-					if not allow_zero_valuation_rate:
-						_rate = get_valuation_rate(sle.item_code, sle.warehouse,
-							sle.voucher_type, sle.voucher_no, sle.batch_no, self.allow_zero_rate,
-							currency=erpnext.get_company_currency(sle.company), company=sle.company)
-					else:
-						_rate = 0
-
-					self.stock_queue.append([0, _rate])
-
-				index = None
-				if outgoing_rate > 0:
-					# Find the entry where rate matched with outgoing rate
-					for i, v in enumerate(self.stock_queue):
-						if v[1] == outgoing_rate:
-							index = i
-							break
-
-					# If no entry found with outgoing rate, collapse stack
-					if index == None:
-						new_stock_value = sum((d[0]*d[1] for d in self.stock_queue)) - qty_to_pop*outgoing_rate
-						new_stock_qty = flt(sum((d[0] for d in self.stock_queue)) - qty_to_pop, 9)
-						self.stock_queue = [[new_stock_qty, flt(new_stock_value/new_stock_qty, 9) if new_stock_qty > 0 else outgoing_rate]]
-						break
+			def rate_generator():
+				# Get valuation rate from last sle if exists or from valuation rate field in item master
+				allow_zero_valuation_rate = self.check_if_allow_zero_valuation_rate(sle.voucher_type, sle.voucher_detail_no)
+				if not allow_zero_valuation_rate:
+					self.writer.flush_sles()
+					return get_valuation_rate(sle.item_code, sle.warehouse,
+						sle.voucher_type, sle.voucher_no, sle.batch_no, self.allow_zero_rate,
+						currency=erpnext.get_company_currency(sle.company), company=sle.company)
 				else:
-					index = 0
-
-				# select first batch or the batch with same rate
-				batch = self.stock_queue[index]
-				if qty_to_pop >= batch[0]:
-					# consume current batch
-					qty_to_pop = flt(qty_to_pop - batch[0], 9)
-					self.stock_queue.pop(index)
-					if not self.stock_queue and qty_to_pop:
-						# stock finished, qty still remains to be withdrawn
-						# negative stock, keep in as a negative batch
-						self.stock_queue.append([-qty_to_pop, outgoing_rate or batch[1]])
-						break
+					return 0
 
-				else:
-					# qty found in current batch
-					# consume it and exit
-					batch[0] = flt(batch[0] - qty_to_pop, 9)
-					qty_to_pop = 0
+			self.stock_queue.remove_stock(abs(actual_qty), outgoing_rate, rate_generator)
 
-		stock_value = sum((flt(batch[0]) * flt(batch[1]) for batch in self.stock_queue))
-		stock_qty = flt(sum((flt(batch[0]) for batch in self.stock_queue)), 9)
+		stock_value = self.stock_queue.get_total_value()
+		stock_qty = self.stock_queue.get_total_qty()
 
 		if stock_qty:
 			self.valuation_rate = stock_value / flt(stock_qty)
 
 		if not self.stock_queue:
-			self.stock_queue.append([0, flt(sle.incoming_rate or sle.outgoing_rate or self.valuation_rate, 9)])
+			self.stock_queue.reset(0, flt(sle.incoming_rate or sle.outgoing_rate or self.valuation_rate, 9))
 
 		self.qty_after_transaction += flt(sle.actual_qty)
-		self.stock_value = sum((flt(batch[0]) * flt(batch[1]) for batch in self.stock_queue))
+		self.stock_value = self.stock_queue.get_total_value()
 
 	def set_stock_reconciliation_actual_qty(self, sle):
 		if self.batch_wise_valuation:
@@ -556,7 +657,7 @@ class update_entries_after(object):
 		else:
 			self.valuation_rate = sle.valuation_rate
 			self.qty_after_transaction = sle.qty_after_transaction
-			self.stock_queue = [[self.qty_after_transaction, self.valuation_rate]]
+			self.stock_queue.reset(self.qty_after_transaction, self.valuation_rate)
 			self.stock_value = flt(self.qty_after_transaction) * flt(self.valuation_rate)
 
 			if flt(sle.actual_qty) > 0:
@@ -567,35 +668,14 @@ class update_entries_after(object):
 	def get_dependent_values(self, sle):
 		dependencies = self.sle_dependency_map.get(sle.name)
 		if dependencies:
-			dependency_keys = list(dependencies.keys())
-
-			dependency_sles = frappe.db.sql("""
-				select voucher_type, voucher_no, voucher_detail_no,
-					stock_value_difference, incoming_rate, outgoing_rate, actual_qty
-				from `tabStock Ledger Entry`
-				where (voucher_type, voucher_no, voucher_detail_no) in %s
-					and name != %s
-					and ifnull(is_cancelled, 'No')='No'
-			""", [dependency_keys, sle.name], as_dict=1)
-
 			dependent_sle_value = flt(sle.additional_cost)
 
-			for dep_sle in dependency_sles:
-				dependency_key = (dep_sle.voucher_type, dep_sle.voucher_no, dep_sle.voucher_detail_no)
-				dependency_details = dependencies[dependency_key]
-
-				if dependency_details.dependency_qty_filter == "Positive" and dep_sle.actual_qty <= 0:
-					continue
-				if dependency_details.dependency_qty_filter == "Negative" and dep_sle.actual_qty >= 0:
-					continue
+			for dependency_key, dependency_details in dependencies.items():
+				for dep_sle in self.dependency_sle_index.get(dependency_key, {}).values():
+					if dep_sle.name == sle.name:
+						continue
 
-				if dependency_details.dependency_type == "Rate":
-					rate = dep_sle.stock_value_difference / dep_sle.actual_qty
-					current_dependency_value = rate * sle.actual_qty
-				else:
-					current_dependency_value = -1 * dep_sle.stock_value_difference
-
-				dependent_sle_value += current_dependency_value * dependency_details.dependency_percentage / 100
+					dependent_sle_value += self.get_dependency_value(sle, dep_sle, dependency_details)
 
 			dependent_sle_value = flt(dependent_sle_value, self.value_precision)
 			rate = flt(dependent_sle_value / sle.actual_qty, 9)
@@ -607,10 +687,58 @@ class update_entries_after(object):
 				sle.outgoing_rate = rate
 				sle.incoming_rate = 0
 
+	def get_dependency_value(self, sle, dep_sle, dependency_details):
+		if dependency_details.dependency_qty_filter == "Positive" and dep_sle.actual_qty <= 0:
+			return 0
+		if dependency_details.dependency_qty_filter == "Negative" and dep_sle.actual_qty >= 0:
+			return 0
+
+		if dependency_details.dependency_type == "Rate":
+			rate = dep_sle.stock_value_difference / dep_sle.actual_qty
+			current_dependency_value = rate * sle.actual_qty
+		else:
+			current_dependency_value = -1 * dep_sle.stock_value_difference
+
+		return current_dependency_value * dependency_details.dependency_percentage / 100
+
+	def get_dependency_sle_index(self, sle_dependency_map):
+		"""
+			Prefetch the entries referenced by dependencies of the whole repost window
+			as {(voucher_type, voucher_no, voucher_detail_no): {sle_name: values}}
+		"""
+		dependency_keys = set()
+		for dependencies in sle_dependency_map.values():
+			dependency_keys.update(dependencies.keys())
+
+		if not dependency_keys:
+			return {}
+
+		dependency_sles = frappe.db.sql("""
+			select name, voucher_type, voucher_no, voucher_detail_no,
+				stock_value_difference, incoming_rate, outgoing_rate, actual_qty
+			from `tabStock Ledger Entry`
+			where (voucher_type, voucher_no, voucher_detail_no) in %s
+				and ifnull(is_cancelled, 'No')='No'
+		""", [list(dependency_keys)], as_dict=1)
+
+		dependency_sle_index = {}
+		for d in dependency_sles:
+			dependency_key = (d.voucher_type, d.voucher_no, d.voucher_detail_no)
+			dependency_sle_index.setdefault(dependency_key, {})[d.name] = d
+
+		return dependency_sle_index
+
+	def update_dependency_sle_index(self, sle):
+		dependency_key = (sle.voucher_type, sle.voucher_no, sle.voucher_detail_no)
+		dep_sle = self.dependency_sle_index.get(dependency_key, {}).get(sle.name)
+		if dep_sle:
+			for key in ("stock_value_difference", "incoming_rate", "outgoing_rate", "actual_qty"):
+				dep_sle[key] = sle.get(key)
+
 	def get_sle_dependency_map(self, sles):
 		names = [d.name for d in sles]
 		if not names:
-			return []
+			return {}
 
 		dependencies = frappe.db.sql("""
 			select parent, dependent_voucher_type, dependent_voucher_no, dependent_voucher_detail_no,
@@ -797,6 +925,163 @@ class update_entries_after(object):
 			}))
 
 
+class StockLedgerEntryWriter(object):
+	"""
+		Buffers the values computed while reposting and writes them back
+		in multi-row updates instead of one query per Stock Ledger Entry.
+
+		Serial Nos are updated once per flush using the last entry they appeared in.
+	"""
+	sle_fields = (
+		"actual_qty", "incoming_rate", "outgoing_rate",
+		"qty_after_transaction", "valuation_rate", "stock_value", "stock_value_difference", "stock_queue",
+		"batch_qty_after_transaction", "batch_valuation_rate", "batch_stock_value",
+		"packed_qty_after_transaction", "is_processed"
+	)
+
+	def __init__(self, batch_size=None):
+		self.batch_size = cint(batch_size) or get_repost_write_batch_size()
+		self.sle_buffer = {}
+		self.serial_no_buffer = {}
+
+	def add_sle(self, sle):
+		self.sle_buffer[sle.name] = sle
+		if len(self.sle_buffer) >= self.batch_size:
+			self.flush_sles()
+
+	def add_serial_nos(self, serial_nos, sle):
+		clear_sales_order = sle.voucher_type == "Stock Entry" and cint(sle.actual_qty) < 0
+
+		for serial_no in serial_nos:
+			previous = self.serial_no_buffer.pop(serial_no, None)
+			self.serial_no_buffer[serial_no] = (sle, clear_sales_order or bool(previous and previous[1]))
+
+		if len(self.serial_no_buffer) >= self.batch_size:
+			self.flush_serial_nos()
+
+	def flush(self):
+		self.flush_sles()
+		self.flush_serial_nos()
+
+	def flush_sles(self):
+		sles = list(self.sle_buffer.values())
+		self.sle_buffer = {}
+
+		for i in range(0, len(sles), self.batch_size):
+			self.update_sles(sles[i:i + self.batch_size])
+
+	def update_sles(self, sles):
+		if not sles:
+			return
+
+		set_clauses = []
+		values = []
+		when_clause = " ".join(["when %s then %s"] * len(sles))
+		for fieldname in self.sle_fields:
+			set_clauses.append("`{0}` = case name {1} end".format(fieldname, when_clause))
+			for sle in sles:
+				values += [sle.name, sle.get(fieldname)]
+
+		values += [sle.name for sle in sles]
+
+		frappe.db.sql("""
+			update `tabStock Ledger Entry`
+			set {0}
+			where name in ({1})
+		""".format(", ".join(set_clauses), ", ".join(["%s"] * len(sles))), values)
+
+	def flush_serial_nos(self):
+		from erpnext.stock.doctype.serial_no.serial_no import update_args_for_serial_no
+
+		serial_nos = list(self.serial_no_buffer.items())
+		self.serial_no_buffer = {}
+		if not serial_nos:
+			return
+
+		# serial no history is read from the ledger, so it must be up to date first
+		self.flush_sles()
+
+		for serial_no, (sle, clear_sales_order) in serial_nos:
+			sr_doc = frappe.get_doc("Serial No", serial_no)
+			if clear_sales_order:
+				sr_doc.sales_order = None
+
+			update_args_for_serial_no(sr_doc, serial_no, sle)
+
+
+def get_repost_write_batch_size():
+	return cint(frappe.db.get_single_value("Stock Settings", "repost_write_batch_size", cache=True)) or 500
+
+
+class RepostQueue(object):
+	"""
+		Queue of (item_code, warehouse) bins pending repost, ordered by the
+		(posting_date, posting_time, creation) of their earliest affected entry.
+
+		A bin is queued at most once; if it is reached again through another dependency
+		before it is reposted, the earlier of the two starting entries is kept.
+	"""
+	def __init__(self):
+		self.heap = []
+		self.pending = {}
+		self.counter = 0
+
+		self.bins_reposted = 0
+		self.sles_reposted = 0
+		self.bins_visited = set()
+
+	def add_entries(self, entries):
+		for d in entries:
+			self.add(d)
+
+	def add(self, d):
+		bin_key = (d.item_code, d.warehouse)
+		sort_key = get_sle_sort_key(d)
+
+		existing = self.pending.get(bin_key)
+		if existing and get_sle_sort_key(existing) <= sort_key:
+			return
+
+		self.pending[bin_key] = d
+		self.counter += 1
+		heapq.heappush(self.heap, (sort_key, self.counter, bin_key))
+
+	def pop(self):
+		while self.heap:
+			sort_key, counter, bin_key = heapq.heappop(self.heap)
+			d = self.pending.get(bin_key)
+
+			# skip stale heap items superseded by an earlier starting entry
+			if d and get_sle_sort_key(d) == sort_key:
+				del self.pending[bin_key]
+				return d
+
+		return None
+
+	def get_pending(self):
+		return list(self.pending.values())
+
+	def mark_reposted(self, item_code, warehouse, sle_count):
+		self.bins_reposted += 1
+		self.sles_reposted += sle_count
+		self.bins_visited.add((item_code, warehouse))
+
+	def get_summary(self):
+		return frappe._dict({
+			"bins_reposted": self.bins_reposted,
+			"distinct_bins": len(self.bins_visited),
+			"sles_reposted": self.sles_reposted,
+		})
+
+
+def get_sle_sort_key(sle):
+	return (
+		getdate(sle.posting_date or "1900-01-01"),
+		to_timedelta(sle.posting_time or "00:00:00"),
+		get_datetime(sle.creation or "1900-01-01 00:00:00"),
+	)
+
+
 def get_previous_sle(args, for_update=False, packing_slip_sle=False):
 	"""
 		get the last sle on or before the current time-bucket,
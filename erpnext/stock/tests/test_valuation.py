@@ -0,0 +1,52 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+import unittest
+
+from erpnext.stock.valuation import FIFOQueue, load_stock_queue, dump_stock_queue
+
+
+class TestFIFOQueue(unittest.TestCase):
+	def test_merge_same_rate_lots(self):
+		queue = FIFOQueue()
+		queue.add_stock(1, 10)
+		queue.add_stock(2, 10)
+		queue.add_stock(1, 20)
+		self.assertEqual(queue, [[3, 10], [1, 20]])
+
+	def test_consume_from_front(self):
+		queue = FIFOQueue([[2, 10], [3, 20]])
+		queue.remove_stock(3)
+		self.assertEqual(queue, [[2, 20]])
+		self.assertEqual(queue.get_total_value(), 40)
+
+	def test_negative_stock(self):
+		queue = FIFOQueue([[1, 10]])
+		queue.remove_stock(3)
+		self.assertEqual(queue, [[-2, 10]])
+
+		queue.add_stock(3, 20)
+		self.assertEqual(queue, [[1, 20]])
+
+	def test_outgoing_rate_collapses_queue(self):
+		queue = FIFOQueue([[2, 10], [2, 20]])
+		queue.remove_stock(1, outgoing_rate=30)
+		self.assertEqual(queue, [[3, 10]])
+
+	def test_rate_generator_for_empty_queue(self):
+		queue = FIFOQueue()
+		queue.remove_stock(1, rate_generator=lambda: 15)
+		self.assertEqual(queue, [[-1, 15]])
+
+	def test_outgoing_rate(self):
+		queue = FIFOQueue([[1, 10], [1, 20]])
+		self.assertEqual(queue.get_outgoing_rate(-2), 15)
+		self.assertEqual(queue, [[1, 10], [1, 20]])
+
+	def test_storage_formats(self):
+		lots = [[1.5, 10.25], [2.0, 20.0]]
+
+		self.assertEqual(load_stock_queue("[[1.5, 10.25], [2.0, 20.0]]"), lots)
+		self.assertEqual(load_stock_queue(dump_stock_queue(FIFOQueue(lots))), lots)
+		self.assertEqual(load_stock_queue(dump_stock_queue(FIFOQueue(lots), compact=True)), lots)
+		self.assertEqual(load_stock_queue(None), [])
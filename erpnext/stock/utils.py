@@ -7,6 +7,8 @@ import json
 from frappe.utils import flt, cstr, nowdate, nowtime
 
 from six import string_types, iteritems
+from erpnext.stock.valuation import load_stock_queue
+from erpnext.selling.doctype.pos_catalog_change.pos_catalog_change import log_pos_catalog_changes
 
 
 class InvalidWarehouseCompany(frappe.ValidationError): pass
@@ -213,6 +215,7 @@ def update_bin(args, allow_negative_stock=False, via_landed_cost_voucher=False):
 	if is_stock_item:
 		bin = get_bin(args.get("item_code"), args.get("warehouse"))
 		bin.update_stock(args, allow_negative_stock, via_landed_cost_voucher)
+		log_pos_catalog_changes([bin.item_code], bin.warehouse)
 		return bin
 	else:
 		frappe.msgprint(_("Item {0} ignored since it is not a stock item").format(args.get("item_code")))
@@ -233,7 +236,7 @@ def get_incoming_rate(args, raise_error_if_no_rate=True):
 		previous_sle = get_previous_sle(args)
 		if valuation_method == 'FIFO':
 			if previous_sle:
-				previous_stock_queue = json.loads(previous_sle.get('stock_queue', '[]') or '[]')
+				previous_stock_queue = load_stock_queue(previous_sle.get('stock_queue'))
 				in_rate = get_fifo_rate(previous_stock_queue, args.get("qty") or 0) if previous_stock_queue else 0
 		elif valuation_method == 'Moving Average':
 			if batch_wise_valuation:
@@ -280,29 +283,13 @@ def get_valuation_method(item_code):
 
 def get_fifo_rate(previous_stock_queue, qty):
 	"""get FIFO (average) Rate from Queue"""
+	previous_stock_queue = load_stock_queue(previous_stock_queue)
+
 	if flt(qty) >= 0:
-		total = sum(f[0] for f in previous_stock_queue)
-		return sum(flt(f[0]) * flt(f[1]) for f in previous_stock_queue) / flt(total) if total else 0.0
+		total = sum(lot[0] for lot in previous_stock_queue)
+		return previous_stock_queue.get_total_value() / flt(total) if total else 0.0
 	else:
-		available_qty_for_outgoing, outgoing_cost = 0, 0
-		qty_to_pop = abs(flt(qty))
-		while qty_to_pop and previous_stock_queue:
-			batch = previous_stock_queue[0]
-			if 0 < batch[0] <= qty_to_pop:
-				# if batch qty > 0
-				# not enough or exactly same qty in current batch, clear batch
-				available_qty_for_outgoing += flt(batch[0])
-				outgoing_cost += flt(batch[0]) * flt(batch[1])
-				qty_to_pop -= batch[0]
-				previous_stock_queue.pop(0)
-			else:
-				# all from current batch
-				available_qty_for_outgoing += flt(qty_to_pop)
-				outgoing_cost += flt(qty_to_pop) * flt(batch[1])
-				batch[0] -= qty_to_pop
-				qty_to_pop = 0
-
-		return outgoing_cost / available_qty_for_outgoing
+		return previous_stock_queue.get_outgoing_rate(qty)
 
 
 def get_valid_serial_nos(sr_nos, qty=0, item_code=''):
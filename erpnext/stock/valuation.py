@@ -0,0 +1,167 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+import base64
+import json
+import zlib
+from array import array
+from collections import deque
+
+from frappe.utils import flt
+
+COMPACT_QUEUE_PREFIX = "z:"
+
+
+class FIFOQueue(object):
+	"""
+		FIFO stock queue of [qty, rate] lots backed by a deque
+
+		Lots are consumed from the front in O(1) and an incoming lot with the same rate
+		as the last lot is merged into it instead of growing the queue.
+	"""
+	def __init__(self, lots=None):
+		self.lots = deque([qty, rate] for qty, rate in (lots or []))
+
+	def __len__(self):
+		return len(self.lots)
+
+	def __bool__(self):
+		return bool(self.lots)
+
+	def __iter__(self):
+		return iter(self.lots)
+
+	def __getitem__(self, index):
+		return self.lots[index]
+
+	def __eq__(self, other):
+		return self.to_list() == (other.to_list() if isinstance(other, FIFOQueue) else other)
+
+	def to_list(self):
+		return [list(lot) for lot in self.lots]
+
+	def get_total_qty(self):
+		return flt(sum(flt(lot[0]) for lot in self.lots), 9)
+
+	def get_total_value(self):
+		return sum(flt(lot[0]) * flt(lot[1]) for lot in self.lots)
+
+	def reset(self, qty, rate):
+		self.lots = deque([[qty, rate]])
+
+	def add_stock(self, qty, rate):
+		if not self.lots:
+			self.lots.append([0, 0])
+
+		last_lot = self.lots[-1]
+		if last_lot[1] == rate:
+			# last lot has the same rate, just update the qty
+			last_lot[0] = flt(last_lot[0] + qty, 9)
+		elif last_lot[0] > 0:
+			self.lots.append([qty, rate])
+		else:
+			# replenish a negative or empty lot
+			self.lots[-1] = [flt(last_lot[0] + qty, 9), rate]
+
+	def remove_stock(self, qty, outgoing_rate=0, rate_generator=None):
+		"""
+			Consume qty from the queue, from the lot with the same rate as outgoing_rate if given
+			or else from the front. rate_generator is called for the rate of stock issued from an empty queue
+		"""
+		qty_to_pop = qty
+		while qty_to_pop:
+			if not self.lots:
+				self.lots.append([0, rate_generator() if rate_generator else 0])
+
+			index = None
+			if outgoing_rate > 0:
+				# find the lot where rate matches with outgoing rate
+				for i, lot in enumerate(self.lots):
+					if lot[1] == outgoing_rate:
+						index = i
+						break
+
+				# if no lot found with outgoing rate, collapse queue
+				if index is None:
+					new_stock_value = sum(lot[0] * lot[1] for lot in self.lots) - qty_to_pop * outgoing_rate
+					new_stock_qty = flt(sum(lot[0] for lot in self.lots) - qty_to_pop, 9)
+					self.lots = deque([[new_stock_qty,
+						flt(new_stock_value / new_stock_qty, 9) if new_stock_qty > 0 else outgoing_rate]])
+					break
+			else:
+				index = 0
+
+			lot = self.lots[index]
+			if qty_to_pop >= lot[0]:
+				# consume current lot
+				qty_to_pop = flt(qty_to_pop - lot[0], 9)
+				if index == 0:
+					self.lots.popleft()
+				else:
+					del self.lots[index]
+
+				if not self.lots and qty_to_pop:
+					# stock finished, qty still remains to be withdrawn
+					# negative stock, keep in as a negative lot
+					self.lots.append([-qty_to_pop, outgoing_rate or lot[1]])
+					break
+			else:
+				# qty found in current lot, consume it and exit
+				lot[0] = flt(lot[0] - qty_to_pop, 9)
+				qty_to_pop = 0
+
+	def get_outgoing_rate(self, qty):
+		"""Average rate of consuming qty from the front of the queue, without changing the queue"""
+		available_qty_for_outgoing, outgoing_cost = 0, 0
+		qty_to_pop = abs(flt(qty))
+
+		for lot_qty, lot_rate in self.lots:
+			if not qty_to_pop:
+				break
+
+			if 0 < lot_qty <= qty_to_pop:
+				# not enough or exactly same qty in current lot, clear lot
+				available_qty_for_outgoing += flt(lot_qty)
+				outgoing_cost += flt(lot_qty) * flt(lot_rate)
+				qty_to_pop -= lot_qty
+			else:
+				# all from current lot
+				available_qty_for_outgoing += flt(qty_to_pop)
+				outgoing_cost += flt(qty_to_pop) * flt(lot_rate)
+				qty_to_pop = 0
+
+		return outgoing_cost / available_qty_for_outgoing if available_qty_for_outgoing else 0.0
+
+
+def load_stock_queue(stock_queue):
+	"""Returns FIFOQueue from a stored stock_queue value, either a JSON list or the compact encoding"""
+	if isinstance(stock_queue, FIFOQueue):
+		return stock_queue
+
+	if not stock_queue:
+		return FIFOQueue()
+
+	if isinstance(stock_queue, str) and stock_queue.startswith(COMPACT_QUEUE_PREFIX):
+		values = array('d')
+		values.frombytes(zlib.decompress(base64.b64decode(stock_queue[len(COMPACT_QUEUE_PREFIX):])))
+		return FIFOQueue(zip(values[0::2], values[1::2]))
+
+	if isinstance(stock_queue, str):
+		stock_queue = json.loads(stock_queue)
+
+	return FIFOQueue(stock_queue)
+
+
+def dump_stock_queue(stock_queue, compact=False):
+	"""Returns stock_queue as a JSON list, or as compressed binary pairs of doubles if compact"""
+	lots = stock_queue.lots if isinstance(stock_queue, FIFOQueue) else stock_queue
+
+	if not compact:
+		return json.dumps([list(lot) for lot in lots])
+
+	values = array('d')
+	for qty, rate in lots:
+		values.append(qty)
+		values.append(rate)
+
+	return COMPACT_QUEUE_PREFIX + base64.b64encode(zlib.compress(values.tobytes())).decode()
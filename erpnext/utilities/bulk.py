@@ -0,0 +1,29 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+import frappe
+
+
+def insert_rows(doctype, fields, rows, chunk_size=1000):
+	"""Insert rows with multi-row inserts, skipping document validation"""
+	for i in range(0, len(rows), chunk_size):
+		chunk = rows[i:i + chunk_size]
+		placeholders = "({0})".format(", ".join(["%s"] * len(fields)))
+		values = [value for row in chunk for value in row]
+
+		frappe.db.sql("insert into `tab{0}` ({1}) values {2}".format(
+			doctype, ", ".join("`{0}`".format(f) for f in fields), ", ".join([placeholders] * len(chunk))
+		), values)
+
+
+def update_rows(doctype, fields, rows, chunk_size=1000):
+	"""Update fields of rows by name with one query per chunk, skipping document validation. Rows start with the name"""
+	columns = ["name"] + list(fields)
+	for i in range(0, len(rows), chunk_size):
+		chunk = rows[i:i + chunk_size]
+		select = "select {0}".format(", ".join(["%s as `{0}`".format(f) for f in columns]))
+		values = [value for row in chunk for value in row]
+
+		frappe.db.sql("update `tab{0}` t inner join ({1}) v on v.name = t.name set {2}".format(
+			doctype, " union all ".join([select] * len(chunk)), ", ".join("t.`{0}` = v.`{0}`".format(f) for f in fields)
+		), values)
@@ -0,0 +1,51 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+"""
+	Streaming reads of large result sets
+
+	iterate_sql yields the rows of a query from an unbuffered server side cursor, fetched a chunk at a time,
+	so that a report replaying a ledger holds only the rows it is processing instead of the whole result.
+	Rows are named tuples that also support .get like frappe._dict.
+
+	The connection is busy until the iteration completes or the generator is closed, so no other query may
+	be run while iterating.
+"""
+
+from collections import namedtuple
+
+import frappe
+from pymysql.cursors import SSCursor
+
+_row_types = {}
+
+
+def get_row_type(fields):
+	fields = tuple(fields)
+	if fields not in _row_types:
+		row_type = namedtuple("Row", fields)
+		row_type.get = lambda self, key, default=None: getattr(self, key, default)
+		_row_types[fields] = row_type
+
+	return _row_types[fields]
+
+
+def iterate_sql(query, values=None, chunk_size=1000):
+	"""Yields rows of the query as named tuples without loading the whole result"""
+	if not frappe.db._conn:
+		frappe.db.connect()
+
+	cursor = frappe.db._conn.cursor(SSCursor)
+	try:
+		cursor.execute(query, values)
+		row_type = get_row_type([d[0] for d in cursor.description])
+
+		while True:
+			rows = cursor.fetchmany(chunk_size)
+			if not rows:
+				break
+
+			for row in rows:
+				yield row_type._make(row)
+	finally:
+		cursor.close()
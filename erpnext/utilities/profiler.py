@@ -0,0 +1,129 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+"""
+	Opt-in instrumentation of posting hot paths
+
+	Enable by setting "posting_profiler": 1 in site_config.json, or frappe.flags.posting_profiler
+	for the current request/job. Functions decorated with @profile_phase record calls, wall time,
+	SQL queries and rows affected per phase. Numbers of nested phases are included in their parents, and
+	a phase entered again within itself, like a repost of dependent bins, is counted once.
+
+	When the outermost phase of a request finishes, the breakdown is attached to the response as
+	"posting_profile" and written to the "posting_profiler" log.
+"""
+
+import functools
+import time
+
+import frappe
+from frappe.utils import cint, flt
+
+
+class QueryCounter(object):
+	"""Counts queries issued and rows touched through frappe.db.sql while active"""
+	def __init__(self):
+		self.queries = 0
+		self.rows = 0
+
+	def __enter__(self):
+		# restore an outer counter's wrapper on exit, if any
+		self.previous_sql = frappe.db.__dict__.get("sql")
+		original_sql = frappe.db.sql
+
+		def sql(*args, **kwargs):
+			result = original_sql(*args, **kwargs)
+			self.queries += 1
+			self.rows += max(cint(getattr(frappe.db._cursor, "rowcount", 0)), 0)
+			return result
+
+		frappe.db.sql = sql
+		return self
+
+	def __exit__(self, *args):
+		if self.previous_sql:
+			frappe.db.sql = self.previous_sql
+		else:
+			del frappe.db.sql
+
+
+def is_profiler_enabled():
+	return bool(frappe.flags.posting_profiler or frappe.conf.get("posting_profiler"))
+
+
+def profile_phase(phase):
+	"""Decorator to record the function as a profiled phase when the posting profiler is enabled"""
+	def decorator(fn):
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			if not is_profiler_enabled():
+				return fn(*args, **kwargs)
+
+			with ProfiledPhase(phase):
+				return fn(*args, **kwargs)
+
+		return wrapper
+
+	return decorator
+
+
+class ProfiledPhase(object):
+	def __init__(self, phase):
+		self.phase = phase
+
+	def __enter__(self):
+		profiler = getattr(frappe.local, "posting_profiler", None)
+		if not profiler:
+			profiler = frappe.local.posting_profiler = frappe._dict({
+				"depth": 0,
+				"phases": {},
+				"phase_depths": {},
+				"counter": QueryCounter().__enter__(),
+				"start": time.perf_counter(),
+			})
+
+		profiler.depth += 1
+		profiler.phase_depths[self.phase] = profiler.phase_depths.get(self.phase, 0) + 1
+		self.profiler = profiler
+		self.start = time.perf_counter()
+		self.start_queries = profiler.counter.queries
+		self.start_rows = profiler.counter.rows
+		return self
+
+	def __exit__(self, *args):
+		profiler = self.profiler
+		phase = profiler.phases.setdefault(self.phase, frappe._dict({
+			"calls": 0, "time": 0.0, "queries": 0, "rows": 0
+		}))
+		phase.calls += 1
+
+		# only the outermost entry of the phase adds its numbers, which include those of the nested entries
+		profiler.phase_depths[self.phase] -= 1
+		if not profiler.phase_depths[self.phase]:
+			phase.time += time.perf_counter() - self.start
+			phase.queries += profiler.counter.queries - self.start_queries
+			phase.rows += profiler.counter.rows - self.start_rows
+
+		profiler.depth -= 1
+		if not profiler.depth:
+			profiler.counter.__exit__()
+			frappe.local.posting_profiler = None
+			publish_profile(profiler)
+
+
+def publish_profile(profiler):
+	profile = frappe._dict({
+		"cmd": frappe.form_dict.get("cmd") if getattr(frappe.local, "form_dict", None) else None,
+		"time": flt(time.perf_counter() - profiler.start, 6),
+		"queries": profiler.counter.queries,
+		"rows": profiler.counter.rows,
+		"phases": {phase: frappe._dict({
+			"calls": d.calls, "time": flt(d.time, 6), "queries": d.queries, "rows": d.rows
+		}) for phase, d in profiler.phases.items()},
+	})
+
+	if getattr(frappe.local, "response", None) is not None:
+		frappe.local.response.setdefault("posting_profile", []).append(profile)
+
+	frappe.logger("posting_profiler").info(profile)
+	return profile
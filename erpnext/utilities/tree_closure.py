@@ -0,0 +1,121 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+"""
+	Cached ancestors and descendants of nodes of nested set trees
+
+	A tree is loaded once per process and site, ordered by lft, so that the descendants of a node are the
+	contiguous run of nodes after it up to its rgt, and its ancestors are found by following parents.
+	Trees are shared by workers through a version per doctype in the cache, which clear_tree_closure changes
+	whenever a node of the tree is inserted, updated, renamed or deleted, and again once the change is
+	committed. Code rebuilding lft and rgt of a tree calls invalidate_tree_closure.
+"""
+
+from bisect import bisect_right
+
+import frappe
+
+tree_doctypes = ["Item Group", "Customer Group", "Territory", "Supplier Group", "Warehouse", "Cost Center",
+	"Account"]
+
+_trees = {}
+
+
+class TreeClosure(object):
+	def __init__(self, doctype):
+		self.doctype = doctype
+		self.names = []
+		self.lfts = []
+		self.rgts = []
+		self.positions = {}
+		self.parents = {}
+		self.ancestors = {}
+
+		stack = []
+		for d in frappe.db.sql("""
+			select name, lft, rgt
+			from `tab{0}`
+			where lft is not null
+			order by lft
+		""".format(doctype), as_dict=1):
+			while stack and stack[-1][1] < d.lft:
+				stack.pop()
+
+			self.parents[d.name] = stack[-1][0] if stack else None
+			self.positions[d.name] = len(self.names)
+			self.names.append(d.name)
+			self.lfts.append(d.lft)
+			self.rgts.append(d.rgt)
+			stack.append((d.name, d.rgt))
+
+	def get_ancestors(self, name, include_self=True):
+		"""Returns ancestors of the node nearest first"""
+		if name not in self.positions:
+			return []
+
+		if name not in self.ancestors:
+			ancestors = []
+			parent = self.parents[name]
+			while parent:
+				ancestors.append(parent)
+				parent = self.parents[parent]
+			self.ancestors[name] = ancestors
+
+		return ([name] if include_self else []) + self.ancestors[name]
+
+	def get_descendants(self, name, include_self=True):
+		"""Returns descendants of the node in the order of lft"""
+		if name not in self.positions:
+			return []
+
+		position = self.positions[name]
+		end = bisect_right(self.lfts, self.rgts[position], lo=position)
+		return self.names[position if include_self else position + 1:end]
+
+
+def get_tree_closure(doctype):
+	cache_key = "tree_closure_version::{0}".format(doctype)
+	current_version = frappe.cache().get_value(cache_key, generator=frappe.generate_hash)
+	version, tree = _trees.get((frappe.local.site, doctype), (None, None))
+
+	if not tree or version != current_version:
+		tree = TreeClosure(doctype)
+		_trees[(frappe.local.site, doctype)] = (current_version, tree)
+
+	return tree
+
+
+def get_ancestors(doctype, name, include_self=True):
+	"""Returns names of the node and its ancestors, nearest first, or [] if the node does not exist"""
+	return get_tree_closure(doctype).get_ancestors(name, include_self=include_self)
+
+
+def get_descendants(doctype, name, include_self=True):
+	"""Returns names of the node and its descendants, in the order of lft, or [] if the node does not exist"""
+	return get_tree_closure(doctype).get_descendants(name, include_self=include_self)
+
+
+def clear_tree_closure(doc=None, method=None, *args):
+	"""Invalidates the tree of the document's doctype, or all trees, in all workers"""
+	if method == "on_update" and frappe.local.flags.ignore_update_nsm:
+		# lft and rgt are not updated, the tree is rebuilt and invalidated afterwards
+		return
+
+	doctypes = [doc.doctype] if doc else tree_doctypes
+	for doctype in doctypes:
+		invalidate_tree_closure(doctype)
+
+
+def invalidate_tree_closure(doctype):
+	"""
+		Changes the version of the tree now and again after commit, as another worker may load the tree
+		as it was before the change was committed. Also to be called after rebuilding lft and rgt of the tree
+	"""
+	change_tree_closure_version(doctype)
+	frappe.enqueue("erpnext.utilities.tree_closure.change_tree_closure_version", queue="short",
+		doctype=doctype, enqueue_after_commit=True)
+
+
+def change_tree_closure_version(doctype):
+	frappe.cache().set_value("tree_closure_version::{0}".format(doctype), frappe.generate_hash())
+	_trees.pop((frappe.local.site, doctype), None)